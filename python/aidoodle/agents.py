@@ -1,11 +1,19 @@
 from dataclasses import dataclass, field
 import math
-import random
 import sys
-from typing import Union
+from typing import Callable, Optional, Union, cast
 
 from aidoodle.core import Engine, Game, Move, Player
-from aidoodle.ai.mcts import Cache, Node, choose_edge, search_iteration
+from aidoodle.ai import tablebase
+from aidoodle.ai.alphabeta import TranspositionTable, search as alphabeta_search
+from aidoodle.ai.book import Book
+from aidoodle.ai import dicesolver
+from aidoodle.ai import expectimax
+from aidoodle.ai.mcts import Cache, Node, Oracle, choose_node_edge, search_iteration
+from aidoodle.games import dumbdice
+from aidoodle.games import tictactoe
+from aidoodle.rng import Rng, choice
+from aidoodle.utils import Interner
 
 
 CONCESSION_THRESHOLD = 0.4
@@ -25,9 +33,11 @@ class Agent:
 
 @dataclass(frozen=True)
 class RandomAgent(Agent):
+    rng: Optional[Rng] = None
+
     def next_move(self, game: Game) -> Move:
         legal_moves = self.engine.get_legal_moves(game)
-        return random.choice(legal_moves)
+        return choice(legal_moves, rng=self.rng)
 
 
 @dataclass(frozen=True)
@@ -73,19 +83,61 @@ def _upper_conf_bound(v: float, n: int, z: float = 1.96) -> float:
 
 @dataclass(frozen=True)
 class MctsAgent(Agent):
+    # pylint: disable=too-many-instance-attributes
     n_iter: int = 1000
     reuse_cache: bool = False
     cache: Cache = field(default_factory=dict)
     allow_concession: bool = False
+    # first select the move group, then the move, if the engine supports it
+    hierarchical: bool = False
+    # only create the edge of a move once it is tried
+    lazy: bool = False
+    # select from a heap at nodes with at least this many edges
+    heap_width: Optional[int] = None
+    # share one instance between equal game states during a search
+    intern: bool = False
+    # estimates the score of a game instead of a single random playout,
+    # e.g. aidoodle.vec.ziczaczoe.simulate
+    simulator: Optional[Callable[[Game], float]] = None
+    # exact scores of solved positions, used by the tree search and the
+    # playouts, e.g. aidoodle.ai.retrograde.load()
+    oracle: Optional[Oracle] = None
+    # positions covered by the opening book are answered without a search
+    book: Optional[Book] = None
+    # source of randomness for the search, the random module if None
+    rng: Optional[Rng] = None
+    # weight of the heuristic minimax values in the selection, 0 for
+    # plain mcts; they come from evaluate, the engine's if None
+    minimax_weight: float = 0.0
+    evaluate: Optional[Callable[[Game], float]] = None
 
     def next_move(self, game: Game) -> Move:
+        if self.book is not None:
+            move = self.book.best_move(game)
+            if move is not None:
+                return move
+
         root = Node(game=game)
         cache: Cache = self.cache if self.reuse_cache else {}
+        interner: Optional[Interner[Game]] = Interner() if self.intern else None
 
         for _ in range(self.n_iter):
-            search_iteration(node=root, engine=self.engine, cache=cache)
-
-        edge = choose_edge(root.edges)
+            search_iteration(
+                node=root,
+                engine=self.engine,
+                cache=cache,
+                hierarchical=self.hierarchical,
+                lazy=self.lazy,
+                heap_width=self.heap_width,
+                interner=interner,
+                simulator=self.simulator,
+                oracle=self.oracle,
+                rng=self.rng,
+                minimax_weight=self.minimax_weight,
+                evaluate=self.evaluate,
+            )
+
+        edge = choose_node_edge(root)
         if not self.allow_concession:
             return edge.move
 
@@ -100,4 +152,87 @@ class MctsAgent(Agent):
         return f"MctsAgent(n_iter={self.n_iter}, learning={self.reuse_cache})"
 
 
-Agents = Union[CliInputAgent, MctsAgent, RandomAgent]
+@dataclass(frozen=True)
+class SolvedDiceAgent(Agent):
+    """Plays dumbdice optimally by looking up the exact solution"""
+    def __post_init__(self) -> None:
+        if self.engine is not dumbdice:  # type: ignore[comparison-overlap]
+            raise ValueError("SolvedDiceAgent only plays dumbdice")
+
+    def next_move(self, game: Game) -> Move:
+        return dicesolver.best_move(cast(dumbdice.Game, game))
+
+
+@dataclass(frozen=True)
+class PerfectAgent(Agent):
+    """Plays tictactoe perfectly by looking up the tablebase
+
+    Chooses randomly between equally good moves. The tablebase is
+    built at the given path if it does not exist yet.
+
+    """
+    path: str = tablebase.PATH
+    rng: Optional[Rng] = None
+
+    def __post_init__(self) -> None:
+        if self.engine is not tictactoe:  # type: ignore[comparison-overlap]
+            raise ValueError("PerfectAgent only plays tictactoe")
+
+    def next_move(self, game: Game) -> Move:
+        moves = tablebase.load(self.path).best_moves(cast(tictactoe.Game, game))
+        return choice(moves, rng=self.rng)
+
+
+@dataclass(frozen=True)
+class AlphaBetaAgent(Agent):
+    """Alpha-beta search with iterative deepening, for deterministic engines"""
+    # seconds per move, the first depth is always completed
+    time_budget: float = 1.0
+    max_depth: Optional[int] = None
+    # score for player 1 at the depth limit, the engine's evaluate if None
+    evaluate: Optional[Callable[[Game], float]] = None
+    # kept between moves
+    table: TranspositionTable = field(default_factory=TranspositionTable)
+
+    def next_move(self, game: Game) -> Move:
+        result = alphabeta_search(
+            game,
+            engine=self.engine,
+            time_budget=self.time_budget,
+            max_depth=self.max_depth,
+            evaluate=self.evaluate,
+            table=self.table,
+        )
+        return result.move
+
+    def __repr__(self) -> str:
+        return f"AlphaBetaAgent(time_budget={self.time_budget})"
+
+
+@dataclass(frozen=True)
+class ExpectimaxAgent(Agent):
+    """Expected value search to a fixed depth, for engines with chance"""
+    depth: int = expectimax.DEPTH
+    # score for player 1 at the depth limit, the engine's evaluate if None
+    evaluate: Optional[Callable[[Game], float]] = None
+    # values of searched games, kept between moves
+    cache: expectimax.Cache = field(default_factory=expectimax.Cache)
+
+    def next_move(self, game: Game) -> Move:
+        result = expectimax.search(
+            game,
+            engine=self.engine,
+            depth=self.depth,
+            evaluate=self.evaluate,
+            cache=self.cache,
+        )
+        return result.move
+
+    def __repr__(self) -> str:
+        return f"ExpectimaxAgent(depth={self.depth})"
+
+
+Agents = Union[
+    CliInputAgent, MctsAgent, RandomAgent, SolvedDiceAgent, PerfectAgent, AlphaBetaAgent,
+    ExpectimaxAgent,
+]
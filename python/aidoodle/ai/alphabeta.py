@@ -0,0 +1,268 @@
+"""Alpha-beta search with iterative deepening and a transposition table
+
+Values are scores in [0, 1] for the player to move, so the value of a
+move is one minus the value of the position it leads to (negamax).
+Positions at the depth limit that are not over are scored by a
+heuristic ``evaluate(game)``, which returns the score for player 1 like
+``game_score``. Without one, they count as a draw. A search whose
+result does not depend on the heuristic is exact.
+
+The depth is increased until the time budget is used up, the maximum
+depth is reached or the search is exact. The result of the last
+completed depth is used. Root moves are tried in the order of their
+values at the previous depth, and at other nodes, the best move stored
+in the transposition table is tried first.
+
+Only suitable for deterministic engines.
+
+"""
+from dataclasses import dataclass
+import math
+import time
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from aidoodle.core import Engine, Game, Move
+from aidoodle.utils import slotted
+
+
+TT_SIZE = 2 ** 16  # default number of slots of the transposition table
+CHECK_EVERY = 1024  # nodes between checks of the time budget
+
+# bounds of stored values
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+@slotted
+@dataclass(frozen=True)
+class Entry:
+    # pylint: disable=too-many-instance-attributes
+    game: Game
+    depth: int
+    value: float
+    bound: int
+    move: Optional[Move]
+    # whether the value does not depend on the heuristic
+    solved: bool
+    generation: int
+
+
+class TranspositionTable:
+    """Fixed number of slots, indexed by the hash of the game
+
+    A new entry replaces the entry in its slot if that entry is from an
+    earlier search, or if it was searched at most as deep. Otherwise,
+    the new entry is dropped.
+
+    """
+    def __init__(self, size: int = TT_SIZE) -> None:
+        if size < 1:
+            raise ValueError("Table needs at least one slot")
+        self.size = size
+        self.generation = 0
+        self._slots: List[Optional[Entry]] = [None] * size
+
+    def new_search(self) -> None:
+        self.generation += 1
+
+    def get(self, game: Game) -> Optional[Entry]:
+        entry = self._slots[hash(game) % self.size]
+        if (entry is None) or (entry.game != game):
+            return None
+        return entry
+
+    def put(self, entry: Entry) -> None:
+        idx = hash(entry.game) % self.size
+        old = self._slots[idx]
+        if (old is None) or (old.generation != entry.generation) or (old.depth <= entry.depth):
+            self._slots[idx] = entry
+
+    def __len__(self) -> int:
+        return sum(entry is not None for entry in self._slots)
+
+    def __repr__(self) -> str:
+        return f"TranspositionTable(size={self.size}, n_entries={len(self)})"
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    move: Move
+    score: float  # for player 1
+    depth: int
+    exact: bool
+    n_nodes: int
+
+
+class _Timeout(Exception):
+    """Time budget is used up"""
+
+
+class _Searcher:
+    def __init__(
+            self,
+            engine: Engine,
+            table: TranspositionTable,
+            evaluate: Optional[Callable[[Game], float]],
+            deadline: float = math.inf,
+    ) -> None:
+        self.engine = engine
+        self.table = table
+        self.evaluate = evaluate
+        self.deadline = deadline
+        self.n_nodes = 0
+
+    def _value(self, game: Game, score: float) -> float:
+        return score if game.player == 1 else 1.0 - score
+
+    def _ordered(self, moves: Sequence[Move], first: Optional[Move]) -> Sequence[Move]:
+        if (first is None) or (first not in moves):
+            return moves
+        return [first] + [move for move in moves if move != first]
+
+    def negamax(self, game: Game, depth: int, alpha: float, beta: float) -> Tuple[float, bool]:
+        """Value for the player to move and whether it is solved
+
+        Outside of (alpha, beta), the value is only a bound. A value is
+        solved if it, or the bound it stands for, does not depend on the
+        heuristic.
+
+        """
+        # pylint: disable=too-many-locals,too-many-branches
+        self.n_nodes += 1
+        if not self.n_nodes % CHECK_EVERY and (time.perf_counter() > self.deadline):
+            raise _Timeout
+
+        moves = self.engine.get_legal_moves(game)
+        if not moves:
+            return self._value(game, self.engine.game_score(game)), True
+
+        table = self.table
+        entry = table.get(game)
+        first = None
+        if entry is not None:
+            if entry.solved or (entry.depth >= depth):
+                value = entry.value
+                if (
+                        (entry.bound == EXACT)
+                        or ((entry.bound == LOWER) and (value >= beta))
+                        or ((entry.bound == UPPER) and (value <= alpha))
+                ):
+                    return value, entry.solved
+            first = entry.move
+
+        if not depth:
+            score = self.evaluate(game) if self.evaluate is not None else 0.5
+            return self._value(game, score), False
+
+        alpha_orig = alpha
+        best, best_solved, best_move = -1.0, False, None
+        all_solved = True
+        for move in self._ordered(moves, first):
+            child = self.engine.make_move(game, move)
+            value, solved = self.negamax(child, depth - 1, 1.0 - beta, 1.0 - alpha)
+            value = 1.0 - value
+            all_solved = all_solved and solved
+            if value > best:
+                best, best_solved, best_move = value, solved, move
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+
+        if best <= alpha_orig:
+            bound = UPPER
+        elif best >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        # a lower bound only depends on the move that reached it
+        solved = all_solved or (best_solved and ((bound == LOWER) or (best >= 1.0)))
+        table.put(Entry(
+            game=game,
+            depth=depth,
+            value=best,
+            bound=bound,
+            move=best_move,
+            solved=solved,
+            generation=table.generation,
+        ))
+        return best, solved
+
+    def root(
+            self,
+            game: Game,
+            depth: int,
+            moves: Sequence[Move],
+    ) -> List[Tuple[float, bool, Move]]:
+        """Values of the root moves, upper bounds for all but the best
+
+        Also returns whether each value is solved.
+
+        """
+        alpha = 0.0
+        values = []
+        for move in moves:
+            child = self.engine.make_move(game, move)
+            value, solved = self.negamax(child, depth - 1, 0.0, 1.0 - alpha)
+            values.append((1.0 - value, solved, move))
+            alpha = max(alpha, 1.0 - value)
+        return values
+
+
+def search(
+        game: Game,
+        engine: Engine,
+        time_budget: float = 1.0,
+        max_depth: Optional[int] = None,
+        evaluate: Optional[Callable[[Game], float]] = None,
+        table: Optional[TranspositionTable] = None,
+) -> SearchResult:
+    """Search deeper and deeper until time is up or the result is exact
+
+    The first depth is always completed, regardless of the time budget.
+    Uses the engine's ``evaluate`` if it has one and none is given.
+
+    """
+    moves = list(engine.get_legal_moves(game))
+    if not moves:
+        raise ValueError("Game is already over")
+    if (max_depth is not None) and (max_depth < 1):
+        raise ValueError("Maximum depth must be at least 1")
+
+    if evaluate is None:
+        evaluate = getattr(engine, 'evaluate', None)
+    if table is None:
+        table = TranspositionTable()
+    table.new_search()
+
+    deadline = time.perf_counter() + time_budget
+    searcher = _Searcher(engine=engine, table=table, evaluate=evaluate)
+    result: Optional[SearchResult] = None
+    depth = 1
+    while (max_depth is None) or (depth <= max_depth):
+        try:
+            values = searcher.root(game, depth=depth, moves=moves)
+        except _Timeout:
+            break
+
+        # stable, so equal moves keep the order of the previous depth
+        values.sort(key=lambda item: item[0], reverse=True)
+        moves = [move for _, _, move in values]
+        value, solved, _ = values[0]
+        # a proven win cannot be improved upon
+        exact = all(solved for _, solved, _ in values) or (solved and value >= 1.0)
+        result = SearchResult(
+            move=moves[0],
+            score=value if game.player == 1 else 1.0 - value,
+            depth=depth,
+            exact=exact,
+            n_nodes=searcher.n_nodes,
+        )
+        if exact:
+            break
+        searcher.deadline = deadline
+        depth += 1
+
+    assert result is not None
+    return result
@@ -0,0 +1,172 @@
+"""Opening book for ziczaczoe layouts
+
+Every position of the first few plies of a layout is searched once,
+offline and with many more iterations than during play. The visits and
+wins of the root moves are stored in a JSON file, so that an agent can
+answer covered positions without a search, the same way it would after
+the deep search.
+
+Positions are keyed by their cells, including the blocked ones, and the
+player to move. Boards from ``ai-generate-zzz-boards`` can be read from
+its tsv file.
+
+"""
+import csv
+from dataclasses import dataclass
+import json
+from multiprocessing import Pool
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from aidoodle.ai.mcts import Node, search_iteration
+from aidoodle.core import Game
+import aidoodle.games.ziczaczoe as zzz
+from aidoodle.rng import Rng
+
+
+PATH = 'zzz-book.json'  # default location, relative to the working directory
+VERSION = 1
+N_ITER = 20000  # search iterations per position
+N_PLIES = 2  # positions of the first plies that are covered
+
+CELLS = {' ': 0, 'x': 1, 'o': 2, '-': 9}
+
+# root move statistics: row, column, wins and visits of the edge
+Stats = Tuple[int, int, float, int]
+
+
+def key(game: Game) -> str:
+    board: zzz.Board = game.board  # type: ignore[assignment]
+    cells = ''.join(str(cell) for row in board.state for cell in row)
+    return f"{cells}/{int(game.player)}"
+
+
+def parse_board(s: str) -> zzz.Board:
+    """Inverse of the string representation of a board"""
+    rows = [line[2:] for line in s.strip('\n').splitlines()[1:]]
+    row0, row1, row2, row3, row4 = (
+        tuple(CELLS[c] for c in row.strip('|').split('|')) for row in rows)
+    return zzz.Board((row0, row1, row2, row3, row4))  # type: ignore[arg-type]
+
+
+def read_boards(path: str) -> List[zzz.Board]:
+    """Boards of the tsv file written by ``ai-generate-zzz-boards``"""
+    with open(path, newline='', encoding='utf-8') as f:
+        return [parse_board(row['board']) for row in csv.DictReader(f, delimiter='\t')]
+
+
+@dataclass(frozen=True)
+class Book:
+    n_iter: int
+    positions: Dict[str, Tuple[Stats, ...]]
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __contains__(self, game: Game) -> bool:
+        return key(game) in self.positions
+
+    def stats(self, game: Game) -> Optional[Tuple[Stats, ...]]:
+        return self.positions.get(key(game))
+
+    def best_move(self, game: Game) -> Optional[zzz.Move]:
+        """The most visited move of the search, None if not covered"""
+        stats = self.stats(game)
+        if not stats:
+            return None
+        i, j, _, _ = max(stats, key=lambda stat: stat[3])
+        return zzz.MOVES[(i, j)]
+
+
+def opening_positions(
+        boards: Iterable[zzz.Board],
+        n_plies: int = N_PLIES,
+) -> List[zzz.Game]:
+    """All distinct positions within the first plies, in order of the plies"""
+    games: List[zzz.Game] = []
+    seen: Set[zzz.Game] = set()
+    layer = [zzz.init_game(board=board) for board in boards]
+    for _ in range(n_plies):
+        children: List[zzz.Game] = []
+        for game in layer:
+            if game in seen or game.winner:
+                continue
+            seen.add(game)
+            games.append(game)
+            children.extend(
+                zzz.make_move(game, move) for move in zzz.get_legal_moves(game))
+        layer = children
+    return games
+
+
+def search(
+        game: zzz.Game,
+        n_iter: int = N_ITER,
+        rng: Optional[Rng] = None,
+) -> Tuple[Stats, ...]:
+    """Root move statistics of a search from game"""
+    root = Node(game=game)
+    cache: Dict[Game, Node] = {}
+    for _ in range(n_iter):
+        search_iteration(node=root, engine=zzz, cache=cache, rng=rng)  # type: ignore[arg-type]
+    return tuple(
+        (edge.move.i, edge.move.j, edge.w, edge.s)  # type: ignore[union-attr]
+        for edge in root.edges)
+
+
+def _search_job(job: Tuple[zzz.Game, int, np.random.SeedSequence]) -> Tuple[Stats, ...]:
+    game, n_iter, seed = job
+    return search(game, n_iter=n_iter, rng=Rng(seed))
+
+
+def build(
+        boards: Sequence[zzz.Board],
+        n_plies: int = N_PLIES,
+        n_iter: int = N_ITER,
+        processes: Optional[int] = None,
+        seed: Optional[int] = None,
+) -> Book:
+    """Search all opening positions of the boards in parallel
+
+    Uses as many worker processes as there are CPUs by default. Each
+    position gets its own random stream, so the book only depends on the
+    seed and not on the number of processes.
+
+    """
+    games = opening_positions(boards, n_plies=n_plies)
+    seeds = np.random.SeedSequence(seed).spawn(len(games))
+    jobs = [(game, n_iter, seed) for game, seed in zip(games, seeds)]
+    if processes == 1:
+        results = [_search_job(job) for job in jobs]
+    else:
+        with Pool(processes) as pool:
+            results = pool.map(_search_job, jobs, chunksize=1)
+
+    return Book(
+        n_iter=n_iter,
+        positions={key(game): stats for game, stats in zip(games, results)},
+    )
+
+
+def save(book: Book, path: str = PATH) -> None:
+    data = {
+        'version': VERSION,
+        'n_iter': book.n_iter,
+        'positions': {k: [list(stat) for stat in stats] for k, stats in book.positions.items()},
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def load(path: str = PATH) -> Book:
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('version') != VERSION:
+        raise ValueError(f"{path} is not an opening book of version {VERSION}")
+    return Book(
+        n_iter=data['n_iter'],
+        positions={
+            k: tuple((int(i), int(j), float(w), int(s)) for i, j, w, s in stats)
+            for k, stats in data['positions'].items()},
+    )
@@ -0,0 +1,115 @@
+"""Exact solution of dumbdice by dynamic programming
+
+A position is described from the perspective of the player to move:
+their score, the opponent's score, whether they already rerolled, and
+the sum of the dice. Continuing adds the sum to the player's score and
+hands the turn to the opponent, rerolling keeps the turn. Since every
+continue increases the sum of both scores, all positions can be solved
+in a single backward pass over the diagonals of constant total score,
+from the highest total down to zero.
+
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+
+import aidoodle.games.dumbdice as dice
+from aidoodle.vec.common import Array
+
+
+MAX_EYES = 12
+# probability of each sum of two dice, indexed by the sum
+P_EYES = np.bincount(
+    [i + j for i in range(1, 7) for j in range(1, 7)], minlength=MAX_EYES + 1) / 36.0
+EYES = np.arange(2, MAX_EYES + 1)
+
+
+@dataclass(frozen=True)
+class Solution:
+    target: int
+    # win probability of the player to move when continuing, by own
+    # score, opponent score and sum of the dice, shape (T, T, 13)
+    win_continue: Array
+    # win probability before the dice are rolled, by own and opponent
+    # score, shape (T, T), after a reroll and without one
+    win_rerolled: Array
+    win_fresh: Array
+
+    def win_probability(self, own: int, other: int, eyes: int, rerolled: bool) -> float:
+        """Win probability of the player to move when playing optimally"""
+        cont = self.win_continue[own, other, eyes]
+        if rerolled:
+            return float(cont)
+        return float(max(cont, self.win_rerolled[own, other]))
+
+    def rerolls(self, own: int, other: int, eyes: int) -> bool:
+        """Whether rerolling is strictly better than continuing"""
+        return bool(self.win_rerolled[own, other] > self.win_continue[own, other, eyes])
+
+
+@lru_cache(maxsize=None)
+def solve(target: int = dice.THRESHOLD) -> Solution:
+    t = target
+    win_continue = np.zeros((t, t, MAX_EYES + 1))
+    win_rerolled = np.zeros((t, t))
+    win_fresh = np.zeros((t, t))
+    p_eyes = P_EYES[EYES]
+
+    for total in range(2 * t - 2, -1, -1):
+        own = np.arange(max(0, total - t + 1), min(total, t - 1) + 1)
+        other = total - own
+
+        # continuing wins at once or leaves the opponent to move
+        own_after = own[:, None] + EYES[None, :]
+        cont = np.where(
+            own_after >= t,
+            1.0,
+            1.0 - win_fresh[other[:, None], np.minimum(own_after, t - 1)],
+        )
+        win_continue[own, other, 2:] = cont
+
+        # after a reroll, the player has to continue with the new dice
+        rerolled = cont @ p_eyes
+        win_rerolled[own, other] = rerolled
+        win_fresh[own, other] = np.maximum(cont, rerolled[:, None]) @ p_eyes
+
+    return Solution(
+        target=target,
+        win_continue=win_continue,
+        win_rerolled=win_rerolled,
+        win_fresh=win_fresh,
+    )
+
+
+def _position(game: dice.Game) -> Tuple[Solution, int, int, int]:
+    s0, s1, target = game.board.state
+    own, other = (s0, s1) if game.player == 1 else (s1, s0)
+    eyes = sum(die.eye for die in game.board.dice)
+    return solve(target), own, other, eyes
+
+
+def evaluate(game: dice.Game) -> float:
+    """Exact score for player 1 under optimal play of both players
+
+    Can be used as the simulator of MCTS.
+
+    """
+    if game.winner:
+        return dice.game_score(game)
+
+    solution, own, other, eyes = _position(game)
+    p_win = solution.win_probability(own, other, eyes, game.board.rerolled)
+    return p_win if game.player == 1 else 1.0 - p_win
+
+
+def best_move(game: dice.Game) -> dice.Move:
+    """The optimal move, continue if both moves are equally good"""
+    if game.winner:
+        raise ValueError("Game is already over")
+
+    solution, own, other, eyes = _position(game)
+    if not game.board.rerolled and solution.rerolls(own, other, eyes):
+        return dice.MOVES['r']
+    return dice.MOVES['c']
@@ -0,0 +1,152 @@
+"""Expectimax search for engines with chance
+
+Engines with randomness define ``get_chance_outcomes(game, move)``,
+which returns each game the move can lead to with its probability. For
+other engines, a move has a single outcome.
+
+Values are scores for player 1 in [0, 1]. Player 1 maximizes and
+player 2 minimizes them, no matter how the turns alternate, and chance
+nodes average them. The depth counts decisions. Positions at the depth
+limit that are not over are scored by a heuristic ``evaluate(game)``,
+the engine's if it has one, and otherwise count as a draw.
+
+Values of decision nodes are memoized by game, together with the depth
+they were searched to, in a cache of fixed size that can be shared
+across moves.
+
+"""
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from aidoodle.core import Engine, Game, Move
+
+
+DEPTH = 3  # default number of decisions searched
+CACHE_SIZE = 2 ** 16  # default number of slots of the cache
+
+Outcomes = Sequence[Tuple[float, Game]]
+# game, value, depth and generation of a searched game
+_Slot = Tuple[Game, float, int, int]
+
+
+class Cache:
+    """Fixed number of slots for values of searched games, indexed by hash
+
+    Like the transposition table of alpha-beta, a new value replaces
+    the value in its slot if that value is from an earlier search, or
+    if it was searched at most as deep. Otherwise, the new value is
+    dropped.
+
+    """
+    def __init__(self, size: int = CACHE_SIZE) -> None:
+        if size < 1:
+            raise ValueError("Cache needs at least one slot")
+        self.size = size
+        self.generation = 0
+        self._slots: List[Optional[_Slot]] = [None] * size
+
+    def new_search(self) -> None:
+        self.generation += 1
+
+    def get(self, game: Game) -> Optional[Tuple[float, int]]:
+        """Value and depth of the game if it is cached"""
+        slot = self._slots[hash(game) % self.size]
+        if (slot is None) or (slot[0] != game):
+            return None
+        return slot[1], slot[2]
+
+    def put(self, game: Game, value: float, depth: int) -> None:
+        idx = hash(game) % self.size
+        old = self._slots[idx]
+        if (old is None) or (old[3] != self.generation) or (old[2] <= depth):
+            self._slots[idx] = (game, value, depth, self.generation)
+
+    def __len__(self) -> int:
+        return sum(slot is not None for slot in self._slots)
+
+    def __repr__(self) -> str:
+        return f"Cache(size={self.size}, n_entries={len(self)})"
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    move: Move
+    score: float  # for player 1
+    n_nodes: int
+
+
+def chance_outcomes(game: Game, move: Move, engine: Engine) -> Outcomes:
+    get_chance_outcomes: Optional[Callable[[Game, Move], Outcomes]] = getattr(
+        engine, 'get_chance_outcomes', None)
+    if get_chance_outcomes is None:
+        return ((1.0, engine.make_move(game, move)),)
+    return get_chance_outcomes(game, move)
+
+
+class _Searcher:
+    def __init__(
+            self,
+            engine: Engine,
+            evaluate: Optional[Callable[[Game], float]],
+            cache: Cache,
+    ) -> None:
+        self.engine = engine
+        self.evaluate = evaluate
+        self.cache = cache
+        self.n_nodes = 0
+
+    def expected(self, game: Game, move: Move, depth: int) -> float:
+        """Average value of the games the move leads to"""
+        return sum(
+            p * self.value(child, depth - 1)
+            for p, child in chance_outcomes(game, move, engine=self.engine))
+
+    def value(self, game: Game, depth: int) -> float:
+        self.n_nodes += 1
+        moves = self.engine.get_legal_moves(game)
+        if not moves:
+            return self.engine.game_score(game)
+        if not depth:
+            return self.evaluate(game) if self.evaluate is not None else 0.5
+
+        cached = self.cache.get(game)
+        if (cached is not None) and (cached[1] >= depth):
+            return cached[0]
+
+        values = [self.expected(game, move, depth) for move in moves]
+        value = max(values) if game.player == 1 else min(values)
+        self.cache.put(game, value, depth)
+        return value
+
+
+def search(
+        game: Game,
+        engine: Engine,
+        depth: int = DEPTH,
+        evaluate: Optional[Callable[[Game], float]] = None,
+        cache: Optional[Cache] = None,
+) -> SearchResult:
+    """Best move for the player to move, searching the given number of decisions
+
+    Uses the engine's ``evaluate`` if it has one and none is given.
+    Cached values of games that were searched at least as deep are
+    reused.
+
+    """
+    moves = engine.get_legal_moves(game)
+    if not moves:
+        raise ValueError("Game is already over")
+    if depth < 1:
+        raise ValueError("Depth must be at least 1")
+
+    if evaluate is None:
+        evaluate = getattr(engine, 'evaluate', None)
+    if cache is None:
+        cache = Cache()
+    cache.new_search()
+    searcher = _Searcher(engine=engine, evaluate=evaluate, cache=cache)
+
+    sign = 1.0 if game.player == 1 else -1.0
+    values = [searcher.expected(game, move, depth) for move in moves]
+    best = max(range(len(moves)), key=lambda i: sign * values[i])
+    return SearchResult(move=moves[best], score=values[best], n_nodes=searcher.n_nodes)
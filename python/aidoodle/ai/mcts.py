@@ -1,10 +1,16 @@
 from dataclasses import dataclass, field
 import enum
+from heapq import heapify, heapreplace
 import math
 import random
-from typing import List, Optional, Union, Iterable, TypeVar, Dict
+from typing import (
+    Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple, TypeVar, Union,
+)
+from typing_extensions import Protocol
 
-from aidoodle.core import Engine, Game, Move, Player
+from aidoodle.core import Engine, Game, Move, Player, Rollout
+from aidoodle.rng import Rng, randrange
+from aidoodle.utils import Interner
 
 
 C = math.sqrt(2)  # from literature
@@ -16,20 +22,130 @@ Numeric = Union[float, int]
 T = TypeVar('T')
 
 
+class Stats(Protocol):
+    w: float
+    s: int
+
+
+S = TypeVar('S', bound=Stats)
+
+
+class Oracle(Protocol):
+    """Exact scores of solved positions, e.g. from an endgame database"""
+    # positions with more legal moves are never solved
+    max_moves: int
+
+    def probe(self, game: Game) -> Optional[float]:
+        """Score for player 1, None if the position is not solved"""
+
+
 @dataclass
 class Edge:
     move: Move
     w: float = 0.0
     s: int = 0
+    # heuristic minimax value of the position after the move, for the
+    # player making the move, only set by implicit minimax backups
+    v: Optional[float] = None
 
     def __repr__(self) -> str:
         return f"Edge({self.move}, w={self.w}, s={self.s})"
 
 
+class EdgeHeap:
+    """Max-heap of edges keyed by their UCB1 values
+
+    Used instead of scanning all edges at wide nodes, so that selection
+    takes O(log b) amortized for b edges. Edges must only be visited
+    after being selected from this heap.
+
+    An edge's key is refreshed lazily the next time it surfaces after
+    having been visited. The exploration term of all other edges is
+    refreshed by rebuilding the heap once log(s_tot + 1) has grown by
+    more than the relative tolerance tol since the last rebuild. With
+    tol=0, selection is identical to ``select_ucb1``, or to
+    ``select_ucb1_minimax`` with a minimax weight.
+
+    """
+    def __init__(
+            self,
+            edges: List[Edge],
+            c: float = C,
+            tol: float = 0.05,
+            minimax_weight: float = 0.0,
+    ) -> None:
+        self.edges = edges
+        self.c = c
+        self.tol = tol
+        self.minimax_weight = minimax_weight
+        self.s_tot = sum(edge.s for edge in edges)
+        self._const = 0.0
+        # entries are (-ucb1 value, edge index, edge visits at push)
+        self._heap: List[Tuple[float, int, int]] = []
+        self._rebuild(c * math.log(self.s_tot + 1))
+
+    def _key(self, i: int) -> Tuple[float, int, int]:
+        e = self.edges[i]
+        val = _mix(e, self.minimax_weight) + self._const / math.sqrt(e.s + EPS)
+        return -val, i, e.s
+
+    def _rebuild(self, const: float) -> None:
+        self._const = const
+        self._heap = [self._key(i) for i in range(len(self.edges))]
+        heapify(self._heap)
+
+    def select(self) -> Edge:
+        const = self.c * math.log(self.s_tot + 1)
+        if const > self._const * (1 + self.tol):
+            self._rebuild(const)
+
+        heap = self._heap
+        while True:
+            _, i, s = heap[0]
+            edge = self.edges[i]
+            if edge.s == s:
+                break
+            heapreplace(heap, self._key(i))
+
+        self.s_tot += 1
+        return edge
+
+    def __repr__(self) -> str:
+        return f"EdgeHeap(n_edges={len(self.edges)}, s_tot={self.s_tot})"
+
+
+@dataclass
+class EdgeGroup:
+    """Edges whose moves belong to the same group, e.g. the same heap"""
+    key: Hashable
+    edges: List[Edge] = field(default_factory=list)
+    w: float = 0.0
+    s: int = 0
+
+    def __repr__(self) -> str:
+        return f"EdgeGroup({self.key}, n_edges={len(self.edges)}, w={self.w}, s={self.s})"
+
+
 @dataclass
 class Node:
     game: Game
     edges: List[Edge] = field(default_factory=list)
+    # only set for hierarchical search, partitions the edges
+    groups: List[EdgeGroup] = field(default_factory=list)
+    # legal moves, set on expansion; edges[i] always belongs to moves[i]
+    moves: Optional[Sequence[Move]] = None
+    # only set for wide nodes, see EdgeHeap
+    heap: Optional[EdgeHeap] = field(default=None, repr=False)
+    # exact score for player 1 if solved by an oracle, the node is then
+    # treated like a terminal node
+    value: Optional[float] = None
+
+    @property
+    def n_untried(self) -> int:
+        """Number of legal moves without an edge yet"""
+        if self.moves is None:
+            return 0
+        return len(self.moves) - len(self.edges)
 
     def __repr__(self) -> str:
         g = str(hash(self.game) % 1000) + '..'
@@ -41,6 +157,7 @@ class Node:
 
 _Players = List[Player]
 _Edges = List[Edge]
+_Path = List[Stats]
 _Nodes = List[Node]
 Cache = Dict[Game, Node]
 MaybeNode = Optional[Node]
@@ -55,58 +172,218 @@ def _selectmax(keys: Iterable[T], vals: Iterable[Numeric]) -> T:
     return max(zip(keys, vals), key=lambda tup: tup[1])[0]
 
 
-def _ucb1_values(edges: _Edges, c: float = C) -> List[float]:
+def _ucb1_values(edges: Sequence[Stats], c: float = C) -> List[float]:
     s_tot = sum(edge.s for edge in edges)
     const = c * math.log(s_tot + 1)
     vals = [e.w / (e.s + EPS) + const / math.sqrt(e.s + EPS) for e in edges]
     return vals
 
 
-def select_ucb1(edges: _Edges, c: float = C) -> Edge:
+def select_ucb1(edges: Sequence[S], c: float = C) -> S:
     vals = _ucb1_values(edges=edges, c=c)
     edge = _selectmax(edges, vals)
     return edge
 
 
-def select(edges: _Edges, strategy: Strategy = Strategy.ucb1) -> Edge:
+def _mix(edge: Edge, weight: float) -> float:
+    """Win rate mixed with the heuristic minimax value, if there is one"""
+    q = edge.w / (edge.s + EPS)
+    if (not weight) or (edge.v is None):
+        return q
+    return (1.0 - weight) * q + weight * edge.v
+
+
+def select_ucb1_minimax(edges: Sequence[Edge], weight: float, c: float = C) -> Edge:
+    """UCB1 with implicit minimax backups, i.e. on the mixed values"""
+    s_tot = sum(edge.s for edge in edges)
+    const = c * math.log(s_tot + 1)
+    vals = [_mix(e, weight) + const / math.sqrt(e.s + EPS) for e in edges]
+    return _selectmax(edges, vals)
+
+
+def select(
+        edges: Sequence[S],
+        strategy: Strategy = Strategy.ucb1,
+        rng: Optional[Rng] = None,
+) -> S:
     if strategy == Strategy.random:
-        return random.choice(edges)
+        return rng.choice(edges) if rng is not None else random.choice(edges)
     if strategy == Strategy.ucb1:
         return select_ucb1(edges)
     raise ValueError("Unknown strategy")
 
 
-def choose_edge(edges: _Edges) -> Edge:
+def choose_edge(edges: Sequence[S]) -> S:
     edge = _selectmax(edges, (e.s for e in edges))
     if VERBOSE:
         print(f"Number of visits: {edge.s}, wins: {100*edge.w/edge.s:.1f}%")
     return edge
 
 
-def expand(node: Node, engine: Engine) -> None:
+def _group_edges(
+        edges: _Edges,
+        get_move_group: Callable[[Move], Hashable],
+) -> List[EdgeGroup]:
+    groups: Dict[Hashable, EdgeGroup] = {}
+    for edge in edges:
+        key = get_move_group(edge.move)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = EdgeGroup(key)
+        group.edges.append(edge)
+    return list(groups.values())
+
+
+def choose_node_edge(node: Node) -> Edge:
+    """Choose the most visited edge, within the most visited group if any"""
+    if not node.groups:
+        return choose_edge(node.edges)
+    return choose_edge(choose_edge(node.groups).edges)
+
+
+def expand(
+        node: Node,
+        engine: Engine,
+        hierarchical: bool = False,
+        lazy: bool = False,
+) -> None:
+    """Add an edge for each legal move of the node
+
+    If hierarchical is True and the engine defines
+    ``get_move_group(move)``, the edges are also partitioned into
+    groups, so that selection can first choose a group and then a move
+    within that group.
+
+    If lazy is True, only the legal moves are stored and the edge of a
+    move is created when the move is tried for the first time. This
+    does not apply to hierarchical nodes.
+
+    """
     # Careful: if a move is the identity move, there will be an
     # infinite recursion
-    moves: List[Move] = engine.get_legal_moves(node.game)
-    edges = [Edge(move) for move in moves]
+    moves: Sequence[Move] = engine.get_legal_moves(node.game)
     assert not node.edges
+    node.moves = moves
+
+    get_move_group = getattr(engine, 'get_move_group', None) if hierarchical else None
+    if lazy and (get_move_group is None):
+        # a private copy, untried moves are reordered when drawn at random
+        node.moves = list(moves)
+        return
+
+    edges = [Edge(move) for move in moves]
     node.edges = edges
+    if get_move_group is not None:
+        node.groups = _group_edges(edges, get_move_group)
+
+
+def _add_untried_edge(node: Node, strategy: Strategy, rng: Optional[Rng] = None) -> Edge:
+    """Create the edge of the next untried move
+
+    With the random strategy, the move is drawn from all untried moves
+    and swapped into the position of the new edge.
+
+    """
+    moves = node.moves
+    assert moves is not None
+    n = len(node.edges)
+    if strategy == Strategy.random:
+        assert isinstance(moves, list)
+        k = n + randrange(len(moves) - n, rng=rng)
+        moves[n], moves[k] = moves[k], moves[n]
+    edge = Edge(moves[n])
+    node.edges.append(edge)
+    return edge
+
+
+def _select_edge(
+        node: Node,
+        strategy: Strategy,
+        heap_width: Optional[int] = None,
+        rng: Optional[Rng] = None,
+        minimax_weight: float = 0.0,
+) -> Tuple[Optional[EdgeGroup], Edge]:
+    """Select the next edge, first selecting its group if there are groups
+
+    With a minimax weight, ucb1 selects edges, but not groups, on their
+    win rates mixed with their heuristic minimax values.
+
+    """
+    if node.n_untried:
+        # a lazily expanded node tries each move once before the strategy
+        # applies; ucb1 would do the same, so it tries them in order
+        return None, _add_untried_edge(node, strategy=strategy, rng=rng)
+
+    minimax = minimax_weight and (strategy == Strategy.ucb1)
+    if not node.groups:
+        use_heap = (
+            (strategy == Strategy.ucb1)
+            and (heap_width is not None)
+            and (len(node.edges) >= heap_width)
+        )
+        if use_heap:
+            if node.heap is None:
+                node.heap = EdgeHeap(node.edges, minimax_weight=minimax_weight)
+            return None, node.heap.select()
+        if minimax:
+            return None, select_ucb1_minimax(node.edges, weight=minimax_weight)
+        return None, select(node.edges, strategy=strategy, rng=rng)
+
+    group = select(node.groups, strategy=strategy, rng=rng)
+    if minimax:
+        return group, select_ucb1_minimax(group.edges, weight=minimax_weight)
+    return group, select(group.edges, strategy=strategy, rng=rng)
+
+
+def simulate(
+        game: Game,
+        engine: Engine,
+        rng: Optional[Rng] = None,
+        oracle: Optional[Oracle] = None,
+) -> float:
+    """Score for player 1 of a random playout
+
+    The playout stops early with the exact score once it reaches a
+    position solved by the oracle.
 
+    """
+    if not engine.get_legal_moves(game):
+        # re-initializing would lose state, e.g. the initial board of battle
+        return engine.game_score(game)
 
-def simulate(game: Game, engine: Engine) -> float:
     # init a game with random players
     game = engine.init_game(
         board=game.board,
         player_idx=game.player_idx,
     )
 
+    choice = rng.choice if rng is not None else random.choice
+    init_rollout = getattr(engine, 'init_rollout', None)
+    if (init_rollout is not None) and not VERBOSE:
+        # play out in place instead of creating a game per ply
+        rollout: Rollout = init_rollout(game)
+        while not rollout.winner:
+            moves = rollout.legal_moves()
+            if (oracle is not None) and (len(moves) <= oracle.max_moves):
+                value = oracle.probe(rollout.to_game())
+                if value is not None:
+                    return value
+            rollout.push(choice(moves))
+        return rollout.score()
+
     if VERBOSE:
         print("-" * 40)
         print(game.board)
 
     while not game.winner:
+        moves = engine.get_legal_moves(game)
+        if (oracle is not None) and (len(moves) <= oracle.max_moves):
+            value = oracle.probe(game)
+            if value is not None:
+                return value
         # by default uses random play
-        move = random.choice(engine.get_legal_moves(game))
-        game = engine.make_move(game=game, move=move)
+        move = choice(moves)
+        game = engine.make_move(game=game, move=move, rng=rng)
 
     if VERBOSE:
         print(game.board, end=' ')
@@ -116,14 +393,14 @@ def simulate(game: Game, engine: Engine) -> float:
     return score
 
 
-def _update_edge(edge: Edge, value: float) -> None:
+def _update_edge(edge: Stats, value: float) -> None:
     edge.s += 1
     edge.w += value
 
 
 
 COUNTER = 0
-def update(edges: _Edges, players: _Players, value: float) -> None:
+def update(edges: Sequence[Stats], players: _Players, value: float) -> None:
     value_other = 1 - value
     for edge, player in zip(edges, players):
         if player == 1:
@@ -132,6 +409,22 @@ def update(edges: _Edges, players: _Players, value: float) -> None:
             _update_edge(edge=edge, value=value_other)
 
 
+def backup_minimax(path: Sequence[Tuple[Node, Edge]], value: float) -> None:
+    """Back up the heuristic value of a leaf with minimax
+
+    The path holds each node with the edge taken from it, and the value
+    is the score for player 1 of the position after the last edge. Each
+    edge gets the value of the position it leads to, and a node is worth
+    its best edge. With chance, that is the position reached last.
+
+    """
+    for node, edge in reversed(path):
+        is_player1 = node.game.player == 1
+        edge.v = value if is_player1 else 1.0 - value
+        best = max(e.v for e in node.edges if e.v is not None)
+        value = best if is_player1 else 1.0 - best
+
+
 def _retrieve_node(game: Game, cache: Cache) -> Node:
     maybe_node: MaybeNode = cache.get(game)
     if maybe_node is not None:
@@ -147,17 +440,51 @@ def search_iteration(
         engine: Engine,
         cache: Cache,
         strategy: Strategy = Strategy.ucb1,
+        hierarchical: bool = False,
+        lazy: bool = False,
+        heap_width: Optional[int] = None,
+        interner: Optional[Interner[Game]] = None,
+        simulator: Optional[Callable[[Game], float]] = None,
+        oracle: Optional[Oracle] = None,
+        rng: Optional[Rng] = None,
+        minimax_weight: float = 0.0,
+        evaluate: Optional[Callable[[Game], float]] = None,
 ) -> None:
+    """Select, expand, simulate and update once
+
+    With a minimax weight > 0, the heuristic ``evaluate(game)``, the
+    engine's if None, scores the leaf of each iteration for player 1.
+    Its value is backed up with minimax and mixed into the selection
+    with that weight (implicit minimax backups).
+
+    """
+    # pylint: disable=too-many-arguments,too-many-locals,too-many-branches,too-many-statements
+    if minimax_weight and (evaluate is None):
+        evaluate = getattr(engine, 'evaluate', None)
+        if evaluate is None:
+            raise ValueError("Implicit minimax backups need an evaluate function")
+
     cache[node.game] = node
-    edges: _Edges = []
+    # edges and edge groups along the path, with their players
+    edges: _Path = []
     players: _Players = []
+    # nodes along the path, with the edge taken from them
+    path: List[Tuple[Node, Edge]] = []
 
     # selection
-    while node.edges:
-        edge = select(node.edges, strategy=strategy)
+    while node.edges or node.n_untried:
+        group, edge = _select_edge(
+            node, strategy=strategy, heap_width=heap_width, rng=rng,
+            minimax_weight=minimax_weight)
+        if group is not None:
+            edges.append(group)
+            players.append(node.game.player)
         edges.append(edge)
         players.append(node.game.player)
-        game = engine.make_move(game=node.game, move=edge.move)
+        path.append((node, edge))
+        game = engine.make_move(game=node.game, move=edge.move, rng=rng)
+        if interner is not None:
+            game = interner(game)
         node = _retrieve_node(game=game, cache=cache)  # updates cache if necessary
 
         if len(edges) > MAX_DEPTH:
@@ -165,19 +492,45 @@ def search_iteration(
                                "are there cycles in the game tree?")
 
     # expansion
-    expand(node, engine=engine)
-
-    if node.edges:  # game end not reached
+    if node.moves is None:  # terminal and solved nodes are already expanded
+        if (oracle is not None) and edges:  # the root is never solved
+            node.value = oracle.probe(node.game)
+        if node.value is None:
+            expand(node, engine=engine, hierarchical=hierarchical, lazy=lazy)
+        else:
+            node.moves = ()
+
+    if node.moves:  # game end not reached
         # -> choose random move
-        edge = random.choice(node.edges)
-        game = engine.make_move(game=node.game, move=edge.move)
+        group, edge = _select_edge(node, strategy=Strategy.random, rng=rng)
+        game = engine.make_move(game=node.game, move=edge.move, rng=rng)
+        if interner is not None:
+            game = interner(game)
+        if group is not None:
+            edges.append(group)
+            players.append(game.player)
         edges.append(edge)
         players.append(game.player)
+        path.append((node, edge))
     else:  # end state reached
         game = node.game
 
     # simulate
-    value = simulate(game, engine=engine)
+    if node.value is not None:
+        value = node.value
+    elif simulator is None:
+        value = simulate(game, engine=engine, rng=rng, oracle=oracle)
+    else:
+        value = simulator(game)
 
     # update
     update(edges, players=players, value=value)
+    if minimax_weight and path:
+        if node.value is not None:
+            leaf = node.value
+        elif not engine.get_legal_moves(game):
+            leaf = engine.game_score(game)
+        else:
+            assert evaluate is not None
+            leaf = evaluate(game)
+        backup_minimax(path, value=leaf)
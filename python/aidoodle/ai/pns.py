@@ -0,0 +1,204 @@
+"""Proof-number search for deterministic two player games
+
+Depth-first proof-number search (df-pn) proves or disproves that the
+player to move reaches at least a target score against any defense.
+Proof and disproof numbers are kept in a node table with a fixed number
+of slots, so memory does not grow with the search. Entries that are
+lost to collisions are searched again when needed.
+
+The outcome of a position takes up to two proofs: whether the player to
+move wins, and if not, whether they avoid losing. The search gives up
+after a maximum number of expanded nodes, and the outcome is unknown.
+
+"""
+from dataclasses import dataclass
+import enum
+from typing import List, Optional, Tuple
+
+from aidoodle.core import Engine, Game
+from aidoodle.utils import slotted
+
+
+TABLE_SIZE = 2 ** 18  # default number of slots of the node table
+MAX_NODES = 100000  # default number of expanded nodes per outcome
+INF = 2 ** 40  # proof or disproof number of a solved node
+
+
+class Outcome(enum.Enum):
+    """For the player to move"""
+    loss = 0
+    draw = 1
+    win = 2
+    unknown = 3
+
+
+@slotted
+@dataclass(frozen=True)
+class Entry:
+    game: Game
+    pn: int
+    dn: int
+    # number of nodes expanded below this one
+    work: int
+
+
+class NodeTable:
+    """Fixed number of slots, indexed by the hash of the game
+
+    A new entry replaces the entry in its slot if that entry is of the
+    same game or took at most as much work.
+
+    """
+    def __init__(self, size: int = TABLE_SIZE) -> None:
+        if size < 1:
+            raise ValueError("Table needs at least one slot")
+        self.size = size
+        self._slots: List[Optional[Entry]] = [None] * size
+
+    def get(self, game: Game) -> Optional[Entry]:
+        entry = self._slots[hash(game) % self.size]
+        if (entry is None) or (entry.game != game):
+            return None
+        return entry
+
+    def put(self, entry: Entry) -> None:
+        idx = hash(entry.game) % self.size
+        old = self._slots[idx]
+        if (old is None) or (old.game == entry.game) or (old.work <= entry.work):
+            self._slots[idx] = entry
+
+    def __len__(self) -> int:
+        return sum(entry is not None for entry in self._slots)
+
+    def __repr__(self) -> str:
+        return f"NodeTable(size={self.size}, n_entries={len(self)})"
+
+
+class _BudgetExceeded(Exception):
+    """Maximum number of expanded nodes is reached"""
+
+
+class _Prover:
+    def __init__(
+            self,
+            engine: Engine,
+            game: Game,
+            target: float,
+            table: NodeTable,
+            max_nodes: int,
+    ) -> None:
+        # pylint: disable=too-many-arguments
+        self.engine = engine
+        self.player = game.player
+        self.target = target
+        self.table = table
+        self.max_nodes = max_nodes
+        self.n_nodes = 0
+
+    def _score(self, game: Game) -> float:
+        """Score of a finished game for the proving player"""
+        score = self.engine.game_score(game)
+        return score if self.player == 1 else 1.0 - score
+
+    def numbers(self, game: Game) -> Tuple[int, int]:
+        """Proof and disproof number of a game that was not expanded here"""
+        entry = self.table.get(game)
+        if entry is not None:
+            return entry.pn, entry.dn
+        if not self.engine.get_legal_moves(game):
+            return (0, INF) if self._score(game) >= self.target else (INF, 0)
+        return 1, 1
+
+    def mid(self, game: Game, th_pn: int, th_dn: int) -> Tuple[int, int]:
+        """Expand game until its numbers reach one of the thresholds"""
+        # pylint: disable=too-many-locals
+        self.n_nodes += 1
+        if self.n_nodes > self.max_nodes:
+            raise _BudgetExceeded
+
+        start = self.n_nodes
+        children = [self.engine.make_move(game, move)
+                    for move in self.engine.get_legal_moves(game)]
+        # kept here as well, since the table may drop them
+        numbers = [self.numbers(child) for child in children]
+        is_or = game.player == self.player
+
+        while True:
+            pns = [pn for pn, _ in numbers]
+            dns = [dn for _, dn in numbers]
+            if is_or:
+                pn, dn = min(pns), min(sum(dns), INF)
+            else:
+                pn, dn = min(sum(pns), INF), min(dns)
+            if (pn >= th_pn) or (dn >= th_dn):
+                break
+
+            # the child with the smallest number of the node's type
+            own = pns if is_or else dns
+            idx = min(range(len(own)), key=own.__getitem__)
+            second = min((x for i, x in enumerate(own) if i != idx), default=INF)
+            child_pn, child_dn = numbers[idx]
+            if is_or:
+                th_child = (min(th_pn, second + 1), th_dn - dn + child_dn)
+            else:
+                th_child = (th_pn - pn + child_pn, min(th_dn, second + 1))
+            numbers[idx] = self.mid(children[idx], *th_child)
+
+        self.table.put(Entry(game=game, pn=pn, dn=dn, work=self.n_nodes - start + 1))
+        return pn, dn
+
+
+def prove(
+        game: Game,
+        engine: Engine,
+        target: float,
+        max_nodes: int = MAX_NODES,
+        table_size: int = TABLE_SIZE,
+) -> Tuple[Optional[bool], int]:
+    """Whether the player to move can reach at least the target score
+
+    Also returns the number of expanded nodes. The result is None if
+    the search gives up.
+
+    """
+    prover = _Prover(
+        engine=engine,
+        game=game,
+        target=target,
+        table=NodeTable(table_size),
+        max_nodes=max_nodes,
+    )
+    try:
+        pn, _ = prover.mid(game, INF, INF)
+    except _BudgetExceeded:
+        return None, prover.n_nodes
+    return pn == 0, prover.n_nodes
+
+
+def solve(
+        game: Game,
+        engine: Engine,
+        max_nodes: int = MAX_NODES,
+        table_size: int = TABLE_SIZE,
+) -> Outcome:
+    """Game-theoretic outcome for the player to move
+
+    The maximum number of expanded nodes is shared by both proofs.
+
+    """
+    if not engine.get_legal_moves(game):
+        raise ValueError("Game is already over")
+
+    wins, n_nodes = prove(
+        game, engine=engine, target=1.0, max_nodes=max_nodes, table_size=table_size)
+    if wins is None:
+        return Outcome.unknown
+    if wins:
+        return Outcome.win
+
+    draws, _ = prove(
+        game, engine=engine, target=0.5, max_nodes=max_nodes - n_nodes,
+        table_size=table_size)
+    if draws is None:
+        return Outcome.unknown
+    return Outcome.draw if draws else Outcome.loss
@@ -0,0 +1,251 @@
+"""Endgame database for ziczaczoe by retrograde analysis
+
+For each board layout, all positions with at most ``k`` empty cells
+that have no three in a row yet and could occur in a game are
+enumerated and solved, starting from the positions with a single empty
+cell. A position with ``e`` empty cells only leads to positions with
+``e - 1`` empty cells, which are already solved at that point.
+
+Positions are keyed by the board, 2 bits per cell (empty, player 1,
+player 2 or blocked), and the player to move. The file holds a magic
+header, k and a sorted array of little endian uint64 entries, each
+being the key followed by 2 bits for the value for the player to move
+(0 loss, 1 draw, 2 win). Since the key covers the blocked cells,
+positions of several layouts can share a file. The file is memory
+mapped when loaded and positions are looked up by bisection.
+
+"""
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+import os
+import mmap
+import struct
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from aidoodle.core import Game
+import aidoodle.games.ziczaczoe as zzz
+
+
+PATH = 'ziczaczoe.edb'  # default location, relative to the working directory
+MAGIC = b'ZZE1'
+HEADER = struct.Struct('<4sI')
+K = 2  # default maximum number of empty cells
+N = 5
+BLOCKED = 9
+# 2 bit code of each cell value
+CELL_CODES = (0, 1, 2, 0, 0, 0, 0, 0, 0, 3)
+# distinct premade layouts, i.e. their blocked cells
+LAYOUTS: Tuple[zzz.Board, ...] = tuple(
+    zzz.Board(state) for state in sorted(set(zzz.STATES)))
+
+_Position = Tuple[int, int]  # bitmasks of the cells of player 1 and 2
+
+
+def _bit(i: int, j: int) -> int:
+    return 1 << (N * i + j)
+
+
+def _spread(mask: int) -> int:
+    """Move bit n of mask to bit 2n"""
+    spread = 0
+    for n in range(mask.bit_length()):
+        if (mask >> n) & 1:
+            spread |= 1 << (2 * n)
+    return spread
+
+
+def key(game: Game) -> int:
+    board: zzz.Board = game.board  # type: ignore[assignment]
+    code = 0
+    for row in reversed(board.state):
+        for cell in reversed(row):
+            code = (code << 2) | CELL_CODES[cell]
+    return (code << 1) | int(game.player == 2)
+
+
+def _free_cells(board: zzz.Board) -> List[Tuple[int, int]]:
+    return [(i, j) for i in range(N) for j in range(N) if board.state[i][j] != BLOCKED]
+
+
+def _lines(free: List[Tuple[int, int]]) -> List[Tuple[Tuple[int, int], ...]]:
+    """All three in a rows that can be completed on the free cells"""
+    cells = set(free)
+    lines = []
+    for i, j in free:
+        for di, dj in zzz.DIRECTIONS:
+            line = tuple((i + s * di, j + s * dj) for s in range(3))
+            if all(cell in cells for cell in line):
+                lines.append(line)
+    return lines
+
+
+def enumerate_positions(board: zzz.Board, k: int = K) -> List[List[_Position]]:
+    """Positions without three in a row, by their number of empty cells
+
+    Only the free cells of the board are used. The numbers of stones of
+    both players differ by at most one. The positions with no empty
+    cell are not included.
+
+    """
+    free = _free_cells(board)
+    bits = [_bit(i, j) for i, j in free]
+    order = {cell: n for n, cell in enumerate(free)}
+    # lines by the free cell that comes last, so that each line is
+    # checked as soon as all of its cells are filled
+    completed_by: List[List[int]] = [[] for _ in free]
+    for line in _lines(free):
+        last = max(order[cell] for cell in line)
+        completed_by[last].append(sum(bits[order[cell]] for cell in line))
+
+    n_free = len(free)
+    layers: List[List[_Position]] = [[] for _ in range(k + 1)]
+
+    def fill(n: int, p1: int, p2: int, n_empty: int, diff: int) -> None:
+        # pylint: disable=too-many-arguments
+        if abs(diff) > n_free - n + 1:
+            return
+        if n == n_free:
+            if n_empty and (abs(diff) <= 1):
+                layers[n_empty].append((p1, p2))
+            return
+
+        bit = bits[n]
+        if n_empty < k:
+            fill(n + 1, p1, p2, n_empty + 1, diff)
+        q1, q2 = p1 | bit, p2 | bit
+        if not any(q1 & line == line for line in completed_by[n]):
+            fill(n + 1, q1, p2, n_empty, diff + 1)
+        if not any(q2 & line == line for line in completed_by[n]):
+            fill(n + 1, p1, q2, n_empty, diff - 1)
+
+    fill(0, 0, 0, 0, 0)
+    return layers[1:]
+
+
+def solve(board: zzz.Board, k: int = K) -> Dict[int, int]:
+    """Values for the player to move, by key, of all positions of the layout"""
+    # pylint: disable=too-many-locals
+    free = _free_cells(board)
+    lines_through: Dict[int, List[int]] = {_bit(i, j): [] for i, j in free}
+    for line in _lines(free):
+        mask = sum(_bit(i, j) for i, j in line)
+        for i, j in line:
+            lines_through[_bit(i, j)].append(mask)
+    free_mask = sum(lines_through)
+    blocked = _spread(((1 << N * N) - 1) & ~free_mask) * 3
+
+    # values of the previous layer, keyed by (p1, p2, player to move)
+    previous: Dict[Tuple[int, int, int], int] = {}
+    values: Dict[int, int] = {}
+    for n_empty, positions in enumerate(enumerate_positions(board, k=k), start=1):
+        current: Dict[Tuple[int, int, int], int] = {}
+        for p1, p2 in positions:
+            empty = free_mask & ~(p1 | p2)
+            diff = bin(p1).count('1') - bin(p2).count('1')
+            # the player to move has at most as many stones
+            for player in (1, 2):
+                if diff == (1 if player == 1 else -1):
+                    continue
+
+                own = p1 if player == 1 else p2
+                best = -1
+                cells = empty
+                while cells and best < 2:
+                    cell = cells & -cells
+                    cells ^= cell
+                    placed = own | cell
+                    if any(placed & line == line for line in lines_through[cell]):
+                        value = 2
+                    elif n_empty == 1:
+                        value = 1  # board is full
+                    elif player == 1:
+                        value = 2 - previous[(placed, p2, 2)]
+                    else:
+                        value = 2 - previous[(p1, placed, 1)]
+                    best = max(best, value)
+
+                current[(p1, p2, player)] = best
+                code = _spread(p1) | (_spread(p2) << 1) | blocked
+                values[(code << 1) | (player - 1)] = best
+        previous = current
+    return values
+
+
+def write(values: Dict[int, int], k: int = K, path: str = PATH) -> None:
+    entries = array('Q', sorted((key << 2) | value for key, value in values.items()))
+    if sys.byteorder != 'little':
+        entries.byteswap()
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, k))
+        entries.tofile(f)
+
+
+def build(
+        boards: Iterable[zzz.Board] = LAYOUTS,
+        k: int = K,
+        path: str = PATH,
+) -> int:
+    """Solve the layouts of the boards and write them to one file
+
+    Returns the number of positions.
+
+    """
+    values: Dict[int, int] = {}
+    for board in boards:
+        values.update(solve(board, k=k))
+    write(values, k=k, path=path)
+    return len(values)
+
+
+class Endgames:
+    """Read only view of an endgame database file
+
+    Can be passed as the oracle of MCTS.
+
+    """
+    def __init__(self, path: str = PATH) -> None:
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, k = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a ziczaczoe endgame database")
+        if (len(self._mmap) - HEADER.size) % 8:
+            raise ValueError(f"{path} has the wrong size")
+
+        self.max_moves: int = k
+        entries = memoryview(self._mmap)[HEADER.size:].cast('Q')
+        if sys.byteorder != 'little':
+            entries = array('Q', entries)  # type: ignore[assignment]
+            entries.byteswap()  # type: ignore[attr-defined]
+        self._entries = entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def value(self, game: Game) -> Optional[int]:
+        """Value for the player to move, None if the position is unknown"""
+        target = key(game) << 2
+        entries = self._entries
+        idx = bisect_left(entries, target)
+        if (idx == len(entries)) or (entries[idx] >> 2 != target >> 2):
+            return None
+        value: int = entries[idx] & 3
+        return value
+
+    def probe(self, game: Game) -> Optional[float]:
+        """Score for player 1 under perfect play, None if unknown"""
+        value = self.value(game)
+        if value is None:
+            return None
+        score = value / 2
+        return score if game.player == 1 else 1 - score
+
+
+@lru_cache(maxsize=None)
+def load(path: str = PATH) -> Endgames:
+    """Open a database, building it for the premade layouts if it does not exist"""
+    if not os.path.exists(path):
+        build(path=path)
+    return Endgames(path)
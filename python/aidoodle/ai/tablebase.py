@@ -0,0 +1,128 @@
+"""Perfect play tictactoe tablebase
+
+Every position reachable from the empty board, with either player
+starting, is solved once and written to a binary file. Positions are
+indexed by their cells in base 3 and the player to move. Each entry is a
+little endian uint16 that holds the value for the player to move in the
+upper bits (0 loss, 1 draw, 2 win) and a bitmask of all best moves, one
+bit per cell, in the lower 9 bits. Unreachable positions are UNKNOWN.
+
+The file is memory mapped when loaded, so the table costs neither
+parsing nor memory until it is used.
+
+"""
+from array import array
+from functools import lru_cache
+import mmap
+import os
+import sys
+from typing import Tuple
+
+import aidoodle.games.tictactoe as ttt
+import aidoodle.games.ziczaczoe as zzz
+
+
+PATH = 'tictactoe.tb'  # default location, relative to the working directory
+MAGIC = b'TTT1'
+N_CELLS = 9
+N_ENTRIES = 2 * 3 ** N_CELLS
+MOVE_BITS = (1 << N_CELLS) - 1
+UNKNOWN = 0xFFFF
+CELL_MOVES: Tuple[zzz.Move, ...] = tuple(
+    zzz.MOVES[(i, j)] for i in range(3) for j in range(3))
+
+
+def key(game: zzz.Game) -> int:
+    state = game.board.state
+    code = 0
+    for i in (2, 1, 0):
+        row = state[i]
+        code = ((code * 3 + row[2]) * 3 + row[1]) * 3 + row[0]
+    return 2 * code + int(game.player == 2)
+
+
+def _solve(game: zzz.Game, table: 'array[int]') -> int:
+    k = key(game)
+    if table[k] != UNKNOWN:
+        return table[k] >> N_CELLS
+
+    if game.winner:
+        score = ttt.game_score(game)
+        value = round(2 * (score if game.player == 1 else 1 - score))
+        table[k] = value << N_CELLS
+        return value
+
+    best, moves = -1, 0
+    for i, move in enumerate(CELL_MOVES):
+        if game.board.state[move.i][move.j] != 0:
+            continue
+        # the value for the opponent, who moves next
+        value = 2 - _solve(ttt.make_move(game, move), table)
+        if value > best:
+            best, moves = value, 1 << i
+        elif value == best:
+            moves |= 1 << i
+
+    table[k] = (best << N_CELLS) | moves
+    return best
+
+
+def solve() -> 'array[int]':
+    table: 'array[int]' = array('H', [UNKNOWN]) * N_ENTRIES
+    for player_idx in (0, 1):
+        _solve(ttt.init_game(player_idx=player_idx), table)
+    return table
+
+
+def write(table: 'array[int]', path: str = PATH) -> None:
+    if sys.byteorder != 'little':
+        table = array('H', table)
+        table.byteswap()
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        table.tofile(f)
+
+
+def build(path: str = PATH) -> None:
+    write(solve(), path=path)
+
+
+class Tablebase:
+    """Read only view of a tablebase file"""
+    def __init__(self, path: str = PATH) -> None:
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a tictactoe tablebase")
+        self._entries = memoryview(self._mmap)[len(MAGIC):].cast('H')
+        if len(self._entries) != N_ENTRIES:
+            raise ValueError(f"{path} has the wrong size")
+
+    def _entry(self, game: zzz.Game) -> int:
+        entry: int = self._entries[key(game)]
+        if sys.byteorder != 'little':
+            entry = ((entry & 0xFF) << 8) | (entry >> 8)
+        if entry == UNKNOWN:
+            raise ValueError("Position is not in the tablebase")
+        return entry
+
+    def evaluate(self, game: zzz.Game) -> float:
+        """Score for player 1 under perfect play
+
+        Can be used as the simulator of MCTS.
+
+        """
+        value = (self._entry(game) >> N_CELLS) / 2
+        return value if game.player == 1 else 1 - value
+
+    def best_moves(self, game: zzz.Game) -> Tuple[zzz.Move, ...]:
+        moves = self._entry(game) & MOVE_BITS
+        return tuple(move for i, move in enumerate(CELL_MOVES) if (moves >> i) & 1)
+
+
+@lru_cache(maxsize=None)
+def load(path: str = PATH) -> Tablebase:
+    """Open a tablebase, building it first if it does not exist yet"""
+    if not os.path.exists(path):
+        build(path)
+    return Tablebase(path)
@@ -1,16 +1,34 @@
-from typing import List, Optional, Union
+from typing import TYPE_CHECKING, List, Optional, Sequence, TypeVar, Union
 from typing_extensions import Protocol
 
 from aidoodle.games import battle
+from aidoodle.games import bigbattle
+from aidoodle.games import bignim
+from aidoodle.games import bigzzz
 from aidoodle.games import dumbdice as dice
 from aidoodle.games import nim
 from aidoodle.games import tictactoe as ttt
 from aidoodle.games import ziczaczoe as zzz
+from aidoodle.rng import Rng
 
+if TYPE_CHECKING:
+    # only needed for the annotations of the vectorized engines
+    import numpy as np
+    from aidoodle.vec.common import Array
 
-Board = Union[ttt.Board, nim.Board, dice.Board, battle.Board, zzz.Board]
-Move = Union[ttt.Move, nim.Move, dice.Move, battle.Move, zzz.Move]
-Game = Union[ttt.Game, nim.Game, dice.Game, battle.Game, zzz.Game]
+
+Board = Union[
+    ttt.Board, nim.Board, dice.Board, battle.Board, zzz.Board,
+    bigzzz.Board, bignim.Board, bigbattle.Board,
+]
+Move = Union[
+    ttt.Move, nim.Move, dice.Move, battle.Move, zzz.Move,
+    bigzzz.Move, bignim.Move, bigbattle.Move,
+]
+Game = Union[
+    ttt.Game, nim.Game, dice.Game, battle.Game, zzz.Game,
+    bigzzz.Game, bignim.Game, bigbattle.Game,
+]
 Player = Union[ttt.Player, nim.Player, dice.Player, battle.Player, zzz.Player]
 
 
@@ -31,13 +49,82 @@ class Engine(Protocol):
         ...
 
     @staticmethod
-    def get_legal_moves(game: Game) -> List[Move]:
+    def get_legal_moves(game: Game) -> Sequence[Move]:
         ...
 
     @staticmethod
-    def make_move(game: Game, move: Move) -> Game:
+    def make_move(game: Game, move: Move, rng: Optional[Rng] = None) -> Game:
         ...
 
     @staticmethod
     def game_score(game: Game) -> float:
         ...
+
+
+class Rollout(Protocol):
+    """Optional mutable game state for random playouts
+
+    Engines that support it define ``init_rollout(game)``.
+
+    """
+    @property
+    def winner(self) -> Optional[Player]:
+        ...
+
+    def legal_moves(self) -> Sequence[Move]:
+        ...
+
+    def push(self, move: Move) -> None:
+        ...
+
+    def pop(self) -> None:
+        ...
+
+    def score(self) -> float:
+        ...
+
+    def to_game(self) -> Game:
+        ...
+
+
+B = TypeVar('B')
+
+
+class VecEngine(Protocol[B]):
+    """Optional vectorized engine that holds a batch of games as arrays
+
+    Implementations live in ``aidoodle.vec``. Moves are integer indices
+    into a move space of fixed size per batch.
+
+    """
+    @staticmethod
+    def init_batch(games: Sequence[Game]) -> B:
+        ...
+
+    @staticmethod
+    def to_games(batch: B) -> List[Game]:
+        ...
+
+    @staticmethod
+    def index_to_move(batch: B, idx: int) -> Move:
+        ...
+
+    @staticmethod
+    def move_to_index(batch: B, move: Move) -> int:
+        ...
+
+    @staticmethod
+    def legal_mask(batch: B) -> 'Array':
+        """Boolean array of shape (batch size, number of move indices)"""
+
+    @staticmethod
+    def step(
+            batch: B,
+            moves: 'Array',
+            rng: 'Optional[np.random.Generator]' = None,
+    ) -> B:
+        """Apply one move index per game, finished games are left as they are"""
+
+    @staticmethod
+    def terminal_scores(batch: B) -> 'Array':
+        """Score of each game for player 1, NaN if the game is not over"""
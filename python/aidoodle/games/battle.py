@@ -1,9 +1,11 @@
-from dataclasses import dataclass, field, replace
+from dataclasses import dataclass, field
 import enum
 from functools import partial
-import random
 from typing import Any, Dict, Generator, List, Optional, Set, Tuple, Type, Union
 
+from aidoodle.rng import Rng, randint
+from aidoodle.utils import slotted, unchecked
+
 
 POSSIBLE_PLAYERS: Set[int] = {1, 2}
 POSSIBLE_POSITIONS: Set[int] = {0, 1, 2, 3, 4, 5, 6, 7, 8, 9}
@@ -43,6 +45,7 @@ class _Buff(enum.Enum):
     shield = "shield"
 
 
+@slotted
 @dataclass(frozen=True)
 class Buff:
     round: int
@@ -65,6 +68,7 @@ class UnitRel(enum.Enum):
     enemy = enum.auto()
 
 
+@slotted
 @dataclass(frozen=True)
 class Unit:
     # pylint: disable=too-many-instance-attributes
@@ -109,6 +113,7 @@ class Unit:
         return r
 
 
+@slotted
 @dataclass(frozen=True)
 class Melee(Unit):
     hp: int = 9
@@ -120,9 +125,10 @@ class Melee(Unit):
     buff: _Buff = _Buff.shield
 
     def __repr__(self) -> str:
-        return super().__repr__()
+        return Unit.__repr__(self)
 
 
+@slotted
 @dataclass(frozen=True)
 class Ranger(Unit):
     hp: int = 5
@@ -134,7 +140,7 @@ class Ranger(Unit):
     buff: _Buff = _Buff.damage
 
     def __repr__(self) -> str:
-        return super().__repr__()
+        return Unit.__repr__(self)
 
 
 MaybeUnit = Optional[Unit]
@@ -195,31 +201,105 @@ class Player:
         return hash(self.i)
 
 
+# preallocated instances, to avoid creating and validating new ones
+PLAYERS: Dict[int, Player] = {i: Player(i) for i in POSSIBLE_PLAYERS}
+PLAYERS[-1] = unchecked(Player, i=-1)  # codes for tied, not a legal player
+MOVES: Dict[int, Move] = {pos: Move(pos) for pos in POSSIBLE_POSITIONS}
+
 MaybePlayer = Optional[Player]
 Row = Tuple[MaybeUnit, MaybeUnit, MaybeUnit, MaybeUnit, MaybeUnit,
             MaybeUnit, MaybeUnit, MaybeUnit, MaybeUnit, MaybeUnit]
+# what the active unit did, to which unit, and the amount healed or
+# damaged; only formatted into a string when it is actually displayed
+Action = Tuple[Union[Defense, Attack, _Buff], Unit, int]
+
+
+N_SLOTS = len(POSSIBLE_POSITIONS)
+
+
+def _build_tables() -> Tuple[
+        Tuple[int, ...], Tuple[int, ...], Tuple[int, ...], Tuple[Tuple[Move, ...], ...]]:
+    """Lookup tables indexed by occupancy, a bitmask of occupied slots
+
+    - number of units per occupancy
+    - next occupied slot, at ``occupancy * N_SLOTS + slot``, -1 if none
+    - occupied slots within a range of an occupied slot, counting only
+      occupied slots in between, at ``(occupancy * N_SLOTS + slot) *
+      N_SLOTS + range``, with the range capped at ``N_SLOTS - 1``
+    - moves targeting the slots of a bitmask, in ascending order
+
+    """
+    n_masks = 1 << N_SLOTS
+    n_units = tuple(bin(mask).count('1') for mask in range(n_masks))
+    next_slot = [-1] * (n_masks * N_SLOTS)
+    reachable = [0] * (n_masks * N_SLOTS * N_SLOTS)
+
+    for occupancy in range(n_masks):
+        slots = [slot for slot in range(N_SLOTS) if (occupancy >> slot) & 1]
+        if not slots:
+            continue
+
+        for slot in range(N_SLOTS):
+            later = [s for s in slots if s > slot]
+            next_slot[occupancy * N_SLOTS + slot] = later[0] if later else slots[0]
+
+        # prefix[k] is the bitmask of the first k occupied slots
+        prefix = [0]
+        for slot in slots:
+            prefix.append(prefix[-1] | (1 << slot))
+        for rank, slot in enumerate(slots):
+            i = (occupancy * N_SLOTS + slot) * N_SLOTS
+            reachable[i:i + N_SLOTS] = [
+                prefix[min(len(slots), rank + dist + 1)] & ~prefix[max(0, rank - dist)]
+                for dist in range(N_SLOTS)]
+
+    moves = tuple(
+        tuple(MOVES[slot] for slot in range(N_SLOTS) if (mask >> slot) & 1)
+        for mask in range(n_masks))
+    return n_units, tuple(next_slot), tuple(reachable), moves
+
+
+N_UNITS, NEXT_SLOT, REACHABLE, MOVES_BY_TARGETS = _build_tables()
 
 
 def init_player(i: int) -> Player:
     return Player(i)
 
 
+@slotted
 @dataclass(frozen=True)
 class Board:
     state: Row
     active_idx: int
-    last_action: str = "start"
+    action: Optional[Action] = None
     # unfortunately, we need to keep track of turns, otherwise there
     # can be cycles in the game tree
     turn: int = 1
     round: int = 1
+    # bitmasks of the slots occupied by units of player 1 and 2
+    units_p1: int = field(init=False, repr=False, compare=False)
+    units_p2: int = field(init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         if self.active_idx not in POSSIBLE_POSITIONS:
             raise ValueError("Illegal board")
-        for unit in self.state:
-            if (unit is not None) and (unit.owner not in (1, 2)):
+
+        units_p1 = units_p2 = 0
+        for slot, unit in enumerate(self.state):
+            if unit is None:
+                continue
+            if unit.owner == 1:
+                units_p1 |= 1 << slot
+            elif unit.owner == 2:
+                units_p2 |= 1 << slot
+            else:
                 raise ValueError("Unit assigned to illegal player")
+        object.__setattr__(self, 'units_p1', units_p1)
+        object.__setattr__(self, 'units_p2', units_p2)
+
+    @property
+    def occupancy(self) -> int:
+        return self.units_p1 | self.units_p2
 
     @property
     def active(self) -> Unit:
@@ -236,6 +316,10 @@ class Board:
 
         return unit
 
+    @property
+    def last_action(self) -> str:
+        return format_action(self.action)
+
     @property
     def state_dense(self) -> List[Unit]:
         return [unit for unit in self.state if unit is not None]
@@ -279,6 +363,8 @@ class Board:
         ))
 
     def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
         try:
             res: bool = (
                 (self.state == other.state)
@@ -296,12 +382,16 @@ class Board:
 MaybeBoard = Optional[Board]
 
 
+@slotted
 @dataclass(frozen=True)
 class Game:
     players: Tuple[Player, Player]
     board: Board
     board_init: Board
     player_idx: int = 0
+    # legal moves, set by get_legal_moves on first request
+    moves_cache: Optional[Tuple[Move, ...]] = field(
+        default=None, init=False, repr=False, compare=False)
 
     @property
     def winner(self) -> MaybePlayer:
@@ -313,17 +403,15 @@ class Game:
 
 
 def determine_winner(game: Game) -> MaybePlayer:
-    state = game.board.state
-    units_player1 = sum(1 for unit in state if unit and unit.owner == 1)
-    units_player2 = sum(1 for unit in state if unit and unit.owner == 2)
+    board = game.board
 
-    if not units_player1:
-        if not units_player2:
-            return Player(-1)  # tied
-        return Player(2)
+    if not board.units_p1:
+        if not board.units_p2:
+            return PLAYERS[-1]  # tied
+        return PLAYERS[2]
 
-    if not units_player2:
-        return Player(1)
+    if not board.units_p2:
+        return PLAYERS[1]
 
     return None
 
@@ -346,44 +434,44 @@ def get_unit_rel(unit: Unit, target: MaybeUnit) -> UnitRel:
     return UnitRel.enemy
 
 
-def _yield_rels(unit: Unit, board: Board) -> Generator[UnitRel, None, None]:
-    return (get_unit_rel(unit=unit, target=target) for target in board.state)
+def reachable(board: Board) -> int:
+    """Bitmask of the occupied slots within range of the active unit"""
+    idx = board.active_idx
+    dist = min(board.active.range, N_SLOTS - 1)
+    return REACHABLE[(board.occupancy * N_SLOTS + idx) * N_SLOTS + dist]
 
 
 def within_distance(board: Board, target: Unit) -> bool:
-    unit = board.active
-    idx_unit = board.state_dense.index(unit)
-    idx_target = board.state_dense.index(target)
-    return abs(idx_unit - idx_target) <= unit.range
-
+    # find the slot by identity, equal units may stand in several slots
+    pos = next(i for i, unit in enumerate(board.state) if unit is target)
+    return bool((reachable(board) >> pos) & 1)
 
-def _yield_legal_moves(board: Board) -> Generator[int, None, None]:
-    for idx_target, rel in enumerate(_yield_rels(board.active, board)):
-        if rel is UnitRel.none:
-            continue
 
-        target = board.target(idx_target)
+def legal_targets(board: Board) -> int:
+    """Bitmask of the slots the active unit can act on
 
-        if rel == UnitRel.enemy:
-            if within_distance(board, target):
-                yield idx_target
-                continue
+    Enemies within range can be attacked, allies can be buffed, and the
+    unit itself can heal if it is injured.
 
-        if rel == UnitRel.itself:
-            if target.hp < target.hp_max:
-                yield idx_target
-                continue
-
-        if rel == UnitRel.ally:
-            yield idx_target
+    """
+    unit = board.active
+    bit = 1 << board.active_idx
+    if unit.owner == 1:
+        allies, enemies = board.units_p1, board.units_p2
+    else:
+        allies, enemies = board.units_p2, board.units_p1
 
+    targets = (enemies & reachable(board)) | (allies & ~bit)
+    if unit.hp < unit.hp_max:
+        targets |= bit
+    return targets
 
-def get_legal_moves(game: Game) -> List[Move]:
-    if game.winner:
-        return []
 
-    board = game.board
-    moves = [Move(idx_target) for idx_target in _yield_legal_moves(board)]
+def get_legal_moves(game: Game) -> Tuple[Move, ...]:
+    moves = game.moves_cache
+    if moves is None:
+        moves = () if game.winner else MOVES_BY_TARGETS[legal_targets(game.board)]
+        object.__setattr__(game, 'moves_cache', moves)
     return moves
 
 
@@ -401,47 +489,54 @@ def place_unit(row: Row, pos: int, unit: MaybeUnit) -> Row:
         unit if pos == 9 else row[9])
 
 
-def _next_active_unit(row: Row, i: int) -> int:
-    j = i + 1
-    if row[j % 10] is None:
-        return _next_active_unit(row, j)
-    return j % 10
-
-
 def next_active_unit_idx(board: Board) -> int:
-    return _next_active_unit(board.state, i=board.active_idx)
+    return NEXT_SLOT[board.occupancy * N_SLOTS + board.active_idx]
 
 
-def _apply_defense(board: Board) -> Board:
-    if board.active.defend == Defense.heal:
-        return _apply_heal(board)
+def format_action(action: Optional[Action]) -> str:
+    if action is None:
+        return "start"
 
-    raise ValueError("Illegal defense")
+    kind, unit, amount = action
+    name = unit.__class__.__name__
+    if kind is Defense.heal:
+        return f"healed {name} for {amount} HP"
+    if isinstance(kind, Attack):
+        return f"attacked {name} with {kind.name} for {amount} damage"
+    return f"applied buff '{kind.name}' to {name}"
 
 
-def _apply_heal(board: Board) -> Board:
-    # apply healing
-    unit = board.active
-    hp_after = min(unit.hp + HEAL, unit.hp_max)
-    unit_after = replace(unit, hp=hp_after)
-    healed = unit_after.hp - unit.hp
-
-    row = board.state
-    unit_pos = row.index(unit)
-    row_after = place_unit(row=row, pos=unit_pos, unit=unit_after)
-
-    last_action = f"healed {unit_after.__class__.__name__} for {healed} HP"
-    return replace(
-        board,
-        state=row_after,
-        last_action=last_action,
+def _evolve_unit(
+        unit: Unit,
+        hp: int,
+        buffs: Tuple[Buff, ...],
+        queued: bool,
+) -> Unit:
+    # only called with values that are valid by construction, so it is
+    # safe to skip the validation that dataclasses.replace would run
+    return unchecked(
+        type(unit),
+        owner=unit.owner,
+        hp=hp,
+        hp_max=unit.hp_max,
+        range=unit.range,
+        attack=unit.attack,
+        defend=unit.defend,
+        buff=unit.buff,
+        buffs=buffs,
+        queued=queued,
     )
 
 
-def _resolve_damage(unit: Unit, target: Unit) -> int:
-    attack = unit.attack
-    damage_range = DAMAGE[attack]
-    damage_raw = random.randint(damage_range.i, damage_range.j)
+def _resolve_damage(
+        unit: Unit,
+        target: Unit,
+        rng: Optional[Rng] = None,
+        damage_raw: Optional[int] = None,
+) -> int:
+    if damage_raw is None:
+        damage_range = DAMAGE[unit.attack]
+        damage_raw = randint(damage_range.i, damage_range.j, rng=rng)
     blocked = sum(BUFF_SHIELD for b in target.buffs if b.buff == _Buff.shield)
     damage_extra = sum(BUFF_DAMAGE for b in unit.buffs if b.buff == _Buff.damage)
     damage = max(0, damage_raw - blocked + damage_extra)
@@ -452,27 +547,39 @@ def _apply_damage_to(unit: Unit, damage: int) -> MaybeUnit:
     hp_new = unit.hp - damage
     if hp_new < 1:
         return None
-    return replace(unit, hp=hp_new)
+    return _evolve_unit(unit, hp=hp_new, buffs=unit.buffs, queued=unit.queued)
 
 
-def _apply_attack(board: Board, move: Move) -> Board:
+def _apply_heal(board: Board) -> Tuple[Row, Action]:
+    unit = board.active
+    if unit.defend != Defense.heal:
+        raise ValueError("Illegal defense")
+
+    hp_after = min(unit.hp + HEAL, unit.hp_max)
+    # the active unit is done for this round
+    unit_after = _evolve_unit(unit, hp=hp_after, buffs=unit.buffs, queued=False)
+    row_after = place_unit(board.state, pos=board.active_idx, unit=unit_after)
+    return row_after, (Defense.heal, unit_after, hp_after - unit.hp)
+
+
+def _apply_attack(
+        board: Board,
+        move: Move,
+        rng: Optional[Rng] = None,
+        damage_raw: Optional[int] = None,
+) -> Tuple[Row, Action]:
     unit = board.active
     target = board.target(move.pos)
 
-    damage = _resolve_damage(unit, target)
+    damage = _resolve_damage(unit, target, rng=rng, damage_raw=damage_raw)
     target_after = _apply_damage_to(unit=target, damage=damage)
-    state_new = place_unit(board.state, pos=move.pos, unit=target_after)
-
-    last_action = (f"attacked {target.__class__.__name__} with {unit.attack.name} "
-                   f"for {damage} damage")
-    return replace(
-        board,
-        state=state_new,
-        last_action=last_action,
-    )
+    unit_after = _evolve_unit(unit, hp=unit.hp, buffs=unit.buffs, queued=False)
+    row_after = place_unit(board.state, pos=move.pos, unit=target_after)
+    row_after = place_unit(row_after, pos=board.active_idx, unit=unit_after)
+    return row_after, (unit.attack, target, damage)
 
 
-def _apply_buff(board: Board, move: Move) -> Board:
+def _apply_buff(board: Board, move: Move) -> Tuple[Row, Action]:
     active = board.active
     target = board.target(move.pos)
 
@@ -485,16 +592,13 @@ def _apply_buff(board: Board, move: Move) -> Board:
         raise ValueError(f"Unknown buff {active.buff}")
 
     buffs_after = target.buffs + (buff,)
-    target_after = replace(target, buffs=buffs_after)
-    state_new = place_unit(board.state, pos=move.pos, unit=target_after)
-
-    last_action = (f"applied buff '{active.buff.name}' "
-                   f"to {target_after.__class__.__name__}")
-    return replace(
-        board,
-        state=state_new,
-        last_action=last_action,
-    )
+    target_after = _evolve_unit(
+        target, hp=target.hp, buffs=buffs_after, queued=target.queued)
+    active_after = _evolve_unit(
+        active, hp=active.hp, buffs=active.buffs, queued=False)
+    row_after = place_unit(board.state, pos=move.pos, unit=target_after)
+    row_after = place_unit(row_after, pos=board.active_idx, unit=active_after)
+    return row_after, (active.buff, target_after, 0)
 
 
 def _resolve_intent(
@@ -515,16 +619,15 @@ def _resolve_intent(
     raise ValueError("Illegal move")
 
 
-def _num_active_units(board: Board) -> int:
-    return sum(unit.queued for unit in board.state if unit is not None)
+def _num_active_units(row: Row) -> int:
+    return sum(unit.queued for unit in row if unit is not None)
 
 
 def _set_buffs_round_end(
         buffs: Tuple[Buff, ...],
-        board: Board,
+        current_round: int,
 ) -> Generator[Buff, None, None]:
     # ATMO, keep damage, remove shield at the end of next round
-    current_round = board.round
     for buff in buffs:
         if buff.buff != _Buff.shield:
             yield buff
@@ -534,70 +637,79 @@ def _set_buffs_round_end(
             yield buff
 
 
-def _set_unit_round_end(unit: MaybeUnit, board: Board) -> MaybeUnit:
+def _set_unit_round_end(unit: MaybeUnit, current_round: int) -> MaybeUnit:
     if unit is None:
         return None
 
-    buffs_after = tuple(_set_buffs_round_end(buffs=unit.buffs, board=board))
-    return replace(unit, queued=True, buffs=buffs_after)
+    buffs_after = tuple(_set_buffs_round_end(unit.buffs, current_round))
+    return _evolve_unit(unit, hp=unit.hp, buffs=buffs_after, queued=True)
 
 
-def _set_units_round_end(board: Board) -> Row:
-    state = board.state
+def _set_units_round_end(row: Row, current_round: int) -> Row:
     return (
-        _set_unit_round_end(state[0], board=board),
-        _set_unit_round_end(state[1], board=board),
-        _set_unit_round_end(state[2], board=board),
-        _set_unit_round_end(state[3], board=board),
-        _set_unit_round_end(state[4], board=board),
-        _set_unit_round_end(state[5], board=board),
-        _set_unit_round_end(state[6], board=board),
-        _set_unit_round_end(state[7], board=board),
-        _set_unit_round_end(state[8], board=board),
-        _set_unit_round_end(state[9], board=board))
-
-
-def _apply_round_end(board: Board) -> Board:
-    active_idx = next_active_unit_idx(board)
-
-    if _num_active_units(board) > 0:
-        round_after = board.round
-        state = board.state
-    else:
-        round_after = board.round + 1
-        state = _set_units_round_end(board)
-
-    return replace(
-        board,
-        state=state,
-        turn=board.turn + 1,
-        round=round_after,
-        active_idx=active_idx,
-    )
+        _set_unit_round_end(row[0], current_round),
+        _set_unit_round_end(row[1], current_round),
+        _set_unit_round_end(row[2], current_round),
+        _set_unit_round_end(row[3], current_round),
+        _set_unit_round_end(row[4], current_round),
+        _set_unit_round_end(row[5], current_round),
+        _set_unit_round_end(row[6], current_round),
+        _set_unit_round_end(row[7], current_round),
+        _set_unit_round_end(row[8], current_round),
+        _set_unit_round_end(row[9], current_round))
 
 
 def apply_move(
         board: Board,
         move: Move,
         player: Player = Player(1),  # pylint: disable=unused-argument
+        rng: Optional[Rng] = None,
+        damage_raw: Optional[int] = None,
 ) -> Board:
+    """Return the board after the active unit acted on the given position
+
+    The resulting units and board fields are computed first and the new
+    board is created only once, without validation, since moves that
+    pass ``_resolve_intent`` always lead to a valid board. Attacks roll
+    their damage, unless it is given.
+
+    """
     intent = _resolve_intent(move=move, board=board)
 
+    row: Row
+    action: Action
     if intent == Defense:
-        board_new = _apply_defense(board)
+        row, action = _apply_heal(board)
     elif intent == Attack:
-        board_new = _apply_attack(board, move)
+        row, action = _apply_attack(board, move, rng=rng, damage_raw=damage_raw)
     elif intent == Buff:
-        board_new = _apply_buff(board, move)
+        row, action = _apply_buff(board, move)
     else:
         raise ValueError("Illegal intent")
 
-    unit = board_new.state[board_new.active_idx]
-    unit_after = replace(unit, queued=False)
-    state_after = place_unit(board_new.state, pos=board.active_idx, unit=unit_after)
-    board_after = replace(board_new, state=state_after)
+    units_p1, units_p2 = board.units_p1, board.units_p2
+    if row[move.pos] is None:  # the target was killed
+        units_p1 &= ~(1 << move.pos)
+        units_p2 &= ~(1 << move.pos)
+
+    occupancy = units_p1 | units_p2
+    active_idx = NEXT_SLOT[occupancy * N_SLOTS + board.active_idx]
+    if _num_active_units(row) > 0:
+        round_after = board.round
+    else:
+        round_after = board.round + 1
+        row = _set_units_round_end(row, current_round=board.round)
 
-    return _apply_round_end(board_after)
+    return unchecked(
+        Board,
+        state=row,
+        active_idx=active_idx,
+        action=action,
+        turn=board.turn + 1,
+        round=round_after,
+        units_p1=units_p1,
+        units_p2=units_p2,
+    )
 
 
 def init_move(
@@ -611,19 +723,46 @@ def init_move(
     return Move(pos=pos)
 
 
-def make_move(game: Game, move: Move) -> Game:
-    board = apply_move(board=game.board, move=move, player=game.player)
-    game = replace(game, board=board)
-    player_idx = get_next_player_idx(game)
-    game = replace(game, player_idx=player_idx)
-    return game
+def _next_game(game: Game, board: Board) -> Game:
+    return Game(
+        players=game.players,
+        board=board,
+        board_init=game.board_init,
+        player_idx=game.players.index(board.active.owner),
+    )
+
+
+def make_move(game: Game, move: Move, rng: Optional[Rng] = None) -> Game:
+    board = apply_move(board=game.board, move=move, player=game.player, rng=rng)
+    return _next_game(game, board)
+
 
+def get_chance_outcomes(game: Game, move: Move) -> Tuple[Tuple[float, Game], ...]:
+    """Probability of each game the move can lead to
 
-def _units_left_right(state: Row) -> Tuple[int, int]:
-    left, right = state[:5], state[5:]
-    n_units_left = sum(1 for u in left if u is not None)
-    n_units_right = sum(1 for u in right if u is not None)
-    return n_units_left, n_units_right
+    Only attacks are random, with each damage in ``DAMAGE`` equally
+    likely. Damages that lead to the same game, e.g. because both kill
+    the target, are merged.
+
+    """
+    board = game.board
+    if _resolve_intent(move=move, board=board) != Attack:
+        return ((1.0, make_move(game, move)),)
+
+    damage_range = DAMAGE[board.active.attack]
+    damages = range(damage_range.i, damage_range.j + 1)
+    p = 1.0 / len(damages)
+    outcomes: Dict[Game, float] = {}
+    for damage_raw in damages:
+        child = _next_game(game, apply_move(
+            board=board, move=move, player=game.player, damage_raw=damage_raw))
+        outcomes[child] = outcomes.get(child, 0.0) + p
+    return tuple((p, child) for child, p in outcomes.items())
+
+
+def _units_left_right(board: Board) -> Tuple[int, int]:
+    occupancy = board.occupancy
+    return N_UNITS[occupancy & 0b11111], N_UNITS[occupancy >> 5]
 
 
 def game_score(game: Game) -> float:
@@ -635,15 +774,29 @@ def game_score(game: Game) -> float:
 
     # the logic here is as follow: The more units a side has lost
     # compared to the other side, the worse its score
-    state_init = game.board_init.state
-    state_final = game.board.state
-    n_left_init, n_right_init = _units_left_right(state_init)
-    n_left_final, n_right_final = _units_left_right(state_final)
+    n_left_init, n_right_init = _units_left_right(game.board_init)
+    n_left_final, n_right_final = _units_left_right(game.board)
     n_lost_left = n_left_init - n_left_final
     n_lost_right = n_right_init - n_right_final
     return n_lost_right / (n_lost_left + n_lost_right)
 
 
+def _strength(board: Board, player: int) -> float:
+    """Number of units of the player, weighted by their hitpoints"""
+    return sum(
+        unit.hp / unit.hp_max for unit in board.state
+        if (unit is not None) and (unit.owner == player))
+
+
+def evaluate(game: Game) -> float:
+    """Heuristic score for player 1, like game_score but counting lost hitpoints"""
+    lost1 = _strength(game.board_init, 1) - _strength(game.board, 1)
+    lost2 = _strength(game.board_init, 2) - _strength(game.board, 2)
+    if lost1 + lost2 <= 0:
+        return 0.5
+    return min(1.0, max(0.0, lost2 / (lost1 + lost2)))
+
+
 def _standard_board(p1: Player, p2: Player) -> Board:
     left = (
         None,
@@ -665,8 +818,8 @@ def _standard_board(p1: Player, p2: Player) -> Board:
 
 
 def init_game(board: MaybeBoard = None, player_idx: int = 0) -> Game:
-    p1 = Player(1)
-    p2 = Player(2)
+    p1 = PLAYERS[1]
+    p2 = PLAYERS[2]
     board_ = board if board is not None else _standard_board(p1, p2)
     return Game(
         players=(p1, p2),
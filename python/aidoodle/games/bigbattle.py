@@ -0,0 +1,538 @@
+"""The battle game with armies of arbitrary size
+
+Instead of one frozen dataclass per unit, unit data is stored in
+parallel tuples with one entry per slot, and buffs are reduced to
+counters. Empty slots have kind -1 and owner 0. The rules are the same
+as in ``battle``.
+
+"""
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Generator, List, Optional, Sequence, Tuple
+
+import aidoodle.games.battle as battle
+from aidoodle.rng import Rng, randint
+from aidoodle.utils import slotted, unchecked
+
+
+Attack = battle.Attack
+Player = battle.Player
+PLAYERS = battle.PLAYERS
+init_player = battle.init_player
+
+DAMAGE = battle.DAMAGE
+HEAL = battle.HEAL
+BUFF_DAMAGE = battle.BUFF_DAMAGE
+BUFF_SHIELD = battle.BUFF_SHIELD
+
+WIDTH = 20  # default number of slots per side
+N_MELEE = 6  # default number of melee units per side
+N_RANGER = 9  # default number of ranger units per side
+
+
+@dataclass(frozen=True)
+class UnitKind:
+    name: str
+    hp_max: int
+    range: int
+    attack: Attack
+    buff: str  # the buff given to allies, either 'shield' or 'damage'
+
+
+def _kind_of(cls: Any) -> UnitKind:
+    unit = cls(owner=PLAYERS[1])
+    return UnitKind(
+        name=cls.__name__,
+        hp_max=unit.hp_max,
+        range=unit.range,
+        attack=unit.attack,
+        buff=unit.buff.value,
+    )
+
+
+KINDS: Tuple[UnitKind, ...] = (_kind_of(battle.Melee), _kind_of(battle.Ranger))
+KIND_IDS = {kind.name[0]: i for i, kind in enumerate(KINDS)}  # by first letter
+
+
+@dataclass(frozen=True)
+class Move:
+    pos: int
+
+    def __post_init__(self) -> None:
+        if self.pos < 0:
+            raise ValueError("Illegal move")
+
+    def __repr__(self) -> str:
+        return f"Move({self.pos})"
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Move):
+            eq: bool = self.pos == other.pos
+            return eq
+        return False
+
+    def __hash__(self) -> int:
+        return hash(self.pos)
+
+    def __lt__(self, other: Any) -> bool:
+        if not isinstance(other, Move):
+            raise TypeError
+
+        lt: bool = self.pos < other.pos
+        return lt
+
+
+@lru_cache(maxsize=None)
+def _moves(n: int) -> Tuple[Move, ...]:
+    """Preallocated moves of a board with n slots, indexed by slot"""
+    return tuple(unchecked(Move, pos=pos) for pos in range(n))
+
+
+MaybePlayer = Optional[Player]
+
+
+def _yield_bits(bits: int) -> Generator[int, None, None]:
+    """Yield the indices of all set bits, lowest first"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def _replace_at(values: Tuple[int, ...], pos: int, value: int) -> Tuple[int, ...]:
+    return values[:pos] + (value,) + values[pos + 1:]
+
+
+@slotted
+@dataclass(frozen=True)
+class Board:
+    # pylint: disable=too-many-instance-attributes
+    width: int  # slots per side, player 1 starts on the left
+    kind: Tuple[int, ...]  # index into KINDS
+    owner: Tuple[int, ...]
+    hp: Tuple[int, ...]
+    hp_max: Tuple[int, ...]
+    range: Tuple[int, ...]
+    damage_buffs: Tuple[int, ...]
+    shields: Tuple[int, ...]  # received this round
+    shields_old: Tuple[int, ...]  # received last round, expire at round end
+    queued: int  # bitmask of the units that did not act yet this round
+    active_idx: int
+    # we need to keep track of turns, otherwise there can be cycles in
+    # the game tree
+    turn: int = 1
+    round: int = 1
+    # bitmasks of the slots occupied by units of player 1 and 2
+    units_p1: int = field(init=False, repr=False, compare=False)
+    units_p2: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        n = 2 * self.width
+        arrays = (self.kind, self.owner, self.hp, self.hp_max, self.range,
+                  self.damage_buffs, self.shields, self.shields_old)
+        if any(len(array) != n for array in arrays):
+            raise ValueError("Unit data does not match the board size")
+        if not 0 <= self.active_idx < n:
+            raise ValueError("Illegal board")
+        if any(hp > hp_max for hp, hp_max in zip(self.hp, self.hp_max)):
+            raise ValueError("HPs exceed max HPs")
+
+        units_p1 = units_p2 = 0
+        for slot, owner in enumerate(self.owner):
+            if owner == 1:
+                units_p1 |= 1 << slot
+            elif owner == 2:
+                units_p2 |= 1 << slot
+            elif owner != 0:
+                raise ValueError("Unit assigned to illegal player")
+        object.__setattr__(self, 'units_p1', units_p1)
+        object.__setattr__(self, 'units_p2', units_p2)
+
+    @property
+    def n_slots(self) -> int:
+        return 2 * self.width
+
+    @property
+    def occupancy(self) -> int:
+        return self.units_p1 | self.units_p2
+
+    def _repr_unit(self, slot: int) -> str:
+        if not self.owner[slot]:
+            return "."
+
+        buffs = ""
+        if self.damage_buffs[slot]:
+            buffs += f" D:{BUFF_DAMAGE * self.damage_buffs[slot]}"
+        shields = self.shields[slot] + self.shields_old[slot]
+        if shields:
+            buffs += f" S:{BUFF_SHIELD * shields}"
+
+        r = f"{KINDS[self.kind[slot]].name[:1]}({self.hp[slot]}HP{buffs})"
+        if slot == self.active_idx:
+            return r + "*"
+        if (self.queued >> slot) & 1:
+            return r + "+"
+        return r
+
+    def __repr__(self) -> str:
+        width = self.width
+        left = " ".join(self._repr_unit(slot) for slot in range(width))
+        right = " ".join(self._repr_unit(slot) for slot in range(width, 2 * width))
+        return "\n".join((
+            "",
+            f"Round {self.round}",
+            f"Player 1 | {left}",
+            f"Player 2 | {right}",
+            "",
+        ))
+
+
+MaybeBoard = Optional[Board]
+
+
+def make_board(left: str, right: str) -> Board:
+    """Create a board from one string per side, e.g. ``"..RRM"``
+
+    Each character is a slot, either empty ("."), or a unit identified
+    by the first letter of its kind. All units are queued and the first
+    unit from the left is active.
+
+    """
+    if len(left) != len(right):
+        raise ValueError("Both sides need the same number of slots")
+
+    kind: List[int] = []
+    owner: List[int] = []
+    for player, side in ((1, left), (2, right)):
+        for c in side:
+            if c == ".":
+                kind.append(-1)
+                owner.append(0)
+            elif c in KIND_IDS:
+                kind.append(KIND_IDS[c])
+                owner.append(player)
+            else:
+                raise ValueError(f"Unknown unit {c}")
+
+    occupied = [slot for slot, o in enumerate(owner) if o]
+    return _from_units(
+        width=len(left),
+        kind=kind,
+        owner=owner,
+        hp=[KINDS[k].hp_max if k >= 0 else 0 for k in kind],
+        damage_buffs=[0] * len(kind),
+        shields=[0] * len(kind),
+        shields_old=[0] * len(kind),
+        queued=sum(1 << slot for slot in occupied),
+        active_idx=occupied[0] if occupied else 0,
+    )
+
+
+def _from_units(
+        width: int,
+        kind: Sequence[int],
+        owner: Sequence[int],
+        hp: Sequence[int],
+        damage_buffs: Sequence[int],
+        shields: Sequence[int],
+        shields_old: Sequence[int],
+        queued: int,
+        active_idx: int,
+        turn: int = 1,
+        round: int = 1,  # pylint: disable=redefined-builtin
+) -> Board:
+    return Board(
+        width=width,
+        kind=tuple(kind),
+        owner=tuple(owner),
+        hp=tuple(hp),
+        hp_max=tuple(KINDS[k].hp_max if k >= 0 else 0 for k in kind),
+        range=tuple(KINDS[k].range if k >= 0 else 0 for k in kind),
+        damage_buffs=tuple(damage_buffs),
+        shields=tuple(shields),
+        shields_old=tuple(shields_old),
+        queued=queued,
+        active_idx=active_idx,
+        turn=turn,
+        round=round,
+    )
+
+
+def army_board(
+        width: int = WIDTH,
+        n_melee: int = N_MELEE,
+        n_ranger: int = N_RANGER,
+) -> Board:
+    """Two mirrored armies, melee units in front, rangers behind"""
+    n_empty = width - n_melee - n_ranger
+    if n_empty < 0:
+        raise ValueError("Too many units for the board width")
+
+    left = "." * n_empty + "R" * n_ranger + "M" * n_melee
+    return make_board(left, left[::-1])
+
+
+def from_battle(board: battle.Board) -> Board:
+    """Convert a board of the battle engine"""
+    kind: List[int] = []
+    owner: List[int] = []
+    hp: List[int] = []
+    damage_buffs: List[int] = []
+    shields: List[int] = []
+    shields_old: List[int] = []
+    queued = 0
+
+    for slot, unit in enumerate(board.state):
+        if unit is None:
+            kind.append(-1)
+            owner.append(0)
+            hp.append(0)
+            damage_buffs.append(0)
+            shields.append(0)
+            shields_old.append(0)
+            continue
+
+        kind.append(KIND_IDS[unit.__class__.__name__[0]])
+        owner.append(int(unit.owner))
+        hp.append(unit.hp)
+        damage_buffs.append(sum(b.buff.value == 'damage' for b in unit.buffs))
+        shields.append(sum(
+            b.buff.value == 'shield' and b.round == board.round for b in unit.buffs))
+        shields_old.append(sum(
+            b.buff.value == 'shield' and b.round < board.round for b in unit.buffs))
+        queued |= unit.queued << slot
+
+    return _from_units(
+        width=len(board.state) // 2,
+        kind=kind,
+        owner=owner,
+        hp=hp,
+        damage_buffs=damage_buffs,
+        shields=shields,
+        shields_old=shields_old,
+        queued=queued,
+        active_idx=board.active_idx,
+        turn=board.turn,
+        round=board.round,
+    )
+
+
+@slotted
+@dataclass(frozen=True)
+class Game:
+    players: Tuple[Player, Player]
+    board: Board
+    board_init: Board
+    player_idx: int = 0
+    # legal moves, set by get_legal_moves on first request
+    moves_cache: Optional[Tuple[Move, ...]] = field(
+        default=None, init=False, repr=False, compare=False)
+
+    @property
+    def winner(self) -> MaybePlayer:
+        return determine_winner(self)
+
+    @property
+    def player(self) -> Player:
+        return self.players[self.player_idx]
+
+
+def determine_winner(game: Game) -> MaybePlayer:
+    board = game.board
+
+    if not board.units_p1:
+        if not board.units_p2:
+            return PLAYERS[-1]  # tied
+        return PLAYERS[2]
+
+    if not board.units_p2:
+        return PLAYERS[1]
+
+    return None
+
+
+def get_next_player_idx(game: Game) -> int:
+    board = game.board
+    return game.players.index(PLAYERS[board.owner[board.active_idx]])
+
+
+def reachable(board: Board) -> int:
+    """Bitmask of the occupied slots within range of the active unit
+
+    Distances only count occupied slots.
+
+    """
+    idx = board.active_idx
+    dist = board.range[idx]
+    slots = list(_yield_bits(board.occupancy))
+    rank = slots.index(idx)
+    mask = 0
+    for slot in slots[max(0, rank - dist):rank + dist + 1]:
+        mask |= 1 << slot
+    return mask
+
+
+def legal_targets(board: Board) -> int:
+    """Bitmask of the slots the active unit can act on"""
+    idx = board.active_idx
+    bit = 1 << idx
+    if board.owner[idx] == 1:
+        allies, enemies = board.units_p1, board.units_p2
+    else:
+        allies, enemies = board.units_p2, board.units_p1
+
+    targets = (enemies & reachable(board)) | (allies & ~bit)
+    if board.hp[idx] < board.hp_max[idx]:
+        targets |= bit
+    return targets
+
+
+def get_legal_moves(game: Game) -> Tuple[Move, ...]:
+    moves = game.moves_cache
+    if moves is None:
+        if game.winner:
+            moves = ()
+        else:
+            board = game.board
+            moves_all = _moves(board.n_slots)
+            moves = tuple(moves_all[slot] for slot in _yield_bits(legal_targets(board)))
+        object.__setattr__(game, 'moves_cache', moves)
+    return moves
+
+
+def _resolve_damage(board: Board, target: int, rng: Optional[Rng] = None) -> int:
+    idx = board.active_idx
+    damage_range = DAMAGE[KINDS[board.kind[idx]].attack]
+    damage_raw = randint(damage_range.i, damage_range.j, rng=rng)
+    blocked = BUFF_SHIELD * (board.shields[target] + board.shields_old[target])
+    damage_extra = BUFF_DAMAGE * board.damage_buffs[idx]
+    return max(0, damage_raw - blocked + damage_extra)
+
+
+def apply_move(
+        board: Board,
+        move: Move,
+        player: Player = Player(1),  # pylint: disable=unused-argument
+        rng: Optional[Rng] = None,
+) -> Board:
+    # pylint: disable=too-many-locals
+    pos = move.pos
+    idx = board.active_idx
+    if (pos >= board.n_slots) or not board.owner[pos]:
+        raise ValueError("Illegal move")
+
+    kind, owner, hp = board.kind, board.owner, board.hp
+    hp_max, range_ = board.hp_max, board.range
+    damage_buffs, shields, shields_old = (
+        board.damage_buffs, board.shields, board.shields_old)
+    units_p1, units_p2 = board.units_p1, board.units_p2
+    queued = board.queued & ~(1 << idx)
+
+    if pos == idx:  # heal
+        hp = _replace_at(hp, idx, min(hp[idx] + HEAL, hp_max[idx]))
+    elif owner[pos] != owner[idx]:  # attack
+        hp_after = hp[pos] - _resolve_damage(board, pos, rng=rng)
+        if hp_after >= 1:
+            hp = _replace_at(hp, pos, hp_after)
+        else:  # remove the unit
+            kind = _replace_at(kind, pos, -1)
+            owner = _replace_at(owner, pos, 0)
+            hp = _replace_at(hp, pos, 0)
+            hp_max = _replace_at(hp_max, pos, 0)
+            range_ = _replace_at(range_, pos, 0)
+            damage_buffs = _replace_at(damage_buffs, pos, 0)
+            shields = _replace_at(shields, pos, 0)
+            shields_old = _replace_at(shields_old, pos, 0)
+            queued &= ~(1 << pos)
+            units_p1 &= ~(1 << pos)
+            units_p2 &= ~(1 << pos)
+    elif KINDS[kind[idx]].buff == 'shield':
+        shields = _replace_at(shields, pos, shields[pos] + 1)
+    else:
+        damage_buffs = _replace_at(damage_buffs, pos, damage_buffs[pos] + 1)
+
+    # next occupied slot to the right, wrapping around
+    occupancy = units_p1 | units_p2
+    later = (occupancy >> (idx + 1)) << (idx + 1)
+    low = later & -later if later else occupancy & -occupancy
+    active_idx = low.bit_length() - 1
+
+    round_after = board.round
+    if not queued:  # round end
+        round_after += 1
+        queued = occupancy
+        shields_old = shields
+        shields = (0,) * len(shields)
+
+    return unchecked(
+        Board,
+        width=board.width,
+        kind=kind,
+        owner=owner,
+        hp=hp,
+        hp_max=hp_max,
+        range=range_,
+        damage_buffs=damage_buffs,
+        shields=shields,
+        shields_old=shields_old,
+        queued=queued,
+        active_idx=active_idx,
+        turn=board.turn + 1,
+        round=round_after,
+        units_p1=units_p1,
+        units_p2=units_p2,
+    )
+
+
+def init_move(
+        s: str,
+        game: Optional[Game] = None,  # pylint: disable=unused-argument
+) -> Move:
+    try:
+        pos = int(s)
+    except (TypeError, ValueError):
+        raise ValueError(f"Illegal move {s}")
+    return Move(pos=pos)
+
+
+def make_move(game: Game, move: Move, rng: Optional[Rng] = None) -> Game:
+    board = apply_move(board=game.board, move=move, player=game.player, rng=rng)
+    return Game(
+        players=game.players,
+        board=board,
+        board_init=game.board_init,
+        player_idx=game.players.index(PLAYERS[board.owner[board.active_idx]]),
+    )
+
+
+def _units_left_right(board: Board) -> Tuple[int, int]:
+    occupancy = board.occupancy
+    left = occupancy & ((1 << board.width) - 1)
+    right = occupancy >> board.width
+    return bin(left).count('1'), bin(right).count('1')
+
+
+def game_score(game: Game) -> float:
+    if game.winner is None:
+        raise ValueError("Game is not over, no score yet")
+
+    if game.winner == -1:  # tie
+        return 0.5
+
+    # the more units a side has lost compared to the other side, the
+    # worse its score
+    n_left_init, n_right_init = _units_left_right(game.board_init)
+    n_left_final, n_right_final = _units_left_right(game.board)
+    n_lost_left = n_left_init - n_left_final
+    n_lost_right = n_right_init - n_right_final
+    return n_lost_right / (n_lost_left + n_lost_right)
+
+
+def init_game(board: MaybeBoard = None, player_idx: int = 0) -> Game:
+    board_ = board if board is not None else army_board()
+    return Game(
+        players=(PLAYERS[1], PLAYERS[2]),
+        board=board_,
+        board_init=board_,
+        player_idx=player_idx,
+    )
@@ -0,0 +1,372 @@
+"""Nim with an arbitrary number of heaps of arbitrary size
+
+Legal moves are not materialized, instead ``get_legal_moves`` returns a
+lazy sequence that creates moves on demand. Since each stone on a heap
+corresponds to exactly one move, drawing a random move only requires
+a binary search over the cumulative heap sizes.
+
+"""
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from functools import total_ordering
+from itertools import accumulate
+import random
+from typing import (
+    Any, Generator, Iterator, List, Optional, Sequence, Tuple, overload,
+)
+
+import aidoodle.games.nim as nim
+from aidoodle.rng import Rng
+from aidoodle.utils import slotted, unchecked
+
+
+Player = nim.Player
+PLAYERS = nim.PLAYERS
+init_player = nim.init_player
+winner_to_score = nim.winner_to_score
+
+N_HEAPS = 10  # default number of heaps
+MIN_STONES = 10  # default min stones per heap, inclusive
+MAX_STONES = 50  # default max stones per heap, inclusive
+
+
+@dataclass(frozen=True)
+@total_ordering
+class Move:
+    i: int  # the heap
+    j: int  # the amount
+
+    def __post_init__(self) -> None:
+        if self.i < 0:
+            raise ValueError("Impossible heap")
+        if self.j < 1:
+            raise ValueError("You have to take at least one stone")
+
+    def __repr__(self) -> str:
+        return f"Move({self.i}, {self.j})"
+
+    def __iter__(self) -> Generator[int, None, None]:
+        yield self.i
+        yield self.j
+
+    def __eq__(self, other: Any) -> bool:
+        try:
+            i: int
+            j: int
+            i, j = other
+            return (i == self.i) and (j == self.j)
+        except TypeError:
+            return False
+
+    def __lt__(self, other: Any) -> bool:
+        if not isinstance(other, Move):
+            raise TypeError
+        return (self.i, self.j) < (other.i, other.j)
+
+    def __hash__(self) -> int:
+        return hash((self.i, self.j))
+
+
+MaybePlayer = Optional[Player]
+
+
+@slotted
+@dataclass(frozen=True)
+class Board:
+    state: Tuple[int, ...] = (3, 4, 5)
+    # cumulative number of stones up to and including each heap
+    cumsum: Tuple[int, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if any(n < 0 for n in self.state):
+            raise ValueError("Heaps cannot have a negative amount of stones")
+        object.__setattr__(self, 'cumsum', tuple(accumulate(self.state)))
+
+    @property
+    def total(self) -> int:
+        return self.cumsum[-1] if self.cumsum else 0
+
+    def __repr__(self) -> str:
+        header = "\n|" + "|".join(map(str, range(len(self)))) + "|\n"
+        header += "|" + "+".join('-' for _ in range(len(self))) + "|\n"
+        return header + "|" + "|".join(map(str, self.state)) + "|\n"
+
+    def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+        try:
+            res: bool = self.state == other.state
+            return res
+        except (TypeError, AttributeError):
+            return False
+
+    def __iter__(self) -> Generator[int, None, None]:
+        yield from self.state
+
+    def __len__(self) -> int:
+        return len(self.state)
+
+    def __hash__(self) -> int:
+        return hash(self.state)
+
+
+MaybeBoard = Optional[Board]
+
+
+class LegalMoves(Sequence[Move]):
+    """Immutable sequence of all legal moves of a board
+
+    Moves are ordered by heap, then by amount, and are only created
+    when accessed. Indexing is O(log n_heaps), so that ``random.choice``
+    draws a uniformly random move without building all moves.
+
+    """
+    def __init__(self, board: Board) -> None:
+        self.board = board
+
+    def __len__(self) -> int:
+        return self.board.total
+
+    @overload
+    def __getitem__(self, idx: int) -> Move:
+        ...
+
+    @overload
+    def __getitem__(self, idx: slice) -> Sequence[Move]:
+        ...
+
+    def __getitem__(self, idx: Any) -> Any:
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+
+        n = len(self)
+        if idx < 0:
+            idx += n
+        if not 0 <= idx < n:
+            raise IndexError("Move index out of range")
+
+        cumsum = self.board.cumsum
+        i = bisect_right(cumsum, idx)
+        offset = cumsum[i - 1] if i else 0
+        return unchecked(Move, i=i, j=idx - offset + 1)
+
+    def __iter__(self) -> Iterator[Move]:
+        for i, n in enumerate(self.board):
+            for j in range(1, n + 1):
+                yield unchecked(Move, i=i, j=j)
+
+    def __contains__(self, move: Any) -> bool:
+        try:
+            i: int
+            j: int
+            i, j = move
+        except (TypeError, ValueError):
+            return False
+        return (0 <= i < len(self.board)) and (1 <= j <= self.board.state[i])
+
+    def __repr__(self) -> str:
+        return f"LegalMoves(n={len(self)})"
+
+
+class _RolloutMoves(Sequence[Move]):
+    """Legal moves of a rollout, only valid until its next push or pop
+
+    Indexing scans the heaps, which is cheaper than keeping cumulative
+    sums up to date after every move.
+
+    """
+    def __init__(self, heaps: List[int], total: int) -> None:
+        self.heaps = heaps
+        self.total = total
+
+    def __len__(self) -> int:
+        return self.total
+
+    @overload
+    def __getitem__(self, idx: int) -> Move:
+        ...
+
+    @overload
+    def __getitem__(self, idx: slice) -> Sequence[Move]:
+        ...
+
+    def __getitem__(self, idx: Any) -> Any:
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+
+        if idx < 0:
+            idx += self.total
+        if not 0 <= idx < self.total:
+            raise IndexError("Move index out of range")
+
+        for i, n in enumerate(self.heaps):
+            if idx < n:
+                return unchecked(Move, i=i, j=idx + 1)
+            idx -= n
+        raise IndexError("Move index out of range")
+
+
+def make_random_board(
+        n_heaps: int = N_HEAPS,
+        min_stones: int = MIN_STONES,
+        max_stones: int = MAX_STONES,
+) -> Board:
+    return Board(state=tuple(
+        random.randint(min_stones, max_stones) for _ in range(n_heaps)))
+
+
+@slotted
+@dataclass(frozen=True)
+class Game:
+    players: Tuple[Player, Player]
+    board: Board
+    player_idx: int = 0
+    # legal moves, set by get_legal_moves on first request
+    moves_cache: Optional[Sequence[Move]] = field(
+        default=None, init=False, repr=False, compare=False)
+
+    @property
+    def winner(self) -> MaybePlayer:
+        return determine_winner(self)
+
+    @property
+    def player(self) -> Player:
+        return self.players[self.player_idx]
+
+
+def determine_winner(game: Game) -> MaybePlayer:
+    if game.board.total != 0:  # not yet empty
+        return None
+
+    # last player to have taken a stone loses
+    return game.player
+
+
+def get_next_player_idx(game: Game) -> int:
+    return int(game.player == 1)
+
+
+def get_legal_moves(game: Game) -> Sequence[Move]:
+    moves = game.moves_cache
+    if moves is None:
+        moves = () if game.winner else LegalMoves(game.board)
+        object.__setattr__(game, 'moves_cache', moves)
+    return moves
+
+
+def get_move_group(move: Move) -> int:
+    # moves are grouped by heap for hierarchical search
+    return move.i
+
+
+def apply_move(
+        board: Board,
+        move: Move,
+        player: Player = Player(1),  # pylint: disable=unused-argument
+) -> Board:
+    state = board.state
+    i_heap, n_stones = move
+
+    if (i_heap >= len(state)) or (state[i_heap] < n_stones):
+        raise ValueError('illegal move')
+
+    state_new = state[:i_heap] + (state[i_heap] - n_stones,) + state[i_heap + 1:]
+    return Board(state=state_new)
+
+
+def init_move(
+        s: str,
+        game: Optional[Game] = None,  # pylint: disable=unused-argument
+) -> Move:
+    i: int
+    j: int
+    i, j = eval(s)
+    return Move(i, j)
+
+
+def make_move(
+        game: Game,
+        move: Move,
+        rng: Optional[Rng] = None,  # pylint: disable=unused-argument
+) -> Game:
+    board = apply_move(board=game.board, move=move, player=game.player)
+    player_idx = get_next_player_idx(game)
+    return Game(
+        players=game.players,
+        board=board,
+        player_idx=player_idx,
+    )
+
+
+def game_score(game: Game) -> float:
+    if game.winner is None:
+        raise ValueError("Game is not over, no score yet")
+
+    return winner_to_score(game.winner)
+
+
+class Rollout:
+    """Mutable game state for fast random playouts
+
+    Moves are applied in place with ``push`` and taken back with
+    ``pop``, so no boards or games are allocated per ply.
+
+    """
+    def __init__(self, game: Game) -> None:
+        self.players = game.players
+        self.player_idx = game.player_idx
+        self.heaps: List[int] = list(game.board.state)
+        self.total = game.board.total
+        self.history: List[Tuple[Move, int]] = []
+
+    @property
+    def winner(self) -> MaybePlayer:
+        if self.total:
+            return None
+        # last player to have taken a stone loses
+        return self.players[self.player_idx]
+
+    def legal_moves(self) -> Sequence[Move]:
+        return _RolloutMoves(self.heaps, self.total)
+
+    def push(self, move: Move) -> None:
+        i, j = move
+        if (i >= len(self.heaps)) or (self.heaps[i] < j):
+            raise ValueError('illegal move')
+
+        self.history.append((move, self.player_idx))
+        self.heaps[i] -= j
+        self.total -= j
+        self.player_idx = int(self.players[self.player_idx] == 1)
+
+    def pop(self) -> None:
+        move, self.player_idx = self.history.pop()
+        i, j = move
+        self.heaps[i] += j
+        self.total += j
+
+    def score(self) -> float:
+        winner = self.winner
+        if winner is None:
+            raise ValueError("Game is not over, no score yet")
+        return winner_to_score(winner)
+
+    def to_game(self) -> Game:
+        return Game(
+            players=self.players,
+            board=Board(state=tuple(self.heaps)),
+            player_idx=self.player_idx,
+        )
+
+
+def init_rollout(game: Game) -> Rollout:
+    return Rollout(game)
+
+
+def init_game(board: MaybeBoard = None, player_idx: int = 0) -> Game:
+    board_: Board = board if board is not None else make_random_board()
+    return Game(
+        players=(PLAYERS[1], PLAYERS[2]),
+        board=board_,
+        player_idx=player_idx,
+    )
@@ -0,0 +1,408 @@
+"""Generalized ziczaczoe on an n x n board with k stones in a row to win
+
+Boards are stored as bitboards, one int per player and one for blocked
+cells, so that boards of arbitrary size stay cheap to copy and hash.
+Only the lines through the last placed stone are checked for a
+winner.
+
+"""
+from dataclasses import dataclass, field
+from functools import lru_cache, total_ordering
+import random
+from typing import Any, Generator, List, Optional, Sequence, Tuple
+
+import aidoodle.games.ziczaczoe as zzz
+from aidoodle.rng import Rng
+from aidoodle.utils import slotted, unchecked
+
+
+Player = zzz.Player
+PLAYERS = zzz.PLAYERS
+init_player = zzz.init_player
+winner_to_score = zzz.winner_to_score
+
+N = 9  # default board size
+K = 5  # default number of stones in a row needed to win
+DIRECTIONS: Tuple[Tuple[int, int], ...] = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+@dataclass(frozen=True)
+@total_ordering
+class Move:
+    i: int
+    j: int
+
+    def __post_init__(self) -> None:
+        if (self.i < 0) or (self.j < 0):
+            raise ValueError("Impossible move")
+
+    def __repr__(self) -> str:
+        return f"Move({self.i}, {self.j})"
+
+    def __iter__(self) -> Generator[int, None, None]:
+        yield self.i
+        yield self.j
+
+    def __eq__(self, other: Any) -> bool:
+        try:
+            i: int
+            j: int
+            i, j = other
+            return (i == self.i) and (j == self.j)
+        except TypeError:
+            return False
+
+    def __lt__(self, other: Any) -> bool:
+        if not isinstance(other, Move):
+            raise TypeError
+        return (self.i, self.j) < (other.i, other.j)
+
+    def __hash__(self) -> int:
+        return hash((self.i, self.j))
+
+
+@lru_cache(maxsize=None)
+def _moves(n: int) -> Tuple[Move, ...]:
+    """Preallocated moves of an n x n board, indexed by cell"""
+    return tuple(unchecked(Move, i=i, j=j) for i in range(n) for j in range(n))
+
+
+MaybePlayer = Optional[Player]
+_State = Tuple[Tuple[int, ...], ...]
+
+
+def _yield_bits(bits: int) -> Generator[int, None, None]:
+    """Yield the indices of all set bits, lowest first"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+@slotted
+@dataclass(frozen=True)
+@total_ordering
+class Board:
+    n: int = N
+    k: int = K
+    p1: int = 0  # bitboard of player 1 stones
+    p2: int = 0  # bitboard of player 2 stones
+    blocked: int = 0  # bitboard of blocked cells
+    last: int = -1  # cell of the last placed stone, -1 if unknown
+
+    def __post_init__(self) -> None:
+        if not 0 < self.k <= self.n:
+            raise ValueError("Illegal board")
+        if (self.p1 & self.p2) or ((self.p1 | self.p2) & self.blocked):
+            raise ValueError("Cells can only be occupied once")
+        if (self.p1 | self.p2 | self.blocked) >> (self.n * self.n):
+            raise ValueError("Cells outside of the board")
+
+    @property
+    def empty(self) -> int:
+        full = (1 << (self.n * self.n)) - 1
+        return full & ~(self.p1 | self.p2 | self.blocked)
+
+    def cell(self, i: int, j: int) -> int:
+        """Cell code as used by ziczaczoe, 0 empty, 1/2 player, 9 blocked"""
+        bit = 1 << (i * self.n + j)
+        if self.p1 & bit:
+            return 1
+        if self.p2 & bit:
+            return 2
+        if self.blocked & bit:
+            return 9
+        return 0
+
+    @property
+    def state(self) -> _State:
+        r = range(self.n)
+        return tuple(tuple(self.cell(i, j) for j in r) for i in r)
+
+    def _rrow(self, i: int) -> str:
+        row = self.state[i]
+        width = len(str(self.n - 1))
+        cells = ("{:>{}}".format(c, width) for c in row)
+        srow = "|" + "|".join(cells) + "|"
+        srow = srow.replace("0", " ").replace("1", "x").replace("2", "o").replace("9", "-")
+        return srow
+
+    def __repr__(self) -> str:
+        width = len(str(self.n - 1))
+        pad = " " * width
+        header = pad + "  " + " ".join("{:>{}}".format(j, width) for j in range(self.n))
+        rows = ("{:>{}} ".format(i, width) + self._rrow(i) for i in range(self.n))
+        return "\n".join(("", header, *rows, ""))
+
+    def _key(self) -> Tuple[int, int, int, int, int]:
+        return (self.n, self.k, self.p1, self.p2, self.blocked)
+
+    def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, Board):
+            return False
+        return self._key() == other._key()
+
+    def __lt__(self, other: Any) -> bool:
+        if not isinstance(other, Board):
+            raise TypeError
+        return self._key() < other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+
+MaybeBoard = Optional[Board]
+
+
+@slotted
+@dataclass(frozen=True)
+class Game:
+    players: Tuple[Player, Player]
+    board: Board
+    player_idx: int = 0
+    # legal moves, set by get_legal_moves on first request
+    moves_cache: Optional[Tuple[Move, ...]] = field(
+        default=None, init=False, repr=False, compare=False)
+
+    @property
+    def winner(self) -> MaybePlayer:
+        return determine_winner(self)
+
+    @property
+    def player(self) -> Player:
+        return self.players[self.player_idx]
+
+
+def from_state(state: Sequence[Sequence[int]], k: int = 3) -> Board:
+    """Create a board from a ziczaczoe style state of cell codes"""
+    n = len(state)
+    p1 = p2 = blocked = 0
+    for i, row in enumerate(state):
+        if len(row) != n:
+            raise ValueError("Board must be square")
+        for j, code in enumerate(row):
+            bit = 1 << (i * n + j)
+            if code == 1:
+                p1 |= bit
+            elif code == 2:
+                p2 |= bit
+            elif code == 9:
+                blocked |= bit
+            elif code != 0:
+                raise ValueError(f"Illegal cell code {code}")
+    return Board(n=n, k=k, p1=p1, p2=p2, blocked=blocked)
+
+
+def _in_a_row(bits: int, n: int, k: int, cell: int) -> bool:
+    """Whether the stone on cell is part of k stones in a row"""
+    i, j = divmod(cell, n)
+    for di, dj in DIRECTIONS:
+        count = 1
+        for sign in (1, -1):
+            ii, jj = i + sign * di, j + sign * dj
+            while (0 <= ii < n) and (0 <= jj < n) and (bits >> (ii * n + jj)) & 1:
+                count += 1
+                ii += sign * di
+                jj += sign * dj
+        if count >= k:
+            return True
+    return False
+
+
+def _has_won(bits: int, n: int, k: int) -> bool:
+    return any(_in_a_row(bits, n, k, cell) for cell in _yield_bits(bits))
+
+
+def determine_winner(game: Game) -> MaybePlayer:
+    board = game.board
+    players = game.players
+    n, k = board.n, board.k
+
+    if board.last >= 0:
+        # only the last stone can have completed a line
+        if (board.p1 >> board.last) & 1:
+            if _in_a_row(board.p1, n, k, board.last):
+                return players[0]
+        elif _in_a_row(board.p2, n, k, board.last):
+            return players[1]
+    else:
+        if _has_won(board.p1, n, k):
+            return players[0]
+        if _has_won(board.p2, n, k):
+            return players[1]
+
+    if not board.empty:
+        # codes for tied
+        return PLAYERS[-1]
+
+    # no winner
+    return None
+
+
+def get_next_player_idx(game: Game) -> int:
+    return int(game.player == 1)
+
+
+def _get_all_moves(board: Board) -> Generator[Move, None, None]:
+    moves = _moves(board.n)
+    for cell in _yield_bits(board.empty):
+        yield moves[cell]
+
+
+def get_legal_moves(game: Game) -> Tuple[Move, ...]:
+    moves = game.moves_cache
+    if moves is None:
+        moves = () if game.winner else tuple(_get_all_moves(game.board))
+        object.__setattr__(game, 'moves_cache', moves)
+    return moves
+
+
+def apply_move(
+        board: Board,
+        move: Move,
+        player: Player,
+) -> Board:
+    n = board.n
+    i, j = move
+
+    if not 0 <= i < n or not 0 <= j < n:
+        raise ValueError('Illegal move')
+
+    cell = i * n + j
+    bit = 1 << cell
+    if not board.empty & bit:
+        raise ValueError('Illegal move')
+
+    return Board(
+        n=n,
+        k=board.k,
+        p1=board.p1 | bit if player == 1 else board.p1,
+        p2=board.p2 | bit if player == 2 else board.p2,
+        blocked=board.blocked,
+        last=cell,
+    )
+
+
+def init_move(
+        s: str,
+        game: Optional[Game] = None,  # pylint: disable=unused-argument
+) -> Move:
+    i: int
+    j: int
+    i, j = eval(s)
+    return Move(i, j)
+
+
+def make_move(
+        game: Game,
+        move: Move,
+        rng: Optional[Rng] = None,  # pylint: disable=unused-argument
+) -> Game:
+    board = apply_move(board=game.board, move=move, player=game.player)
+    player_idx = get_next_player_idx(game)
+    return Game(
+        players=game.players,
+        board=board,
+        player_idx=player_idx,
+    )
+
+
+def game_score(game: Game) -> float:
+    if game.winner is None:
+        raise ValueError("Game is not over, no score yet")
+
+    return winner_to_score(game.winner)
+
+
+class Rollout:
+    """Mutable game state for fast random playouts
+
+    Moves are applied in place with ``push`` and taken back with
+    ``pop``, so no boards or games are allocated per ply.
+
+    """
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, game: Game) -> None:
+        board = game.board
+        self.players = game.players
+        self.player_idx = game.player_idx
+        self.n = board.n
+        self.k = board.k
+        self.bits = [board.p1, board.p2]
+        self.blocked = board.blocked
+        self.empty = board.empty
+        self.last = board.last
+        self.winner: MaybePlayer = game.winner
+        self.history: List[Tuple[int, int, MaybePlayer]] = []
+
+    def legal_moves(self) -> List[Move]:
+        if self.winner:
+            return []
+        moves = _moves(self.n)
+        return [moves[cell] for cell in _yield_bits(self.empty)]
+
+    def push(self, move: Move) -> None:
+        n = self.n
+        i, j = move
+        cell = i * n + j
+        bit = 1 << cell
+        if self.winner or not (0 <= i < n) or not (0 <= j < n) or not self.empty & bit:
+            raise ValueError('Illegal move')
+
+        player = self.players[self.player_idx]
+        side = 0 if player == 1 else 1
+        self.history.append((cell, self.player_idx, self.winner))
+        self.bits[side] |= bit
+        self.empty ^= bit
+        if _in_a_row(self.bits[side], n, self.k, cell):
+            self.winner = player
+        elif not self.empty:
+            self.winner = PLAYERS[-1]
+        self.player_idx = int(player == 1)
+
+    def pop(self) -> None:
+        cell, self.player_idx, self.winner = self.history.pop()
+        bit = 1 << cell
+        self.bits[0] &= ~bit
+        self.bits[1] &= ~bit
+        self.empty |= bit
+
+    def score(self) -> float:
+        if self.winner is None:
+            raise ValueError("Game is not over, no score yet")
+        return winner_to_score(self.winner)
+
+    def to_game(self) -> Game:
+        last = self.history[-1][0] if self.history else self.last
+        board = Board(
+            n=self.n,
+            k=self.k,
+            p1=self.bits[0],
+            p2=self.bits[1],
+            blocked=self.blocked,
+            last=last,
+        )
+        return Game(players=self.players, board=board, player_idx=self.player_idx)
+
+
+def init_rollout(game: Game) -> Rollout:
+    return Rollout(game)
+
+
+def random_board(n: int = N, k: int = K, p_blocked: float = 0.25) -> Board:
+    blocked = 0
+    for cell in range(n * n):
+        if random.random() < p_blocked:
+            blocked |= 1 << cell
+    return Board(n=n, k=k, blocked=blocked)
+
+
+def init_game(board: MaybeBoard = None, player_idx: int = 0) -> Game:
+    board_: Board = board if board is not None else Board()
+    return Game(
+        players=(PLAYERS[1], PLAYERS[2]),
+        board=board_,
+        player_idx=player_idx,
+    )
@@ -1,12 +1,16 @@
 from dataclasses import dataclass, replace
-import random
-from typing import Any, List, Tuple, Optional, Set
+import math
+from typing import Any, Dict, Tuple, Optional, Set
+
+from aidoodle.rng import Rng, choice
+from aidoodle.utils import slotted
 
 
 POSSIBLE_PLAYERS: Set[int] = {1, 2}
 POSSIBLE_MOVES: Set[str] = {'r', 'c'}  # reroll, continue
 POSSIBLE_EYES = {1, 2, 3, 4, 5, 6}
 THRESHOLD = 50
+MEAN_SUM = 7  # average sum of eyes of a roll
 
 
 @dataclass(frozen=True)
@@ -32,11 +36,23 @@ class Die:
 
 
 _Dice = Tuple[Die, Die]
+# preallocated instances, to avoid creating and validating new ones
+DICE: Tuple[Die, ...] = tuple(Die(eye) for eye in sorted(POSSIBLE_EYES))
+
+
+def roll(rng: Optional[Rng] = None) -> _Dice:
+    return choice(DICE, rng=rng), choice(DICE, rng=rng)
+
 
+def _dice_with_sum(eyes: int) -> _Dice:
+    eye0 = max(1, eyes - 6)
+    return DICE[eye0 - 1], DICE[eyes - eye0 - 1]
 
-def roll() -> _Dice:
-    eyes = list(POSSIBLE_EYES)
-    return Die(random.choice(eyes)), Die(random.choice(eyes))
+
+# only the sum of the dice matters, so there is one roll per sum, with
+# the probability of rolling that sum
+ROLLS: Tuple[Tuple[_Dice, float], ...] = tuple(
+    (_dice_with_sum(eyes), (6 - abs(eyes - 7)) / 36) for eyes in range(2, 13))
 
 
 @dataclass(frozen=True)
@@ -96,9 +112,15 @@ class Player:
         return hash(self.i)
 
 
+PLAYERS: Dict[int, Player] = {i: Player(i) for i in POSSIBLE_PLAYERS}
+MOVES: Dict[str, Move] = {m: Move(m) for m in POSSIBLE_MOVES}
+MOVES_ALL: Tuple[Move, ...] = (MOVES['r'], MOVES['c'])
+MOVES_REROLLED: Tuple[Move, ...] = (MOVES['c'],)
+
 MaybePlayer = Optional[Player]
 
 
+@slotted
 @dataclass(frozen=True)
 class Board:
     dice: _Dice
@@ -113,8 +135,14 @@ class Board:
         return "\n".join(("", header, players, scores, ""))
 
     def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
         try:
-            res: bool = self.state == other.state
+            res: bool = (
+                (self.state == other.state)
+                and (self.rerolled == other.rerolled)
+                and (self.dice == other.dice)
+            )
             return res
         except (TypeError, AttributeError):
             return False
@@ -129,6 +157,7 @@ class Board:
 MaybeBoard = Optional[Board]
 
 
+@slotted
 @dataclass(frozen=True)
 class Game:
     players: Tuple[Player, Player]
@@ -153,36 +182,40 @@ def determine_winner(game: Game) -> MaybePlayer:
         return None
 
     if s0 >= target:
-        return Player(1)
+        return PLAYERS[1]
 
-    return Player(2)
+    return PLAYERS[2]
 
 
 def get_next_player_idx(game: Game) -> int:
-    return int(game.player == Player(1))
+    return int(game.player == 1)
 
 
-def get_legal_moves(game: Game) -> List[Move]:
+def get_legal_moves(game: Game) -> Tuple[Move, ...]:
     if game.winner:
-        return []
+        return ()
 
     if game.board.rerolled:
-        return [Move('c')]
+        return MOVES_REROLLED
 
-    return [Move('r'), Move('c')]
+    return MOVES_ALL
 
 
 def apply_move(
         board: Board,
         move: Move,
         player: Player = Player(1),
+        rng: Optional[Rng] = None,
+        dice: Optional[_Dice] = None,
 ) -> Board:
+    """Return the board after the move, with the given or random new dice"""
     state = board.state
 
     if (move == 'r') and board.rerolled:
         raise ValueError('Illegal move')
 
-    dice = roll()
+    if dice is None:
+        dice = roll(rng=rng)
     if move == 'r':
         return replace(board, rerolled=True, dice=dice)
 
@@ -206,9 +239,7 @@ def init_player(i: int) -> Player:
     return Player(i)
 
 
-def make_move(game: Game, move: Move) -> Game:
-    board = apply_move(board=game.board, move=move, player=game.player)
-
+def _next_game(game: Game, move: Move, board: Board) -> Game:
     if move == 'c':  # change player only on continue
         player_idx = get_next_player_idx(game)
     else:
@@ -221,6 +252,19 @@ def make_move(game: Game, move: Move) -> Game:
     )
 
 
+def make_move(game: Game, move: Move, rng: Optional[Rng] = None) -> Game:
+    board = apply_move(board=game.board, move=move, player=game.player, rng=rng)
+    return _next_game(game, move, board)
+
+
+def get_chance_outcomes(game: Game, move: Move) -> Tuple[Tuple[float, Game], ...]:
+    """Probability of each game the move can lead to, one per sum of the new dice"""
+    return tuple(
+        (p, _next_game(game, move, apply_move(
+            board=game.board, move=move, player=game.player, dice=dice)))
+        for dice, p in ROLLS)
+
+
 def winner_to_score(winner: Player) -> float:
     if winner == 1:
         return 1.0
@@ -237,10 +281,20 @@ def game_score(game: Game) -> float:
     return winner_to_score(game.winner)
 
 
+def evaluate(game: Game) -> float:
+    """Heuristic score for player 1 from the turns both players still need"""
+    s0, s1, target = game.board.state
+    turns1 = max(0, target - s0) / MEAN_SUM
+    turns2 = max(0, target - s1) / MEAN_SUM
+    # the player to move is half a turn ahead
+    lead = turns2 - turns1 + (0.5 if game.player == 1 else -0.5)
+    return 1.0 / (1.0 + math.exp(-lead))
+
+
 def init_game(board: MaybeBoard = None, player_idx: int = 0) -> Game:
     board_: Board = board if board is not None else Board(dice=roll())
     return Game(
-        players=(Player(1), Player(2)),
+        players=(PLAYERS[1], PLAYERS[2]),
         board=board_,
         player_idx=player_idx,
     )
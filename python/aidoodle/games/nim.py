@@ -1,7 +1,10 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from functools import total_ordering
 import random
-from typing import Any, List, Tuple, Optional, Generator, Set
+from typing import Any, Dict, List, Tuple, Optional, Generator, Set
+
+from aidoodle.rng import Rng
+from aidoodle.utils import slotted, unchecked
 
 
 POSSIBLE_PLAYERS: Set[int] = {1, 2}
@@ -72,9 +75,13 @@ class Player:
         return hash(self.i)
 
 
+# preallocated instances, to avoid creating and validating new ones
+PLAYERS: Dict[int, Player] = {i: Player(i) for i in POSSIBLE_PLAYERS}
+
 MaybePlayer = Optional[Player]
 
 
+@slotted
 @dataclass(frozen=True)
 class Board:
     state: Tuple[int, int, int] = (3, 4, 5)
@@ -85,6 +92,8 @@ class Board:
         return header + "|" + "|".join(map(str, self.state)) + "|\n"
 
     def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
         try:
             res: bool = self.state == other.state
             return res
@@ -111,11 +120,15 @@ def make_random_board() -> Board:
         random.randint(3, 6)))
 
 
+@slotted
 @dataclass(frozen=True)
 class Game:
     players: Tuple[Player, Player]
     board: Board
     player_idx: int = 0
+    # legal moves, set by get_legal_moves on first request
+    moves_cache: Optional[Tuple[Move, ...]] = field(
+        default=None, init=False, repr=False, compare=False)
 
     @property
     def winner(self) -> MaybePlayer:
@@ -137,7 +150,7 @@ def determine_winner(game: Game) -> MaybePlayer:
 
 
 def get_next_player_idx(game: Game) -> int:
-    return int(game.player == Player(1))
+    return int(game.player == 1)
 
 
 def _get_all_moves(board: Board) -> Generator[Move, None, None]:
@@ -146,14 +159,21 @@ def _get_all_moves(board: Board) -> Generator[Move, None, None]:
             continue
 
         for j in range(1, n + 1):
-            yield Move(i, j)
+            # moves are known to be valid
+            yield unchecked(Move, i=i, j=j)
+
 
+def get_legal_moves(game: Game) -> Tuple[Move, ...]:
+    moves = game.moves_cache
+    if moves is None:
+        moves = () if game.winner else tuple(_get_all_moves(game.board))
+        object.__setattr__(game, 'moves_cache', moves)
+    return moves
 
-def get_legal_moves(game: Game) -> List[Move]:
-    if game.winner:
-        return []
 
-    return list(_get_all_moves(game.board))
+def get_move_group(move: Move) -> int:
+    # moves are grouped by heap for hierarchical search
+    return move.i
 
 
 def apply_move(
@@ -189,7 +209,11 @@ def init_player(i: int) -> Player:
     return Player(i)
 
 
-def make_move(game: Game, move: Move) -> Game:
+def make_move(
+        game: Game,
+        move: Move,
+        rng: Optional[Rng] = None,  # pylint: disable=unused-argument
+) -> Game:
     board = apply_move(board=game.board, move=move, player=game.player)
     player_idx = get_next_player_idx(game)
     return Game(
@@ -215,10 +239,71 @@ def game_score(game: Game) -> float:
     return winner_to_score(game.winner)
 
 
+class Rollout:
+    """Mutable game state for fast random playouts
+
+    Moves are applied in place with ``push`` and taken back with
+    ``pop``, so no boards or games are allocated per ply.
+
+    """
+    def __init__(self, game: Game) -> None:
+        self.players = game.players
+        self.player_idx = game.player_idx
+        self.heaps: List[int] = list(game.board.state)
+        self.total = sum(self.heaps)
+        self.history: List[Tuple[Move, int]] = []
+
+    @property
+    def winner(self) -> MaybePlayer:
+        if self.total:
+            return None
+        # last player to have taken a stone loses
+        return self.players[self.player_idx]
+
+    def legal_moves(self) -> List[Move]:
+        return [
+            unchecked(Move, i=i, j=j)
+            for i, n in enumerate(self.heaps) for j in range(1, n + 1)]
+
+    def push(self, move: Move) -> None:
+        i, j = move
+        if self.heaps[i] < j:
+            raise ValueError('illegal move')
+
+        self.history.append((move, self.player_idx))
+        self.heaps[i] -= j
+        self.total -= j
+        self.player_idx = int(self.players[self.player_idx] == 1)
+
+    def pop(self) -> None:
+        move, self.player_idx = self.history.pop()
+        i, j = move
+        self.heaps[i] += j
+        self.total += j
+
+    def score(self) -> float:
+        winner = self.winner
+        if winner is None:
+            raise ValueError("Game is not over, no score yet")
+        return winner_to_score(winner)
+
+    def to_game(self) -> Game:
+        i, j, k = self.heaps
+        return Game(
+            players=self.players,
+            board=Board(state=(i, j, k)),
+            player_idx=self.player_idx,
+        )
+
+
+def init_rollout(game: Game) -> Rollout:
+    return Rollout(game)
+
+
 def init_game(board: MaybeBoard = None, player_idx: int = 0) -> Game:
     board_: Board = board if board is not None else make_random_board()
     return Game(
-        players=(Player(1), Player(2)),
+        players=(PLAYERS[1], PLAYERS[2]),
         board=board_,
         player_idx=player_idx,
     )
@@ -3,11 +3,13 @@ from itertools import product
 from typing import Optional, Set, Tuple
 
 import aidoodle.games.ziczaczoe as zzz
+from aidoodle.utils import slotted
 
 
 Move = zzz.Move
 Game = zzz.Game
 Player = zzz.Player
+PLAYERS = zzz.PLAYERS
 apply_move = zzz.apply_move
 determine_winner = zzz.determine_winner
 init_move = zzz.init_move
@@ -15,6 +17,7 @@ init_player = zzz.init_player
 get_legal_moves = zzz.get_legal_moves
 make_move = zzz.make_move
 game_score = zzz.game_score
+init_rollout = zzz.init_rollout
 
 
 POSSIBLE_MOVES: Set[Tuple[int, int]] = set(product(range(3), range(3)))
@@ -29,6 +32,7 @@ TICTACTOEBOARD = (
     (9, 9, 9, 9, 9))
 
 
+@slotted
 @dataclass(frozen=True)
 class Board(zzz.Board):
     """custom zzz board that's only shows first 3 rows and columns"""
@@ -63,7 +67,7 @@ def init_game(board: MaybeBoard = None, player_idx: int = 0) -> Game:
         board_ = board
 
     return Game(
-        players=(Player(1), Player(2)),
+        players=(PLAYERS[1], PLAYERS[2]),
         board=board_,
         player_idx=player_idx,
     )
@@ -1,8 +1,12 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from functools import total_ordering
 from itertools import product
+import math
 import random
-from typing import Any, List, Tuple, Optional, Generator, Set
+from typing import Any, Dict, List, Tuple, Optional, Generator, Set
+
+from aidoodle.rng import Rng
+from aidoodle.utils import slotted
 
 
 POSSIBLE_PLAYERS: Set[int] = {-1, 1, 2}  # -1 <- tied
@@ -71,6 +75,10 @@ class Player:
         return hash(self.i)
 
 
+# preallocated instances, to avoid creating and validating new ones
+PLAYERS: Dict[int, Player] = {i: Player(i) for i in POSSIBLE_PLAYERS}
+MOVES: Dict[Tuple[int, int], Move] = {(i, j): Move(i, j) for i, j in POSSIBLE_MOVES}
+
 MaybePlayer = Optional[Player]
 _Row = Tuple[int, int, int, int, int]
 _Triple = Tuple[int, int, int]
@@ -108,6 +116,7 @@ STATES: List[_State] = [
      (0, 0, 0, 9, 9)),
 ]
 
+@slotted
 @dataclass(frozen=True)
 @total_ordering
 class Board:
@@ -158,11 +167,15 @@ class Board:
 MaybeBoard = Optional[Board]
 
 
+@slotted
 @dataclass(frozen=True)
 class Game:
     players: Tuple[Player, Player]
     board: Board
     player_idx: int = 0
+    # legal moves, set by get_legal_moves on first request
+    moves_cache: Optional[Tuple[Move, ...]] = field(
+        default=None, init=False, repr=False, compare=False)
 
     @property
     def winner(self) -> MaybePlayer:
@@ -233,31 +246,33 @@ def determine_winner(game: Game) -> MaybePlayer:
 
     if not get_possible_moves(game):
         # codes for tied
-        return Player(-1)
+        return PLAYERS[-1]
 
     # no winner
     return None
 
 
 def get_next_player_idx(game: Game) -> int:
-    return int(game.player == Player(1))
+    return int(game.player == 1)
 
 
 def _get_all_moves(board: Board) -> Generator[Move, None, None]:
-    for i, j in POSSIBLE_MOVES:
-        if board.state[i][j] == 0:
-            yield Move(i, j)
+    state = board.state
+    for (i, j), move in MOVES.items():
+        if state[i][j] == 0:
+            yield move
 
 
 def get_possible_moves(game: Game) -> List[Move]:
     return list(_get_all_moves(game.board))
 
 
-def get_legal_moves(game: Game) -> List[Move]:
-    if not game.winner:
-        legal_moves = list(_get_all_moves(game.board))
-        return legal_moves
-    return []
+def get_legal_moves(game: Game) -> Tuple[Move, ...]:
+    moves = game.moves_cache
+    if moves is None:
+        moves = () if game.winner else tuple(_get_all_moves(game.board))
+        object.__setattr__(game, 'moves_cache', moves)
+    return moves
 
 
 def _make_row(row: _Row, player: Player, i: int) -> _Row:
@@ -304,7 +319,11 @@ def init_player(i: int) -> Player:
     return Player(i)
 
 
-def make_move(game: Game, move: Move) -> Game:
+def make_move(
+        game: Game,
+        move: Move,
+        rng: Optional[Rng] = None,  # pylint: disable=unused-argument
+) -> Game:
     board = apply_move(board=game.board, move=move, player=game.player)
     player_idx = get_next_player_idx(game)
     return Game(
@@ -332,6 +351,122 @@ def game_score(game: Game) -> float:
     return winner_to_score(game.winner)
 
 
+DIRECTIONS: Tuple[Tuple[int, int], ...] = ((0, 1), (1, 0), (1, 1), (1, -1))
+# cells of all lines of 3 on the board
+LINES: Tuple[Tuple[Tuple[int, int], ...], ...] = tuple(
+    tuple((i + k * di, j + k * dj) for k in range(3))
+    for i, j in product(range(5), range(5))
+    for di, dj in DIRECTIONS
+    if (0 <= i + 2 * di < 5) and (0 <= j + 2 * dj < 5))
+# heuristic weight of an open line by the number of stones on it
+LINE_WEIGHTS = (0.0, 1.0, 4.0)
+EVALUATE_SCALE = 16.0
+
+
+class Rollout:
+    """Mutable game state for fast random playouts
+
+    Moves are applied in place with ``push`` and taken back with
+    ``pop``, so no boards or games are allocated per ply. After a move,
+    only the lines through the new stone are checked for a winner.
+
+    """
+    def __init__(self, game: Game) -> None:
+        self.players = game.players
+        self.player_idx = game.player_idx
+        self.board_cls = type(game.board)
+        self.cells: List[List[int]] = [list(row) for row in game.board.state]
+        self.n_empty = sum(row.count(0) for row in self.cells)
+        self.winner: MaybePlayer = game.winner
+        self.history: List[Tuple[Move, int, MaybePlayer]] = []
+
+    def legal_moves(self) -> List[Move]:
+        if self.winner:
+            return []
+        cells = self.cells
+        return [move for (i, j), move in MOVES.items() if cells[i][j] == 0]
+
+    def _completes_line(self, i: int, j: int, w: int = 3) -> bool:
+        cells = self.cells
+        n = len(cells)
+        val = cells[i][j]
+        for di, dj in DIRECTIONS:
+            count = 1
+            for sign in (1, -1):
+                ii, jj = i + sign * di, j + sign * dj
+                while (0 <= ii < n) and (0 <= jj < n) and (cells[ii][jj] == val):
+                    count += 1
+                    ii += sign * di
+                    jj += sign * dj
+            if count >= w:
+                return True
+        return False
+
+    def push(self, move: Move) -> None:
+        i, j = move
+        if self.winner or self.cells[i][j] != 0:
+            raise ValueError('Illegal move')
+
+        player = self.players[self.player_idx]
+        self.history.append((move, self.player_idx, self.winner))
+        self.cells[i][j] = int(player)
+        self.n_empty -= 1
+        if self._completes_line(i, j):
+            self.winner = player
+        elif not self.n_empty:
+            self.winner = PLAYERS[-1]
+        self.player_idx = int(player == 1)
+
+    def pop(self) -> None:
+        move, self.player_idx, self.winner = self.history.pop()
+        i, j = move
+        self.cells[i][j] = 0
+        self.n_empty += 1
+
+    def score(self) -> float:
+        if self.winner is None:
+            raise ValueError("Game is not over, no score yet")
+        return winner_to_score(self.winner)
+
+    def to_game(self) -> Game:
+        row0, row1, row2, row3, row4 = (tuple(row) for row in self.cells)
+        board = self.board_cls(state=(row0, row1, row2, row3, row4))  # type: ignore
+        return Game(players=self.players, board=board, player_idx=self.player_idx)
+
+
+def init_rollout(game: Game) -> Rollout:
+    return Rollout(game)
+
+
+def evaluate(game: Game) -> float:
+    """Heuristic score for player 1 from the lines both players can still complete
+
+    A line is open for a player if it has neither blocked cells nor
+    stones of the other player. If the player to move has an open line
+    with two stones, they win with their next move. A completed line
+    means the game is already won.
+
+    """
+    state = game.board.state
+    mover = int(game.player)
+    lead = 0.0
+    for (i0, j0), (i1, j1), (i2, j2) in LINES:
+        cells = (state[i0][j0], state[i1][j1], state[i2][j2])
+        if 9 in cells:
+            continue
+        n1 = cells.count(1)
+        n2 = cells.count(2)
+        if n1 and not n2:
+            if (n1 == 3) or ((n1 == 2) and (mover == 1)):
+                return 1.0
+            lead += LINE_WEIGHTS[n1]
+        elif n2 and not n1:
+            if (n2 == 3) or ((n2 == 2) and (mover == 2)):
+                return 0.0
+            lead -= LINE_WEIGHTS[n2]
+    return 1.0 / (1.0 + math.exp(-lead / EVALUATE_SCALE))
+
+
 def _random_row() -> _Row:
     choices = [0, 0, 0, 9]
     c = random.choice
@@ -359,7 +494,7 @@ def init_game(board: MaybeBoard = None, player_idx: int = 0) -> Game:
         )
 
     return Game(
-        players=(Player(1), Player(2)),
+        players=(PLAYERS[1], PLAYERS[2]),
         board=board,
         player_idx=player_idx,
     )
@@ -0,0 +1,82 @@
+"""Seedable random number streams for search and engines
+
+Functions that use randomness take an optional ``rng``. If it is None,
+they fall back to the global ``random`` module, as before.
+
+"""
+import random
+from typing import Iterator, List, Optional, Sequence, TypeVar, Union
+
+import numpy as np
+
+
+T = TypeVar('T')
+BLOCK_SIZE = 4096  # number of values drawn from numpy at once
+
+Seed = Union[None, int, np.random.SeedSequence]
+
+
+class Rng:
+    """Stream of random numbers drawn in blocks from a NumPy Generator
+
+    Drawing a whole block of uniform floats at once avoids the overhead
+    of calling into NumPy for each value. Use ``spawn`` to create
+    independent child streams, e.g. one per worker, that are
+    reproducible given the seed of the parent.
+
+    """
+    def __init__(self, seed: Seed = None, block_size: int = BLOCK_SIZE) -> None:
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self.seed_seq = seed
+        self.block_size = block_size
+        self.generator = np.random.default_rng(seed)
+        self._block: Iterator[float] = iter(())
+
+    def random(self) -> float:
+        """Uniform float in [0, 1)"""
+        try:
+            return next(self._block)
+        except StopIteration:
+            self._block = iter(self.generator.random(self.block_size).tolist())
+            return next(self._block)
+
+    def randrange(self, n: int) -> int:
+        """Uniform int in [0, n)"""
+        if n < 1:
+            raise ValueError("Empty range")
+        return int(self.random() * n)
+
+    def randint(self, a: int, b: int) -> int:
+        """Uniform int in [a, b], including b"""
+        return a + self.randrange(b - a + 1)
+
+    def choice(self, seq: Sequence[T]) -> T:
+        if not seq:
+            raise IndexError("Cannot choose from an empty sequence")
+        return seq[int(self.random() * len(seq))]
+
+    def spawn(self, n: int) -> List['Rng']:
+        """Independent child streams"""
+        return [Rng(seed, block_size=self.block_size) for seed in self.seed_seq.spawn(n)]
+
+    def __repr__(self) -> str:
+        return f"Rng(entropy={self.seed_seq.entropy})"
+
+
+def choice(seq: Sequence[T], rng: Optional[Rng] = None) -> T:
+    if rng is None:
+        return random.choice(seq)
+    return rng.choice(seq)
+
+
+def randint(a: int, b: int, rng: Optional[Rng] = None) -> int:
+    if rng is None:
+        return random.randint(a, b)
+    return rng.randint(a, b)
+
+
+def randrange(n: int, rng: Optional[Rng] = None) -> int:
+    if rng is None:
+        return random.randrange(n)
+    return rng.randrange(n)
@@ -2,30 +2,45 @@ from dataclasses import replace
 import gc
 import json
 import os
+import random
 import time
 from typing import Any, Optional, Tuple, Dict, List, Set
 
 import click
 
 from aidoodle.agents import Agents, MctsAgent, RandomAgent, CliInputAgent
+from aidoodle.agents import AlphaBetaAgent, ExpectimaxAgent, PerfectAgent, SolvedDiceAgent
+from aidoodle.ai import book as opening_book
+from aidoodle.ai import expectimax
+from aidoodle.ai import pns
+from aidoodle.ai import retrograde
+from aidoodle.ai import tablebase
 from aidoodle.agents import Concession
 from aidoodle.core import Board
 from aidoodle.core import Engine
 from aidoodle.core import Player
 from aidoodle.games import battle
+from aidoodle.games import bigbattle
+from aidoodle.games import bignim
+from aidoodle.games import bigzzz
 from aidoodle.games import dumbdice
 from aidoodle.games import nim
 from aidoodle.games import tictactoe
 from aidoodle.games import ziczaczoe
+from aidoodle.rng import Rng
 
 
-AGENTS = ['random', 'mcts', 'cli']
+# solved only plays dice, perfect only plays tictactoe
+AGENTS = ['random', 'mcts', 'cli', 'solved', 'perfect', 'alphabeta', 'expectimax']
 ENGINES: Dict[str, Engine] = {
     'tictactoe': tictactoe,  # type: ignore
     'nim': nim,  # type: ignore
     'dice': dumbdice,  # type: ignore
     'battle': battle,  # type: ignore
     'ziczaczoe': ziczaczoe,  # type: ignore
+    'bigzzz': bigzzz,  # type: ignore
+    'bignim': bignim,  # type: ignore
+    'bigbattle': bigbattle,  # type: ignore
 }
 GAMES = list(ENGINES)
 PAUSE = 0.5  # human play
@@ -39,6 +54,7 @@ def play_game(
         silent: bool = False,
         n_runs: Optional[int] = None,
         pause: float = 0.0,
+        rng: Optional[Rng] = None,
 ) -> Tuple[int, int, int, int]:
     n_games = 0
     n_wins1 = 0
@@ -54,6 +70,7 @@ def play_game(
             board=board,
             silent=silent,
             pause=pause,
+            rng=rng,
         )
         if n_runs is None:
             cont = input("(q) to quit playing: ")
@@ -89,6 +106,7 @@ def _play_game(
         board: Optional[Board] = None,
         silent: bool = False,
         pause: float = 0.0,
+        rng: Optional[Rng] = None,
 ) -> Player:
     sink: Any = _void if silent else print
     game = engine.init_game(board=board)
@@ -111,7 +129,7 @@ def _play_game(
         try:
             move = agent.next_move(game)
             sink(f"{agent.player} performs move {move}", flush=True)
-            game = engine.make_move(game=game, move=move)
+            game = engine.make_move(game=game, move=move, rng=rng)
         except Concession as exc:
             conf = exc.args[0]
             sink(f"{agent.player} conceded because confidence was only {conf}")
@@ -147,12 +165,18 @@ def _play_game(
               help="agent depth")
 @click.option('--learning', default=False, type=click.BOOL,
               help="agent learns between games")
-def run(
+@click.option('--time_budget', default=1.0, type=click.FLOAT,
+              help="seconds per move of the alphabeta agent")
+@click.option('--depth', default=expectimax.DEPTH, type=click.INT,
+              help="decisions searched by the expectimax agent")
+def run(  # pylint: disable=too-many-arguments
         start: bool,
         agent: str,
         game: str,
         n_iter: int,
         learning: bool = False,
+        time_budget: float = 1.0,
+        depth: int = expectimax.DEPTH,
 ) -> Tuple[int, int, int, int]:
     engine = ENGINES[game]
 
@@ -176,6 +200,16 @@ def run(
             n_iter=n_iter,
             reuse_cache=learning,
         )
+    elif agent == 'solved':
+        agent2 = SolvedDiceAgent(player=engine.init_player(agent_idx), engine=engine)
+    elif agent == 'perfect':
+        agent2 = PerfectAgent(player=engine.init_player(agent_idx), engine=engine)
+    elif agent == 'alphabeta':
+        agent2 = AlphaBetaAgent(
+            player=engine.init_player(agent_idx), engine=engine, time_budget=time_budget)
+    elif agent == 'expectimax':
+        agent2 = ExpectimaxAgent(
+            player=engine.init_player(agent_idx), engine=engine, depth=depth)
     else:
         raise ValueError
 
@@ -200,6 +234,10 @@ def run(
               help="agent 1 depth")
 @click.option('--n_iter2', default=1000, type=click.INT,
               help="agent 2 depth")
+@click.option('--minimax_weight1', default=0.0, type=click.FLOAT,
+              help="weight of implicit minimax backups of mcts agent 1")
+@click.option('--minimax_weight2', default=0.0, type=click.FLOAT,
+              help="weight of implicit minimax backups of mcts agent 2")
 @click.option('--learning1', default=False, type=click.BOOL,
               help="agent 1 learns between game")
 @click.option('--learning2', default=False, type=click.BOOL,
@@ -208,7 +246,17 @@ def run(
               help="number of simulations")
 @click.option('--silent', default=True, type=click.BOOL,
               help="show intermediate results")
-def simulate(  # pylint: disable=too-many-arguments,too-many-locals
+@click.option('--seed', default=None, type=click.INT,
+              help="seed for reproducible simulations")
+@click.option('--endgames', default=None, type=click.STRING,
+              help="endgame database used by mcts agents (ziczaczoe only)")
+@click.option('--book', default=None, type=click.STRING,
+              help="opening book used by mcts agents (ziczaczoe only)")
+@click.option('--time_budget', default=1.0, type=click.FLOAT,
+              help="seconds per move of alphabeta agents")
+@click.option('--depth', default=expectimax.DEPTH, type=click.INT,
+              help="decisions searched by expectimax agents")
+def simulate(  # pylint: disable=too-many-arguments,too-many-locals,too-many-branches
         game: str,
         agent1: str,
         agent2: str,
@@ -218,40 +266,134 @@ def simulate(  # pylint: disable=too-many-arguments,too-many-locals
         learning1: bool = False,
         learning2: bool = False,
         silent: bool = True,
+        seed: Optional[int] = None,
+        endgames: Optional[str] = None,
+        book: Optional[str] = None,
+        time_budget: float = 1.0,
+        depth: int = expectimax.DEPTH,
+        minimax_weight1: float = 0.0,
+        minimax_weight2: float = 0.0,
 ) -> Tuple[int, int, int, int]:
     engine = ENGINES[game]
+    oracle = retrograde.load(endgames) if endgames else None
+    book_ = opening_book.load(book) if book else None
+
+    # independent streams for both agents and the game itself
+    rng1: Optional[Rng] = None
+    rng2: Optional[Rng] = None
+    rng_game: Optional[Rng] = None
+    if seed is not None:
+        random.seed(seed)  # initial boards
+        rng1, rng2, rng_game = Rng(seed).spawn(3)
 
     agent1_: Agents
     if agent1 == 'random':
-        agent1_ = RandomAgent(engine=engine, player=engine.init_player(1))
+        agent1_ = RandomAgent(engine=engine, player=engine.init_player(1), rng=rng1)
     elif agent1 == 'mcts':
         agent1_ = MctsAgent(
             player=engine.init_player(1),
             engine=engine,
             n_iter=n_iter1,
             reuse_cache=learning1,
+            oracle=oracle,
+            book=book_,
+            rng=rng1,
+            minimax_weight=minimax_weight1,
         )
+    elif agent1 == 'solved':
+        agent1_ = SolvedDiceAgent(player=engine.init_player(1), engine=engine)
+    elif agent1 == 'perfect':
+        agent1_ = PerfectAgent(player=engine.init_player(1), engine=engine, rng=rng1)
+    elif agent1 == 'alphabeta':
+        agent1_ = AlphaBetaAgent(
+            player=engine.init_player(1), engine=engine, time_budget=time_budget)
+    elif agent1 == 'expectimax':
+        agent1_ = ExpectimaxAgent(player=engine.init_player(1), engine=engine, depth=depth)
     else:
         raise ValueError
 
     agent2_: Agents
     if agent2 == 'random':
-        agent2_ = RandomAgent(engine=engine, player=engine.init_player(2))
+        agent2_ = RandomAgent(engine=engine, player=engine.init_player(2), rng=rng2)
     elif agent2 == 'mcts':
         agent2_ = MctsAgent(
             player=engine.init_player(2),
             engine=engine,
             n_iter=n_iter2,
             reuse_cache=learning2,
+            oracle=oracle,
+            book=book_,
+            rng=rng2,
+            minimax_weight=minimax_weight2,
         )
+    elif agent2 == 'solved':
+        agent2_ = SolvedDiceAgent(player=engine.init_player(2), engine=engine)
+    elif agent2 == 'perfect':
+        agent2_ = PerfectAgent(player=engine.init_player(2), engine=engine, rng=rng2)
+    elif agent2 == 'alphabeta':
+        agent2_ = AlphaBetaAgent(
+            player=engine.init_player(2), engine=engine, time_budget=time_budget)
+    elif agent2 == 'expectimax':
+        agent2_ = ExpectimaxAgent(player=engine.init_player(2), engine=engine, depth=depth)
     else:
         raise ValueError
 
     n_games, n_wins1, n_wins2, n_ties = play_game(
-        agent1_, agent2_, engine=engine, n_runs=n_runs, silent=silent)
+        agent1_, agent2_, engine=engine, n_runs=n_runs, silent=silent, rng=rng_game)
     return n_games, n_wins1, n_wins2, n_ties
 
 
+@click.command()
+@click.option('--output', default=tablebase.PATH, type=click.STRING,
+              help="file to write the tablebase to")
+def build_tablebase(output: str) -> None:
+    tic = time.time()
+    tablebase.build(output)
+    print(f"Wrote tictactoe tablebase to {output} in {time.time() - tic:.1f}s")
+
+
+@click.command()
+@click.option('--output', default=retrograde.PATH, type=click.STRING,
+              help="file to write the database to")
+@click.option('--k', default=retrograde.K, type=click.INT,
+              help="maximum number of empty cells")
+def build_endgames(output: str, k: int) -> None:
+    tic = time.time()
+    n_positions = retrograde.build(k=k, path=output)
+    print(f"Wrote {n_positions} ziczaczoe endgame positions to {output} "
+          f"in {time.time() - tic:.1f}s")
+
+
+@click.command()
+@click.option('--output', default=opening_book.PATH, type=click.STRING,
+              help="file to write the book to")
+@click.option('--boards', default=None, type=click.STRING,
+              help="tsv file of ai-generate-zzz-boards, the premade boards if not set")
+@click.option('--n_plies', default=opening_book.N_PLIES, type=click.INT,
+              help="number of plies covered")
+@click.option('--n_iter', default=opening_book.N_ITER, type=click.INT,
+              help="search depth per position")
+@click.option('--processes', default=None, type=click.INT,
+              help="number of worker processes, one per CPU if not set")
+@click.option('--seed', default=None, type=click.INT,
+              help="seed for a reproducible book")
+def build_book(  # pylint: disable=too-many-arguments
+        output: str,
+        boards: Optional[str],
+        n_plies: int,
+        n_iter: int,
+        processes: Optional[int],
+        seed: Optional[int],
+) -> None:
+    layouts = opening_book.read_boards(boards) if boards else retrograde.LAYOUTS
+    tic = time.time()
+    book = opening_book.build(
+        layouts, n_plies=n_plies, n_iter=n_iter, processes=processes, seed=seed)
+    opening_book.save(book, output)
+    print(f"Wrote {len(book)} ziczaczoe opening positions to {output} "
+          f"in {time.time() - tic:.1f}s")
+
+
 def available_memory() -> float:
     """System memory in MB"""
     import psutil
@@ -269,13 +411,23 @@ def available_memory() -> float:
               help="number of boards tested")
 @click.option('--silent', default=True, type=click.BOOL,
               help="show intermediate results")
-def generate_zzz_boards(
+@click.option('--max_nodes', default=pns.MAX_NODES, type=click.INT,
+              help="nodes to prove the outcome of a board before simulating, 0 to skip")
+def generate_zzz_boards(  # pylint: disable=too-many-arguments,too-many-locals,too-many-statements
         output: str,
         n_iter: int,
         n_runs: int,
         n_sims: int,
         silent: bool,
+        max_nodes: int = pns.MAX_NODES,
 ) -> None:
+    """Simulate games on random boards to find balanced ones
+
+    Boards whose outcome for the first player can be proven within
+    max_nodes are not simulated. Their ``value`` is the proven outcome
+    and their ``iter`` is 0.
+
+    """
     try:
         import pandas as pd
     except ImportError:
@@ -300,6 +452,7 @@ def generate_zzz_boards(
     if not os.path.exists(output):
         df = pd.DataFrame({
             'wins1': [], 'wins2': [], 'ties': [], 'board': [], 'dur': [], 'iter': [],
+            'value': [],
         })
     else:
         df = pd.read_table(output)
@@ -309,6 +462,9 @@ def generate_zzz_boards(
     dur: List[float] = df['dur'].tolist()
     iters: List[int] = df['iter'].tolist()
     boards: List[str] = df['board'].tolist()
+    values: List[str] = (
+        df['value'].tolist() if 'value' in df  # else written before boards were solved
+        else [pns.Outcome.unknown.name] * len(boards))
     board_set: Set[str] = set(boards)
     counter = 1
 
@@ -328,18 +484,29 @@ def generate_zzz_boards(
         print(str(board))
         time.sleep(1)
 
-        _, n_wins1, n_wins2, n_ties = play_game(
-            agent1, agent2, engine=engine, n_runs=n_runs, board=board, silent=silent)
+        game = engine.init_game(board=board)
+        if (max_nodes > 0) and engine.get_legal_moves(game):
+            outcome = pns.solve(game, engine=engine, max_nodes=max_nodes)
+        else:
+            outcome = pns.Outcome.unknown
+        if outcome == pns.Outcome.unknown:
+            _, n_wins1, n_wins2, n_ties = play_game(
+                agent1, agent2, engine=engine, n_runs=n_runs, board=board, silent=silent)
+            iters.append(n_iter)
+        else:
+            print(f"Proven outcome for the first player: {outcome.name}")
+            n_wins1 = n_wins2 = n_ties = 0
+            iters.append(0)
         wins1.append(n_wins1)
         wins2.append(n_wins2)
         ties.append(n_ties)
-        iters.append(n_iter)
+        values.append(outcome.name)
         boards.append(str(board))
         board_set.add(str(board))
         dur.append(float("{:.0f}".format(time.time() - tic)))
         pd.DataFrame({
             'wins1': wins1, 'wins2': wins2, 'ties': ties, 'dur': dur, 'iter': iters,
-            'board': boards,
+            'board': boards, 'value': values,
         }).to_csv(output, sep='\t', index=False)
         counter += 1
 
@@ -0,0 +1,211 @@
+# type: ignore
+
+
+from functools import lru_cache
+import random
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def alphabeta():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.ai import alphabeta
+    return alphabeta
+
+
+@pytest.fixture(scope='session')
+def ttt():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import tictactoe
+    return tictactoe
+
+
+@pytest.fixture(scope='session')
+def nim():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import nim
+    return nim
+
+
+def negamax(engine):
+    """Score for player 1 by plain recursion"""
+    @lru_cache(maxsize=None)
+    def score(game):
+        moves = engine.get_legal_moves(game)
+        if not moves:
+            return engine.game_score(game)
+        scores = [score(engine.make_move(game, move)) for move in moves]
+        return max(scores) if game.player == 1 else min(scores)
+    return score
+
+
+def random_positions(engine, n, max_plies, seed=0):
+    rnd = random.Random(seed)
+    games = []
+    while len(games) < n:
+        game = engine.init_game()
+        for _ in range(rnd.randint(0, max_plies)):
+            game = engine.make_move(game, rnd.choice(engine.get_legal_moves(game)))
+            if not engine.get_legal_moves(game):
+                break
+        if engine.get_legal_moves(game):
+            games.append(game)
+    return games
+
+
+class TestTranspositionTable:
+    def make_entry(self, alphabeta, game, depth, generation):
+        return alphabeta.Entry(
+            game=game, depth=depth, value=0.5, bound=alphabeta.EXACT, move=None,
+            solved=False, generation=generation)
+
+    def test_get_put(self, alphabeta, ttt):
+        table = alphabeta.TranspositionTable(size=16)
+        game = ttt.init_game()
+        assert table.get(game) is None
+
+        entry = self.make_entry(alphabeta, game, depth=1, generation=table.generation)
+        table.put(entry)
+        assert table.get(game) is entry
+        assert len(table) == 1
+
+    def test_replacement(self, alphabeta, ttt):
+        # with a single slot, all games compete for it
+        table = alphabeta.TranspositionTable(size=1)
+        game1 = ttt.init_game()
+        game2 = ttt.make_move(game1, ttt.Move(0, 0))
+
+        deep = self.make_entry(alphabeta, game1, depth=3, generation=table.generation)
+        table.put(deep)
+        shallow = self.make_entry(alphabeta, game2, depth=2, generation=table.generation)
+        table.put(shallow)
+        assert table.get(game1) is deep
+        assert table.get(game2) is None
+
+        # entries of earlier searches are always replaced
+        table.new_search()
+        shallow = self.make_entry(alphabeta, game2, depth=2, generation=table.generation)
+        table.put(shallow)
+        assert table.get(game2) is shallow
+        assert table.get(game1) is None
+
+    def test_size_must_be_positive(self, alphabeta):
+        with pytest.raises(ValueError):
+            alphabeta.TranspositionTable(size=0)
+
+
+class TestSearch:
+    def test_tictactoe_matches_negamax(self, alphabeta, ttt):
+        score = negamax(ttt)
+        table = alphabeta.TranspositionTable()
+        for game in random_positions(ttt, n=30, max_plies=6):
+            result = alphabeta.search(game, engine=ttt, time_budget=60, table=table)
+            assert result.exact
+            assert result.score == score(game)
+            assert score(ttt.make_move(game, result.move)) == result.score
+
+    def test_nim_matches_negamax(self, alphabeta, nim):
+        score = negamax(nim)
+        table = alphabeta.TranspositionTable()
+        for game in random_positions(nim, n=30, max_plies=5):
+            result = alphabeta.search(game, engine=nim, time_budget=60, table=table)
+            assert result.exact
+            assert result.score == score(game)
+            assert score(nim.make_move(game, result.move)) == result.score
+
+    def test_empty_board_is_draw(self, alphabeta, ttt):
+        result = alphabeta.search(ttt.init_game(), engine=ttt, time_budget=60)
+        assert result.exact
+        assert result.score == 0.5
+        assert result.depth == 9
+
+    def test_finds_winning_move(self, alphabeta, ttt):
+        # x has (0, 0) and (0, 1), o has (1, 0) and (1, 1)
+        game = ttt.init_game()
+        for i, j in [(0, 0), (1, 0), (0, 1), (1, 1)]:
+            game = ttt.make_move(game, ttt.Move(i, j))
+        result = alphabeta.search(game, engine=ttt, time_budget=60)
+        assert result.move == (0, 2)
+        assert result.score == 1.0
+        assert result.exact
+        # a proven win stops the deepening, even though not all moves are solved
+        assert result.depth == 1
+
+    def test_max_depth(self, alphabeta, ttt):
+        result = alphabeta.search(ttt.init_game(), engine=ttt, max_depth=2)
+        assert result.depth == 2
+        assert not result.exact
+        assert result.score == 0.5
+
+    def test_evaluate_at_depth_limit(self, alphabeta, ttt):
+        def evaluate(game):
+            # player 1 likes the center
+            return 1.0 if game.board.state[1][1] == 1 else 0.0
+
+        result = alphabeta.search(ttt.init_game(), engine=ttt, max_depth=1, evaluate=evaluate)
+        assert result.move == (1, 1)
+        assert result.score == 1.0
+
+    def test_engine_evaluate(self, alphabeta, ttt):
+        engine = SimpleNamespace(
+            get_legal_moves=ttt.get_legal_moves,
+            make_move=ttt.make_move,
+            game_score=ttt.game_score,
+            evaluate=lambda game: 1.0 if game.board.state[2][2] == 1 else 0.0,
+        )
+        result = alphabeta.search(ttt.init_game(), engine=engine, max_depth=1)
+        assert result.move == (2, 2)
+
+    def test_first_depth_ignores_time_budget(self, alphabeta, ttt):
+        result = alphabeta.search(ttt.init_game(), engine=ttt, time_budget=0)
+        assert result.depth >= 1
+
+    def test_time_budget(self, alphabeta):
+        # pylint: disable=import-outside-toplevel
+        import time
+        from aidoodle.games import ziczaczoe
+
+        game = ziczaczoe.init_game(board=ziczaczoe.Board())
+        tic = time.perf_counter()
+        result = alphabeta.search(game, engine=ziczaczoe, time_budget=0.2)
+        assert time.perf_counter() - tic < 2.0
+        assert not result.exact
+
+    def test_invalid_arguments_raise(self, alphabeta, ttt):
+        game = ttt.init_game()
+        for i, j in [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)]:
+            game = ttt.make_move(game, ttt.Move(i, j))
+        with pytest.raises(ValueError):
+            alphabeta.search(game, engine=ttt)
+        with pytest.raises(ValueError):
+            alphabeta.search(ttt.init_game(), engine=ttt, max_depth=0)
+
+
+class TestAlphaBetaAgent:
+    def test_never_loses_to_random(self, ttt):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.agents import AlphaBetaAgent, RandomAgent
+        from aidoodle.rng import Rng
+
+        agent = AlphaBetaAgent(player=ttt.PLAYERS[2], engine=ttt, time_budget=60)
+        rand = RandomAgent(player=ttt.PLAYERS[1], engine=ttt, rng=Rng(0))
+        for _ in range(10):
+            game = ttt.init_game()
+            while not game.winner:
+                player = rand if game.player == 1 else agent
+                game = ttt.make_move(game, player.next_move(game))
+            assert game.winner != 1
+        # the table is kept between moves
+        assert len(agent.table)
+
+    def test_nim(self, nim):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.agents import AlphaBetaAgent
+
+        score = negamax(nim)
+        game = nim.init_game()
+        agent = AlphaBetaAgent(player=game.player, engine=nim, time_budget=60)
+        move = agent.next_move(game)
+        assert score(nim.make_move(game, move)) == score(game)
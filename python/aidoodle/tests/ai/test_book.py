@@ -0,0 +1,133 @@
+# type: ignore
+
+
+import pytest
+
+
+# 7 free cells
+STATE = (
+    (0, 9, 0, 9, 9),
+    (9, 0, 0, 9, 9),
+    (0, 0, 9, 9, 9),
+    (9, 9, 9, 9, 0),
+    (9, 9, 9, 9, 9),
+)
+
+
+@pytest.fixture(scope='session')
+def book():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.ai import book
+    return book
+
+
+@pytest.fixture(scope='session')
+def zzz():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import ziczaczoe
+    return ziczaczoe
+
+
+@pytest.fixture(scope='session')
+def board_cls(zzz):
+    # tictactoe.init_game replaces ziczaczoe.Board by its own subclass,
+    # which is printed differently
+    return next(cls for cls in zzz.Board.__mro__ if cls.__module__ == zzz.__name__)
+
+
+@pytest.fixture(scope='session')
+def board(zzz):
+    return zzz.Board(STATE)
+
+
+@pytest.fixture(scope='session')
+def opening(book, board):
+    return book.build([board], n_plies=2, n_iter=100, processes=1, seed=0)
+
+
+class TestBoards:
+    def test_parse_board(self, book, zzz, board_cls):
+        boards = [board_cls(state) for state in zzz.STATES]
+        boards += [board_cls(zzz.random_board(premade=False).state) for _ in range(10)]
+        for board in boards:
+            assert book.parse_board(str(board)) == board
+
+    def test_read_boards(self, book, zzz, board_cls, tmp_path):
+        # pylint: disable=import-outside-toplevel
+        import csv
+
+        # same layout as written by pandas in ai-generate-zzz-boards
+        boards = [board_cls(state) for state in zzz.STATES[:2]]
+        path = tmp_path / 'boards.tsv'
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f, delimiter='\t')
+            writer.writerow(['wins1', 'wins2', 'ties', 'dur', 'iter', 'board'])
+            for board in boards:
+                writer.writerow([1, 2, 3, 4.0, 100, str(board)])
+        assert book.read_boards(str(path)) == boards
+
+
+class TestBuild:
+    def test_opening_positions(self, book, zzz, board):
+        assert book.opening_positions([board], n_plies=1) == [zzz.init_game(board=board)]
+        games = book.opening_positions([board, board], n_plies=2)
+        assert len(games) == 1 + 7
+        assert len(book.opening_positions([board], n_plies=3)) == 1 + 7 + 7 * 6
+
+    def test_covers_opening_positions(self, book, zzz, board, opening):
+        assert len(opening) == 1 + 7
+        for game in book.opening_positions([board], n_plies=2):
+            assert game in opening
+            moves = {(i, j) for i, j, _, _ in opening.stats(game)}
+            assert moves == {(move.i, move.j) for move in zzz.get_legal_moves(game)}
+            assert sum(s for _, _, _, s in opening.stats(game)) == 100
+
+    def test_reproducible(self, book, board, opening):
+        assert book.build([board], n_plies=2, n_iter=100, processes=1, seed=0) == opening
+        # does not depend on the number of processes
+        assert book.build([board], n_plies=2, n_iter=100, processes=2, seed=0) == opening
+
+    def test_save_load(self, book, opening, tmp_path):
+        path = str(tmp_path / 'book.json')
+        book.save(opening, path)
+        assert book.load(path) == opening
+
+    def test_load_wrong_version_raises(self, book, tmp_path):
+        path = tmp_path / 'book.json'
+        path.write_text('{"version": 0, "n_iter": 1, "positions": {}}')
+        with pytest.raises(ValueError):
+            book.load(str(path))
+
+
+class TestBook:
+    def test_best_move_is_most_visited(self, zzz, board, opening):
+        game = zzz.init_game(board=board)
+        i, j, _, _ = max(opening.stats(game), key=lambda stat: stat[3])
+        assert opening.best_move(game) == (i, j)
+
+    def test_uncovered_position(self, zzz, board, opening):
+        game = zzz.init_game(board=board)
+        for _ in range(2):
+            game = zzz.make_move(game, zzz.get_legal_moves(game)[0])
+        assert game not in opening
+        assert opening.stats(game) is None
+        assert opening.best_move(game) is None
+        assert opening.best_move(zzz.init_game(board=zzz.Board())) is None
+
+    def test_mcts_agent_answers_from_book(self, zzz, board, opening):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.agents import MctsAgent
+
+        cache = {}
+        agent = MctsAgent(
+            player=zzz.PLAYERS[1], engine=zzz, n_iter=100, reuse_cache=True,
+            cache=cache, book=opening)
+        game = zzz.init_game(board=board)
+        assert agent.next_move(game) == opening.best_move(game)
+        assert not cache
+
+        # searches once the book ends
+        game = zzz.make_move(game, agent.next_move(game))
+        game = zzz.make_move(game, agent.next_move(game))
+        agent.next_move(game)
+        assert cache
@@ -0,0 +1,146 @@
+# type: ignore
+
+
+from functools import lru_cache
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def dicesolver():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.ai import dicesolver
+    return dicesolver
+
+
+@pytest.fixture(scope='session')
+def dice():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import dumbdice
+    return dumbdice
+
+
+def make_game(dice, state, eyes=(1, 1), rerolled=False, player_idx=0):
+    board = dice.Board(
+        dice=(dice.DICE[eyes[0] - 1], dice.DICE[eyes[1] - 1]),
+        state=state,
+        rerolled=rerolled,
+    )
+    return dice.init_game(board=board, player_idx=player_idx)
+
+
+def reference(target):
+    """Win probability of the player to move by plain recursion"""
+    p_eyes = {
+        eyes: sum(i + j == eyes for i in range(1, 7) for j in range(1, 7)) / 36
+        for eyes in range(2, 13)}
+
+    @lru_cache(maxsize=None)
+    def win(own, other, eyes, rerolled):
+        cont = 1.0 if own + eyes >= target else 1.0 - fresh(other, own + eyes)
+        if rerolled:
+            return cont
+        return max(cont, sum(p * win(own, other, e, True) for e, p in p_eyes.items()))
+
+    @lru_cache(maxsize=None)
+    def fresh(own, other):
+        return sum(p * win(own, other, e, False) for e, p in p_eyes.items())
+
+    return win
+
+
+class TestSolve:
+    @pytest.mark.parametrize('target', [2, 13, 20])
+    def test_matches_recursion(self, dicesolver, target):
+        solution = dicesolver.solve(target)
+        win = reference(target)
+        for own in range(target):
+            for other in range(target):
+                for eyes in range(2, 13):
+                    for rerolled in (False, True):
+                        assert solution.win_probability(
+                            own, other, eyes, rerolled) == pytest.approx(
+                                win(own, other, eyes, rerolled))
+
+    def test_solution_is_cached(self, dicesolver):
+        assert dicesolver.solve() is dicesolver.solve()
+
+    def test_probabilities(self, dicesolver):
+        solution = dicesolver.solve()
+        p_win = solution.win_fresh
+        assert ((p_win > -1e-12) & (p_win < 1 + 1e-12)).all()
+        # being ahead is better
+        assert solution.win_fresh[30, 10] > solution.win_fresh[10, 30]
+
+
+class TestEvaluate:
+    def test_finished_game(self, dicesolver, dice):
+        assert dicesolver.evaluate(make_game(dice, (50, 20, 50))) == 1.0
+        assert dicesolver.evaluate(make_game(dice, (20, 50, 50))) == 0.0
+
+    def test_perspective_of_player_1(self, dicesolver, dice):
+        game1 = make_game(dice, (30, 10, 50), player_idx=0)
+        game2 = make_game(dice, (10, 30, 50), player_idx=1)
+        assert dicesolver.evaluate(game1) == pytest.approx(1 - dicesolver.evaluate(game2))
+
+    def test_sure_win(self, dicesolver, dice):
+        game = make_game(dice, (45, 48, 50), eyes=(3, 2))
+        assert dicesolver.evaluate(game) == 1.0
+        assert dicesolver.best_move(game) == 'c'
+
+
+class TestBestMove:
+    def test_reroll_bad_dice(self, dicesolver, dice):
+        game = make_game(dice, (0, 4, 50), eyes=(1, 1))
+        assert dicesolver.best_move(game) == 'r'
+
+    def test_keep_good_dice(self, dicesolver, dice):
+        game = make_game(dice, (0, 4, 50), eyes=(6, 6))
+        assert dicesolver.best_move(game) == 'c'
+
+    def test_continue_after_reroll(self, dicesolver, dice):
+        game = make_game(dice, (0, 4, 50), eyes=(1, 1), rerolled=True)
+        assert dicesolver.best_move(game) == 'c'
+
+    def test_finished_game_raises(self, dicesolver, dice):
+        with pytest.raises(ValueError):
+            dicesolver.best_move(make_game(dice, (50, 20, 50)))
+
+
+class TestSolvedDiceAgent:
+    def test_beats_random_agent(self, dice):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.agents import RandomAgent, SolvedDiceAgent
+        from aidoodle.rng import Rng
+
+        rng = Rng(0)
+        solved = SolvedDiceAgent(player=dice.PLAYERS[1], engine=dice)
+        rand = RandomAgent(player=dice.PLAYERS[2], engine=dice, rng=rng)
+        wins = 0
+        for _ in range(200):
+            game = dice.init_game(board=dice.Board(dice=dice.roll(rng=rng)))
+            while not game.winner:
+                agent = solved if game.player == 1 else rand
+                move = agent.next_move(game)
+                assert move in dice.get_legal_moves(game)
+                game = dice.make_move(game, move, rng=rng)
+            wins += game.winner == 1
+        assert wins > 120
+
+    def test_other_engine_raises(self):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.agents import SolvedDiceAgent
+        from aidoodle.games import nim
+
+        with pytest.raises(ValueError):
+            SolvedDiceAgent(player=nim.PLAYERS[1], engine=nim)
+
+    def test_as_mcts_simulator(self, dicesolver, dice):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.agents import MctsAgent
+
+        game = make_game(dice, (45, 48, 50), eyes=(3, 2))
+        agent = MctsAgent(
+            player=dice.PLAYERS[1], engine=dice, n_iter=50,
+            simulator=dicesolver.evaluate)
+        assert agent.next_move(game) == 'c'
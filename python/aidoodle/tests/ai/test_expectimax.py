@@ -0,0 +1,192 @@
+# type: ignore
+
+
+from functools import lru_cache
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def expectimax():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.ai import expectimax
+    return expectimax
+
+
+@pytest.fixture(scope='session')
+def dice():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import dumbdice
+    return dumbdice
+
+
+@pytest.fixture(scope='session')
+def battle():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import battle
+    return battle
+
+
+@pytest.fixture(scope='session')
+def ttt():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import tictactoe
+    return tictactoe
+
+
+def dice_game(dice, s0, s1, d0, d1, target=20, rerolled=False, player_idx=0):
+    board = dice.Board(
+        state=(s0, s1, target), dice=(dice.DICE[d0 - 1], dice.DICE[d1 - 1]),
+        rerolled=rerolled)
+    return dice.init_game(board=board, player_idx=player_idx)
+
+
+def expected_score(engine):
+    """Exact expected score for player 1 by plain recursion"""
+    @lru_cache(maxsize=None)
+    def value(game):
+        moves = engine.get_legal_moves(game)
+        if not moves:
+            return engine.game_score(game)
+        values = [
+            sum(p * value(child) for p, child in engine.get_chance_outcomes(game, move))
+            for move in moves]
+        return max(values) if game.player == 1 else min(values)
+    return value
+
+
+class TestSearch:
+    def test_takes_the_winning_roll(self, expectimax, dice):
+        # 4 + 5 is enough to win, rerolling might not be
+        game = dice_game(dice, 15, 15, 4, 5)
+        result = expectimax.search(game, engine=dice, depth=1)
+        assert result.move == 'c'
+        assert result.score == pytest.approx(1.0)
+
+    def test_rerolls_bad_roll(self, expectimax, dice):
+        # player 2 needs 5 and 1 + 1 does not win
+        game = dice_game(dice, 15, 15, 1, 1, player_idx=1)
+        result = expectimax.search(game, engine=dice, depth=2, evaluate=lambda game: 0.5)
+        assert result.move == 'r'
+        # rerolling wins with probability 30 / 36, otherwise the game
+        # is at the depth limit
+        assert result.score == pytest.approx(6 / 36 * 0.5)
+
+    def test_matches_exact_value(self, expectimax, dice):
+        # with a low target, the whole game fits into the search depth
+        value = expected_score(dice)
+        for game in [dice_game(dice, 2, 3, 3, 4, target=8),
+                     dice_game(dice, 0, 0, 1, 2, target=6, player_idx=1)]:
+            result = expectimax.search(game, engine=dice, depth=20)
+            assert result.score == pytest.approx(value(game))
+            child_value = sum(
+                p * value(child) for p, child in dice.get_chance_outcomes(game, result.move))
+            assert child_value == pytest.approx(value(game))
+
+    def test_engine_evaluate_at_depth_limit(self, expectimax, dice):
+        game = dice_game(dice, 10, 10, 3, 3, target=50)
+        result = expectimax.search(game, engine=dice, depth=1)
+        assert 0.0 < result.score < 1.0
+        assert result.score != pytest.approx(0.5)
+
+        result = expectimax.search(game, engine=dice, depth=1, evaluate=lambda game: 0.5)
+        assert result.score == pytest.approx(0.5)
+
+    def test_deterministic_engine(self, expectimax, ttt):
+        # x has (0, 0) and (0, 1), o has (1, 0) and (1, 1)
+        game = ttt.init_game()
+        for i, j in [(0, 0), (1, 0), (0, 1), (1, 1)]:
+            game = ttt.make_move(game, ttt.Move(i, j))
+        result = expectimax.search(game, engine=ttt, depth=1)
+        assert result.move == (0, 2)
+        assert result.score == 1.0
+
+    def test_cache(self, expectimax, dice):
+        game = dice_game(dice, 10, 10, 3, 3, target=50)
+        cache = expectimax.Cache()
+        result = expectimax.search(game, engine=dice, depth=3, cache=cache)
+        assert len(cache)
+        # the root is not cached, the games after its moves are searched
+        # the remaining two decisions deep
+        assert cache.get(game) is None
+        children = [
+            child for move in dice.get_legal_moves(game)
+            for _, child in dice.get_chance_outcomes(game, move)]
+        cached = [cache.get(child) for child in children]
+        assert any(cached)
+        assert all(c[1] == 2 for c in cached if c is not None)
+
+        # cached games searched deep enough are not searched again
+        again = expectimax.search(game, engine=dice, depth=3, cache=cache)
+        assert again.score == result.score
+        assert again.n_nodes < result.n_nodes
+
+        # shallower values are not used for deeper searches
+        deeper = expectimax.search(game, engine=dice, depth=4, cache=cache)
+        assert deeper.score == expectimax.search(game, engine=dice, depth=4).score
+
+    def test_cache_is_bounded(self, expectimax, dice):
+        cache = expectimax.Cache(size=1)
+        game1 = dice_game(dice, 10, 10, 3, 3, target=50)
+        game2 = dice_game(dice, 20, 10, 3, 3, target=50)
+        cache.put(game1, 0.25, 3)
+        cache.put(game2, 0.75, 2)
+        assert cache.get(game1) == (0.25, 3)
+        assert cache.get(game2) is None
+        assert len(cache) == 1
+
+        # values from earlier searches are replaced
+        cache.new_search()
+        cache.put(game2, 0.75, 2)
+        assert cache.get(game2) == (0.75, 2)
+        assert cache.get(game1) is None
+
+        with pytest.raises(ValueError):
+            expectimax.Cache(size=0)
+
+    def test_battle(self, expectimax, battle):
+        p1, p2 = battle.PLAYERS[1], battle.PLAYERS[2]
+        state = (battle.Melee(owner=p1, hp=3),) + (None,) * 4
+        state += (battle.Ranger(owner=p2, hp=1),) + (None,) * 4
+        game = battle.init_game(board=battle.Board(state=state, active_idx=0))
+        # attacking kills the ranger for sure, healing gives it a shot
+        result = expectimax.search(game, engine=battle, depth=2)
+        assert result.move == battle.Move(5)
+        assert result.score == 1.0
+
+    def test_invalid_arguments_raise(self, expectimax, dice):
+        with pytest.raises(ValueError):
+            expectimax.search(dice_game(dice, 20, 0, 1, 1), engine=dice)
+        with pytest.raises(ValueError):
+            expectimax.search(dice_game(dice, 0, 0, 1, 1), engine=dice, depth=0)
+
+
+class TestExpectimaxAgent:
+    def test_keeps_cache_between_moves(self, dice):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.agents import ExpectimaxAgent
+
+        agent = ExpectimaxAgent(player=dice.PLAYERS[1], engine=dice, depth=2)
+        game = dice_game(dice, 10, 10, 3, 3, target=50)
+        assert agent.next_move(game) in ('c', 'r')
+        n_cached = len(agent.cache)
+        assert n_cached
+        agent.next_move(dice_game(dice, 20, 10, 3, 3, target=50))
+        assert len(agent.cache) > n_cached
+
+    def test_beats_random_at_battle(self, battle):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.agents import ExpectimaxAgent, RandomAgent
+        from aidoodle.rng import Rng
+
+        rng = Rng(0)
+        agent = ExpectimaxAgent(player=battle.PLAYERS[1], engine=battle, depth=2)
+        rand = RandomAgent(player=battle.PLAYERS[2], engine=battle, rng=rng)
+        wins = 0
+        for _ in range(5):
+            game = battle.init_game()
+            while not game.winner:
+                player = agent if game.player == 1 else rand
+                game = battle.make_move(game, player.next_move(game), rng=rng)
+            wins += game.winner == 1
+        assert wins >= 4
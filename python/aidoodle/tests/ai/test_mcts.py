@@ -3,6 +3,8 @@
 # pylint: disable=import-outside-toplevel
 
 from functools import partial
+import random
+
 import pytest
 
 
@@ -68,6 +70,346 @@ class TestSelection:
         assert selected == expected
 
 
+class TestHierarchical:
+    @pytest.fixture(scope='session')
+    def engine(self):
+        from aidoodle.games import bignim
+        return bignim
+
+    @pytest.fixture
+    def game(self, engine):
+        return engine.init_game(board=engine.Board((2, 0, 3)))
+
+    def test_expand_groups_by_heap(self, engine, game, node_cls):
+        from aidoodle.ai.mcts import expand
+
+        node = node_cls(game=game)
+        expand(node, engine=engine, hierarchical=True)
+        assert [group.key for group in node.groups] == [0, 2]
+        assert [len(group.edges) for group in node.groups] == [2, 3]
+        assert [edge for group in node.groups for edge in group.edges] == node.edges
+
+    def test_expand_without_groups(self, engine, game, node_cls):
+        from aidoodle.ai.mcts import expand
+
+        node = node_cls(game=game)
+        expand(node, engine=engine)
+        assert len(node.edges) == 5
+        assert not node.groups
+
+    def test_group_stats_are_updated(self, engine, game, node_cls):
+        from aidoodle.ai.mcts import search_iteration
+
+        root = node_cls(game=game)
+        for _ in range(50):
+            search_iteration(root, engine=engine, cache={}, hierarchical=True)
+
+        for group in root.groups:
+            assert group.s == sum(edge.s for edge in group.edges)
+            assert group.w == pytest.approx(sum(edge.w for edge in group.edges))
+        assert sum(group.s for group in root.groups) == 50
+
+    def test_mcts_situation(self, engine):
+        # agent should leave (1, 1, 1) by taking 9 stones from heap 2
+        from aidoodle.agents import MctsAgent
+
+        agent = MctsAgent(
+            player=engine.init_player(1),
+            engine=engine,
+            n_iter=1000,
+            hierarchical=True,
+        )
+        game = engine.init_game(board=engine.Board((1, 1, 10)))
+        move = agent.next_move(game)
+        assert move == engine.Move(2, 9)
+
+
+class TestLazy:
+    @pytest.fixture(scope='session')
+    def engine(self):
+        from aidoodle.games import bignim
+        return bignim
+
+    @pytest.fixture
+    def game(self, engine):
+        return engine.init_game(board=engine.Board((2, 0, 3)))
+
+    def test_expand_creates_no_edges(self, engine, game, node_cls):
+        from aidoodle.ai.mcts import expand
+
+        node = node_cls(game=game)
+        expand(node, engine=engine, lazy=True)
+        assert node.edges == []
+        assert node.n_untried == 5
+
+    def test_edges_are_created_when_tried(self, engine, game, node_cls):
+        from aidoodle.ai.mcts import search_iteration
+
+        root = node_cls(game=game)
+        for i in range(1, 6):
+            search_iteration(root, engine=engine, cache={}, lazy=True)
+            assert len(root.edges) == i
+            assert all(edge.s == 1 for edge in root.edges)
+        assert [edge.move for edge in root.edges] == list(root.moves)
+
+        search_iteration(root, engine=engine, cache={}, lazy=True)
+        assert len(root.edges) == 5
+        assert root.n_untried == 0
+        assert sum(edge.s for edge in root.edges) == 6
+
+    def test_random_strategy_draws_untried_moves_at_random(
+            self, engine, game, node_cls):
+        from aidoodle.ai.mcts import Strategy, _select_edge, expand
+
+        first = set()
+        for _ in range(50):
+            node = node_cls(game=game)
+            expand(node, engine=engine, lazy=True)
+            _, edge = _select_edge(node, strategy=Strategy.random)
+            assert node.moves[0] == edge.move
+            assert sorted(node.moves) == sorted(engine.get_legal_moves(game))
+            first.add(edge.move)
+        assert len(first) > 1
+
+    def test_hierarchical_nodes_are_not_lazy(self, engine, game, node_cls):
+        from aidoodle.ai.mcts import expand
+
+        node = node_cls(game=game)
+        expand(node, engine=engine, hierarchical=True, lazy=True)
+        assert len(node.edges) == 5
+
+    def test_terminal_node(self, engine, node_cls):
+        from aidoodle.ai.mcts import search_iteration
+
+        game = engine.init_game(board=engine.Board((1,)))
+        root = node_cls(game=game)
+        for _ in range(3):
+            search_iteration(root, engine=engine, cache={}, lazy=True)
+        assert root.edges[0].s == 3
+
+    def test_mcts_situation(self, engine):
+        # agent should leave (1, 1, 1) by taking 3 stones from heap 2
+        from aidoodle.agents import MctsAgent
+
+        agent = MctsAgent(
+            player=engine.init_player(1),
+            engine=engine,
+            n_iter=500,
+            lazy=True,
+        )
+        game = engine.init_game(board=engine.Board((1, 1, 4)))
+        move = agent.next_move(game)
+        assert move == engine.Move(2, 3)
+
+
+class TestInterning:
+    @pytest.fixture(scope='session')
+    def engine(self):
+        from aidoodle.games import tictactoe
+        return tictactoe
+
+    def test_cached_games_are_canonical(self, engine, node_cls):
+        from aidoodle.ai.mcts import search_iteration
+        from aidoodle.utils import Interner
+
+        interner = Interner()
+        root = node_cls(game=engine.init_game())
+        cache = {}
+        for _ in range(300):
+            search_iteration(root, engine=engine, cache=cache, interner=interner)
+
+        for game, node in cache.items():
+            if node is not root:
+                assert interner(game) is game
+                assert node.game is game
+
+    def test_agent_with_interning(self, engine):
+        from aidoodle.agents import MctsAgent
+
+        agent = MctsAgent(
+            player=engine.init_player(1),
+            engine=engine,
+            n_iter=200,
+            intern=True,
+        )
+        game = engine.init_game()
+        assert agent.next_move(game) in engine.get_legal_moves(game)
+
+
+class TestRng:
+    @pytest.mark.parametrize('name', ['dumbdice', 'battle', 'nim'])
+    def test_search_is_reproducible(self, node_cls, name):
+        import importlib
+        from aidoodle.ai.mcts import search_iteration
+        from aidoodle.rng import Rng
+
+        engine = importlib.import_module(f'aidoodle.games.{name}')
+        game = engine.init_game()
+
+        def search(seed):
+            rng = Rng(seed)
+            root = node_cls(game=game)
+            for _ in range(100):
+                search_iteration(root, engine=engine, cache={}, rng=rng)
+            return [(edge.move, edge.w, edge.s) for edge in root.edges]
+
+        assert search(0) == search(0)
+
+    def test_random_agent_is_reproducible(self):
+        from aidoodle.agents import RandomAgent
+        from aidoodle.games import tictactoe
+        from aidoodle.rng import Rng
+
+        game = tictactoe.init_game()
+        moves = [
+            [RandomAgent(player=tictactoe.init_player(1), engine=tictactoe,
+                         rng=Rng(seed)).next_move(game) for seed in range(10)]
+            for _ in range(2)]
+        assert moves[0] == moves[1]
+        assert len(set(moves[0])) > 1
+
+
+class TestEdgeHeap:
+    @pytest.fixture
+    def edges(self, edge_cls):
+        rng = random.Random(0)
+        edges = []
+        for i in range(50):
+            s = rng.randint(0, 5)
+            edges.append(edge_cls(move=i, w=rng.randint(0, s), s=s))
+        return edges
+
+    @pytest.fixture
+    def heap_cls(self):
+        from aidoodle.ai.mcts import EdgeHeap
+        return EdgeHeap
+
+    def test_same_as_select_ucb1_without_tolerance(
+            self, edges, heap_cls, select_ucb1,
+    ):
+        rng = random.Random(1)
+        heap = heap_cls(edges, tol=0.0)
+        for _ in range(500):
+            selected = heap.select()
+            assert selected is select_ucb1(edges)
+            selected.s += 1
+            selected.w += rng.random()
+
+    def test_with_tolerance_visits_all_edges(self, edges, heap_cls):
+        heap = heap_cls(edges)
+        for _ in range(2000):
+            selected = heap.select()
+            selected.s += 1
+            selected.w += 0.5
+        assert heap.s_tot == sum(edge.s for edge in edges)
+        assert min(edge.s for edge in edges) > 10
+
+    def test_mcts_situation(self):
+        # agent should leave (1, 1, 1) by taking 3 stones from heap 2
+        from aidoodle.agents import MctsAgent
+        from aidoodle.games import nim
+
+        agent = MctsAgent(
+            player=nim.init_player(1),
+            engine=nim,
+            n_iter=500,
+            heap_width=2,
+        )
+        game = nim.init_game(board=nim.Board((1, 1, 4)))
+        move = agent.next_move(game)
+        assert move == nim.Move(2, 3)
+
+
+class TestImplicitMinimax:
+    @pytest.fixture(scope='session')
+    def engine(self):
+        from aidoodle.games import ziczaczoe
+        return ziczaczoe
+
+    @pytest.fixture(scope='session')
+    def search_iteration(self):
+        from aidoodle.ai.mcts import search_iteration
+        return search_iteration
+
+    def test_backup(self, node_cls, edge_cls, game):
+        from aidoodle.ai.mcts import backup_minimax
+        from aidoodle.games import tictactoe
+
+        # x moves at the root, o at the child
+        root = node_cls(game=game)
+        root.edges = [edge_cls(move=0, v=0.3), edge_cls(move=1)]
+        child = node_cls(game=tictactoe.make_move(game, tictactoe.Move(0, 0)))
+        child.edges = [edge_cls(move=2, v=0.6), edge_cls(move=3)]
+
+        # o gets at most 0.6 at the child, so x gets 0.4 by moving there
+        backup_minimax([(root, root.edges[1]), (child, child.edges[1])], value=0.8)
+        assert child.edges[1].v == pytest.approx(0.2)
+        assert root.edges[1].v == pytest.approx(0.4)
+
+        backup_minimax([(root, root.edges[1]), (child, child.edges[1])], value=0.1)
+        assert child.edges[1].v == pytest.approx(0.9)
+        assert root.edges[1].v == pytest.approx(0.1)
+        assert root.edges[0].v == 0.3
+
+    def test_values_are_set(self, engine, node_cls, search_iteration):
+        root = node_cls(game=engine.init_game())
+        for _ in range(200):
+            search_iteration(root, engine=engine, cache={}, minimax_weight=0.5)
+        assert all(0.0 <= edge.v <= 1.0 for edge in root.edges)
+
+    def test_no_values_without_weight(self, engine, node_cls, search_iteration):
+        root = node_cls(game=engine.init_game())
+        for _ in range(100):
+            search_iteration(root, engine=engine, cache={})
+        assert all(edge.v is None for edge in root.edges)
+
+    def test_weight_needs_evaluate(self, node_cls, game, search_iteration):
+        from aidoodle.games import tictactoe
+
+        root = node_cls(game=game)
+        with pytest.raises(ValueError):
+            search_iteration(root, engine=tictactoe, cache={}, minimax_weight=0.5)
+
+        search_iteration(
+            root, engine=tictactoe, cache={}, minimax_weight=0.5,
+            evaluate=lambda game: 0.5)
+        assert [edge.v for edge in root.edges if edge.v is not None] == [0.5]
+
+    @pytest.mark.parametrize('lazy, heap_width', [(False, None), (True, 2)])
+    def test_agent_finds_win(self, engine, lazy, heap_width):
+        from aidoodle.agents import MctsAgent
+
+        # x wins with (0, 2), o threatens (4, 2); plain mcts often
+        # misses the win with that few iterations
+        state = [[0] * 5 for _ in range(5)]
+        state[0][0] = state[0][1] = 1
+        state[4][0] = state[4][1] = 2
+        board = engine.Board(tuple(tuple(row) for row in state))
+        agent = MctsAgent(
+            player=engine.init_player(1),
+            engine=engine,
+            n_iter=100,
+            lazy=lazy,
+            heap_width=heap_width,
+            minimax_weight=0.5,
+        )
+        assert agent.next_move(engine.init_game(board=board)) == engine.Move(0, 2)
+
+    def test_battle_playouts_from_end_states(self):
+        # the search reaches end states, whose score depends on the
+        # initial board
+        from aidoodle.agents import MctsAgent
+        from aidoodle.games import battle
+
+        p1, p2 = battle.PLAYERS[1], battle.PLAYERS[2]
+        state = (battle.Melee(owner=p1),) + (None,) * 4
+        state += (battle.Ranger(owner=p2, hp=1),) + (None,) * 4
+        game = battle.init_game(board=battle.Board(state=state, active_idx=0))
+        agent = MctsAgent(
+            player=p1, engine=battle, n_iter=100, minimax_weight=0.5)
+        assert agent.next_move(game) == battle.Move(5)
+
+
 class TestAgentTicTacToe:
     @pytest.fixture(scope='session')
     def engine(self):
@@ -0,0 +1,148 @@
+# type: ignore
+
+
+from functools import lru_cache
+import random
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def pns():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.ai import pns
+    return pns
+
+
+@pytest.fixture(scope='session')
+def ttt():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import tictactoe
+    return tictactoe
+
+
+@pytest.fixture(scope='session')
+def nim():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import nim
+    return nim
+
+
+@pytest.fixture(scope='session')
+def zzz():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import ziczaczoe
+    return ziczaczoe
+
+
+def negamax(engine):
+    """Score for the player to move by plain recursion"""
+    @lru_cache(maxsize=None)
+    def value(game):
+        moves = engine.get_legal_moves(game)
+        if not moves:
+            score = engine.game_score(game)
+            return score if game.player == 1 else 1.0 - score
+        return max(1.0 - value(engine.make_move(game, move)) for move in moves)
+    return value
+
+
+def random_positions(engine, n, max_plies, seed=0, board=None):
+    rnd = random.Random(seed)
+    games = []
+    while len(games) < n:
+        game = engine.init_game() if board is None else engine.init_game(board=board)
+        for _ in range(rnd.randint(0, max_plies)):
+            moves = engine.get_legal_moves(game)
+            if not moves:
+                break
+            game = engine.make_move(game, rnd.choice(moves))
+        if engine.get_legal_moves(game):
+            games.append(game)
+    return games
+
+
+def expected_outcome(pns, value):
+    return {0.0: pns.Outcome.loss, 0.5: pns.Outcome.draw, 1.0: pns.Outcome.win}[value]
+
+
+class TestNodeTable:
+    def test_replacement(self, pns, ttt):
+        # with a single slot, all games compete for it
+        table = pns.NodeTable(size=1)
+        game1 = ttt.init_game()
+        game2 = ttt.make_move(game1, ttt.Move(0, 0))
+
+        table.put(pns.Entry(game=game1, pn=1, dn=2, work=10))
+        table.put(pns.Entry(game=game2, pn=1, dn=1, work=5))
+        assert table.get(game1).work == 10
+        assert table.get(game2) is None
+
+        # the same game is always updated
+        table.put(pns.Entry(game=game1, pn=0, dn=pns.INF, work=1))
+        assert table.get(game1).pn == 0
+        table.put(pns.Entry(game=game2, pn=1, dn=1, work=5))
+        assert table.get(game2).work == 5
+        assert len(table) == 1
+
+    def test_size_must_be_positive(self, pns):
+        with pytest.raises(ValueError):
+            pns.NodeTable(size=0)
+
+
+class TestSolve:
+    def test_tictactoe_matches_negamax(self, pns, ttt):
+        value = negamax(ttt)
+        for game in random_positions(ttt, n=20, max_plies=6):
+            assert pns.solve(game, engine=ttt) == expected_outcome(pns, value(game))
+
+    def test_nim_matches_negamax(self, pns, nim):
+        value = negamax(nim)
+        for game in random_positions(nim, n=50, max_plies=4):
+            assert pns.solve(game, engine=nim) == expected_outcome(pns, value(game))
+
+    @pytest.mark.slow
+    def test_ziczaczoe_matches_negamax(self, pns, zzz):
+        # 9 free cells
+        board = zzz.Board((
+            (0, 0, 0, 9, 9),
+            (9, 0, 0, 9, 9),
+            (0, 9, 0, 0, 9),
+            (9, 9, 9, 0, 9),
+            (9, 9, 9, 9, 9)))
+        value = negamax(zzz)
+        games = random_positions(zzz, n=30, max_plies=4, board=board)
+        outcomes = [pns.solve(game, engine=zzz) for game in games]
+        for game, outcome in zip(games, outcomes):
+            assert outcome == expected_outcome(pns, value(game))
+        # not all positions have the same outcome
+        assert len(set(outcomes)) > 1
+
+    def test_empty_tictactoe_board_is_draw(self, pns, ttt):
+        assert pns.solve(ttt.init_game(), engine=ttt) == pns.Outcome.draw
+
+    def test_small_table_is_still_correct(self, pns, ttt):
+        value = negamax(ttt)
+        for game in random_positions(ttt, n=10, max_plies=4, seed=1):
+            outcome = pns.solve(game, engine=ttt, table_size=16)
+            assert outcome == expected_outcome(pns, value(game))
+
+    def test_unknown_past_budget(self, pns, ttt):
+        game = ttt.init_game()
+        assert pns.solve(game, engine=ttt, max_nodes=10) == pns.Outcome.unknown
+        result, n_nodes = pns.prove(game, engine=ttt, target=1.0, max_nodes=10)
+        assert result is None
+        assert n_nodes == 11
+
+    def test_prove(self, pns, ttt):
+        game = ttt.init_game()
+        # the first player cannot win, but does not lose either
+        assert pns.prove(game, engine=ttt, target=1.0)[0] is False
+        assert pns.prove(game, engine=ttt, target=0.5)[0] is True
+
+    def test_game_over_raises(self, pns, ttt):
+        game = ttt.init_game()
+        for i, j in [(0, 0), (1, 0), (0, 1), (1, 1), (0, 2)]:
+            game = ttt.make_move(game, ttt.Move(i, j))
+        with pytest.raises(ValueError):
+            pns.solve(game, engine=ttt)
@@ -0,0 +1,211 @@
+# type: ignore
+
+
+from functools import lru_cache
+
+import pytest
+
+
+# a 3x3 board and an irregular board with 7 free cells
+LAYOUTS = [
+    ((0, 0, 0, 9, 9),
+     (0, 0, 0, 9, 9),
+     (0, 0, 0, 9, 9),
+     (9, 9, 9, 9, 9),
+     (9, 9, 9, 9, 9)),
+
+    ((0, 9, 0, 9, 9),
+     (9, 0, 0, 9, 9),
+     (0, 0, 9, 9, 9),
+     (9, 9, 9, 9, 0),
+     (9, 9, 9, 9, 9)),
+]
+
+
+@pytest.fixture(scope='session')
+def retrograde():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.ai import retrograde
+    return retrograde
+
+
+@pytest.fixture(scope='session')
+def zzz():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import ziczaczoe
+    return ziczaczoe
+
+
+@pytest.fixture(scope='session')
+def boards(zzz):
+    return [zzz.Board(state) for state in LAYOUTS]
+
+
+@pytest.fixture(scope='session')
+def path(retrograde, boards, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('endgames') / 'ziczaczoe.edb')
+    retrograde.build(boards, k=4, path=path)
+    return path
+
+
+@pytest.fixture(scope='session')
+def endgames(retrograde, path):
+    return retrograde.load(path)
+
+
+def play(zzz, board, *positions, player_idx=0):
+    game = zzz.init_game(board=board, player_idx=player_idx)
+    for i, j in positions:
+        game = zzz.make_move(game, zzz.MOVES[(i, j)])
+    return game
+
+
+def negamax(zzz):
+    """Value for the player to move by plain recursion"""
+    @lru_cache(maxsize=None)
+    def value(game):
+        if game.winner:
+            score = zzz.game_score(game)
+            return round(2 * (score if game.player == 1 else 1 - score))
+        return max(2 - value(zzz.make_move(game, move))
+                   for move in zzz.get_legal_moves(game))
+    return value
+
+
+def all_games(zzz, board, player_idx):
+    games = {zzz.init_game(board=board, player_idx=player_idx)}
+    seen = set()
+    while games:
+        game = games.pop()
+        if game in seen:
+            continue
+        seen.add(game)
+        yield game
+        for move in zzz.get_legal_moves(game):
+            games.add(zzz.make_move(game, move))
+
+
+class TestSolve:
+    @pytest.mark.parametrize('layout', range(len(LAYOUTS)))
+    def test_matches_negamax(self, retrograde, zzz, boards, layout):
+        k = 4
+        board = boards[layout]
+        values = retrograde.solve(board, k=k)
+        value = negamax(zzz)
+
+        n_checked = 0
+        for player_idx in (0, 1):
+            for game in all_games(zzz, board, player_idx):
+                n_empty = len(zzz.get_possible_moves(game))
+                if game.winner or n_empty > k:
+                    assert retrograde.key(game) not in values
+                    continue
+                assert values[retrograde.key(game)] == value(game)
+                n_checked += 1
+        # unreachable positions are solved too, e.g. when the first
+        # player completes two lines at once
+        assert 0 < n_checked <= len(values)
+
+    def test_positions_by_empty_cells(self, retrograde, boards):
+        layers = retrograde.enumerate_positions(boards[0], k=3)
+        assert len(layers) == 3
+        for n_empty, positions in enumerate(layers, start=1):
+            for p1, p2 in positions:
+                assert 9 - bin(p1 | p2).count('1') == n_empty
+                assert abs(bin(p1).count('1') - bin(p2).count('1')) <= 1
+
+    def test_premade_layouts_are_distinct(self, retrograde, zzz):
+        assert len(set(retrograde.LAYOUTS)) == len(retrograde.LAYOUTS)
+        assert set(retrograde.LAYOUTS) == {zzz.Board(state) for state in zzz.STATES}
+
+
+class TestEndgames:
+    def test_file_size(self, retrograde, boards, path, endgames):
+        # pylint: disable=import-outside-toplevel
+        import os
+        n_positions = sum(len(retrograde.solve(board, k=4)) for board in boards)
+        assert len(endgames) == n_positions
+        assert os.path.getsize(path) == retrograde.HEADER.size + 8 * n_positions
+        assert endgames.max_moves == 4
+
+    def test_load_is_cached(self, retrograde, path, endgames):
+        assert retrograde.load(path) is endgames
+
+    def test_probe(self, zzz, boards, endgames):
+        # x threatens (1, 0) and (2, 2), o to move cannot block both
+        game = play(zzz, boards[0], (0, 0), (0, 1), (1, 1), (0, 2), (1, 2))
+        assert game.player == 2
+        assert endgames.value(game) == 0
+        assert endgames.probe(game) == 1.0
+
+        # the same with o having started
+        game = play(zzz, boards[0], (0, 0), (0, 1), (1, 1), (0, 2), (1, 2),
+                    player_idx=1)
+        assert game.player == 1
+        assert endgames.value(game) == 0
+        assert endgames.probe(game) == 0.0
+
+    def test_unknown_positions(self, zzz, boards, endgames):
+        # too many empty cells
+        assert endgames.probe(play(zzz, boards[0], (0, 0))) is None
+        # game is over
+        game = play(zzz, boards[0], (0, 0), (1, 0), (0, 1), (1, 1), (0, 2))
+        assert game.winner
+        assert endgames.probe(game) is None
+        # layout that was not solved
+        assert endgames.probe(zzz.init_game(board=zzz.Board())) is None
+
+    def test_bad_file_raises(self, retrograde, tmp_path):
+        path = tmp_path / 'bad.edb'
+        path.write_bytes(retrograde.HEADER.pack(b'XXXX', 2) + bytes(16))
+        with pytest.raises(ValueError):
+            retrograde.Endgames(str(path))
+
+        path.write_bytes(retrograde.HEADER.pack(retrograde.MAGIC, 2) + bytes(10))
+        with pytest.raises(ValueError):
+            retrograde.Endgames(str(path))
+
+
+class TestMctsOracle:
+    def test_playout_stops_at_solved_position(self, zzz, boards, endgames):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.ai.mcts import simulate
+        from aidoodle.rng import Rng
+
+        # o has to block (1, 2), random playouts often do not
+        game = play(zzz, boards[0], (0, 0), (0, 1), (1, 1), (2, 2), (1, 0))
+        expected = endgames.probe(game)
+        assert expected is not None
+        for seed in range(10):
+            assert simulate(game, engine=zzz, rng=Rng(seed), oracle=endgames) == expected
+            assert simulate(game, engine=zzz, rng=Rng(seed)) in (0.0, 0.5, 1.0)
+
+    def test_search_marks_solved_nodes(self, zzz, boards, endgames):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.ai.mcts import Node, search_iteration
+
+        game = play(zzz, boards[0], (0, 0), (0, 1), (1, 1), (2, 2))
+        root = Node(game=game)
+        cache = {}
+        for _ in range(50):
+            search_iteration(root, engine=zzz, cache=cache, oracle=endgames)
+
+        # the root is never solved, its children are
+        assert root.value is None
+        assert root.edges
+        children = [node for node in cache.values() if node is not root]
+        assert children
+        for node in children:
+            assert node.value == endgames.probe(node.game)
+            assert not node.edges
+
+    def test_agent_finds_forced_win(self, zzz, boards, endgames):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.agents import MctsAgent
+        from aidoodle.rng import Rng
+
+        # o to move has to block the diagonal, or x wins
+        game = play(zzz, boards[0], (0, 0), (0, 1), (1, 1))
+        agent = MctsAgent(
+            player=zzz.PLAYERS[2], engine=zzz, n_iter=100, oracle=endgames, rng=Rng(0))
+        assert agent.next_move(game) == (2, 2)
@@ -0,0 +1,154 @@
+# type: ignore
+
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def tablebase():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.ai import tablebase
+    return tablebase
+
+
+@pytest.fixture(scope='session')
+def ttt():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import tictactoe
+    return tictactoe
+
+
+@pytest.fixture(scope='session')
+def path(tablebase, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('tablebase') / 'tictactoe.tb')
+    tablebase.build(path)
+    return path
+
+
+@pytest.fixture(scope='session')
+def tb(tablebase, path):
+    return tablebase.load(path)
+
+
+def play(ttt, game, *positions):
+    for i, j in positions:
+        game = ttt.make_move(game, ttt.Move(i, j))
+    return game
+
+
+class TestTablebase:
+    def test_file_size(self, tablebase, path):
+        # pylint: disable=import-outside-toplevel
+        import os
+        assert os.path.getsize(path) == len(tablebase.MAGIC) + 2 * tablebase.N_ENTRIES
+
+    def test_load_is_cached(self, tablebase, path, tb):
+        assert tablebase.load(path) is tb
+
+    def test_load_builds_missing_file(self, tablebase, tmp_path):
+        path = str(tmp_path / 'new.tb')
+        assert tablebase.load(path).evaluate(
+            tablebase.ttt.init_game()) == 0.5
+
+    def test_empty_board_is_draw(self, ttt, tb):
+        for player_idx in (0, 1):
+            game = ttt.init_game(player_idx=player_idx)
+            assert tb.evaluate(game) == 0.5
+            assert len(tb.best_moves(game)) == 9
+
+    def test_winning_move(self, ttt, tb):
+        # X has (0, 0) and (0, 1), O has (1, 0) and (1, 1), X to move
+        game = play(ttt, ttt.init_game(), (0, 0), (1, 0), (0, 1), (1, 1))
+        assert tb.evaluate(game) == 1.0
+        assert [(move.i, move.j) for move in tb.best_moves(game)] == [(0, 2)]
+
+    def test_blocking_move(self, ttt, tb):
+        game = play(ttt, ttt.init_game(), (0, 0), (1, 1), (0, 1))
+        assert tb.evaluate(game) == 0.5
+        assert [(move.i, move.j) for move in tb.best_moves(game)] == [(0, 2)]
+
+    def test_lost_position(self, ttt, tb):
+        # O played on an edge after X's corner, X can force a win
+        game = play(ttt, ttt.init_game(), (0, 0), (0, 1))
+        assert tb.evaluate(game) == 1.0
+        game = play(ttt, ttt.init_game(player_idx=1), (0, 0), (0, 1))
+        assert tb.evaluate(game) == 0.0
+
+    def test_finished_game(self, ttt, tb):
+        game = play(ttt, ttt.init_game(), (0, 0), (1, 0), (0, 1), (1, 1), (0, 2))
+        assert game.winner
+        assert tb.evaluate(game) == 1.0
+        assert tb.best_moves(game) == ()
+
+    def test_unreachable_position_raises(self, ttt, tb):
+        # more X than possible
+        board = ttt.Board(state=(
+            (1, 1, 0, 9, 9),
+            (1, 1, 0, 9, 9),
+            (0, 0, 0, 9, 9),
+        ) + ttt.TICTACTOEBOARD[3:])
+        with pytest.raises(ValueError):
+            tb.evaluate(ttt.init_game(board=board))
+
+    def test_bad_file_raises(self, tablebase, tmp_path):
+        path = tmp_path / 'bad.tb'
+        path.write_bytes(b'XXXX' + bytes(2 * tablebase.N_ENTRIES))
+        with pytest.raises(ValueError):
+            tablebase.Tablebase(str(path))
+
+        path.write_bytes(tablebase.MAGIC + bytes(10))
+        with pytest.raises(ValueError):
+            tablebase.Tablebase(str(path))
+
+
+class TestPerfectAgent:
+    def test_self_play_draws(self, ttt, path):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.agents import PerfectAgent
+        from aidoodle.rng import Rng
+
+        rng = Rng(0)
+        agents = {
+            1: PerfectAgent(player=ttt.PLAYERS[1], engine=ttt, path=path, rng=rng),
+            2: PerfectAgent(player=ttt.PLAYERS[2], engine=ttt, path=path, rng=rng),
+        }
+        for _ in range(20):
+            game = ttt.init_game()
+            while not game.winner:
+                game = ttt.make_move(game, agents[game.player].next_move(game))
+            assert ttt.game_score(game) == 0.5
+
+    def test_never_loses_to_random(self, ttt, path):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.agents import PerfectAgent, RandomAgent
+        from aidoodle.rng import Rng
+
+        rng = Rng(0)
+        perfect = PerfectAgent(player=ttt.PLAYERS[2], engine=ttt, path=path, rng=rng)
+        rand = RandomAgent(player=ttt.PLAYERS[1], engine=ttt, rng=rng)
+        for _ in range(50):
+            game = ttt.init_game()
+            while not game.winner:
+                agent = rand if game.player == 1 else perfect
+                game = ttt.make_move(game, agent.next_move(game))
+            assert game.winner != 1
+
+    def test_other_engine_raises(self):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.agents import PerfectAgent
+        from aidoodle.games import nim
+
+        with pytest.raises(ValueError):
+            PerfectAgent(player=nim.PLAYERS[1], engine=nim)
+
+    def test_as_mcts_simulator(self, ttt, tb):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.agents import MctsAgent
+        from aidoodle.rng import Rng
+
+        game = play(ttt, ttt.init_game(), (0, 0), (1, 1), (0, 1))
+        agent = MctsAgent(
+            player=ttt.PLAYERS[2], engine=ttt, n_iter=200, simulator=tb.evaluate,
+            rng=Rng(0))
+        move = agent.next_move(game)
+        assert (move.i, move.j) == (0, 2)
@@ -0,0 +1,253 @@
+# type: ignore
+
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def battle():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import battle
+    return battle
+
+
+@pytest.fixture
+def p1(battle):
+    return battle.Player(1)
+
+
+@pytest.fixture
+def p2(battle):
+    return battle.Player(2)
+
+
+def make_board(battle, left, right, active_idx=0):
+    empty = (None,) * 5
+    state = (tuple(left) + empty)[:5] + (tuple(right) + empty)[:5]
+    return battle.Board(state=state, active_idx=active_idx)
+
+
+class TestBoardWinner:
+    def test_no_winner(self, battle, p1, p2):
+        board = make_board(battle, [battle.Melee(owner=p1)], [battle.Melee(owner=p2)])
+        game = battle.init_game(board=board)
+        assert battle.determine_winner(game) is None
+
+    def test_winner_player1(self, battle, p1):
+        board = make_board(battle, [battle.Melee(owner=p1)], [])
+        game = battle.init_game(board=board)
+        assert battle.determine_winner(game) == 1
+
+    def test_winner_player2(self, battle, p2):
+        board = make_board(battle, [], [battle.Ranger(owner=p2)], active_idx=5)
+        game = battle.init_game(board=board)
+        assert battle.determine_winner(game) == 2
+
+    def test_tied(self, battle):
+        board = battle.Board(state=(None,) * 10, active_idx=0)
+        game = battle.init_game(board=board)
+        assert battle.determine_winner(game) == -1
+
+
+class TestLegalMoves:
+    def test_moves_standard_board(self, battle):
+        game = battle.init_game()
+        # active ranger at 3 can buff its allies and attack all enemies
+        moves = battle.get_legal_moves(game)
+        assert sorted(moves) == [battle.Move(i) for i in (2, 4, 5, 7, 8)]
+
+    def test_moves_are_preallocated(self, battle):
+        moves0 = battle.get_legal_moves(battle.init_game())
+        moves1 = battle.get_legal_moves(battle.init_game())
+        assert all(m0 is m1 for m0, m1 in zip(moves0, moves1))
+
+    def test_range_counts_occupied_slots_only(self, battle, p1, p2):
+        # melee at 0 has range 2, empty slots in between don't count
+        board = make_board(
+            battle,
+            [battle.Melee(owner=p1)],
+            [battle.Melee(owner=p2), None, battle.Melee(owner=p2),
+             battle.Melee(owner=p2)],
+        )
+        game = battle.init_game(board=board)
+        assert battle.get_legal_moves(game) == (battle.Move(5), battle.Move(7))
+
+    def test_range_with_identical_units(self, battle, p1, p2):
+        # distances are measured from the slot of the active unit, even
+        # if an identical unit stands in front of it
+        left = [battle.Melee(owner=p1), battle.Melee(owner=p1)]
+        right = [battle.Melee(owner=p2)] * 3
+        board = make_board(battle, left, right, active_idx=1)
+        game = battle.init_game(board=board)
+        assert battle.get_legal_moves(game) == tuple(
+            battle.Move(i) for i in (0, 5, 6))
+
+    def test_within_distance_with_identical_units(self, battle, p1, p2):
+        # the melee at 9 equals the one at 1 but is out of range
+        state = (battle.Melee(owner=p1), battle.Melee(owner=p2), None, None,
+                 None, battle.Ranger(owner=p2), battle.Ranger(owner=p2),
+                 battle.Ranger(owner=p2), None, battle.Melee(owner=p2))
+        board = battle.Board(state=state, active_idx=0)
+        game = battle.init_game(board=board)
+        assert battle.get_legal_moves(game) == (battle.Move(1), battle.Move(5))
+        assert battle.within_distance(board, state[1])
+        assert not battle.within_distance(board, state[9])
+
+    def test_init_move_is_validated(self, battle):
+        with pytest.raises(ValueError):
+            battle.init_move('10', battle.init_game())
+
+
+class TestApplyMove:
+    def test_heal(self, battle, p1, p2):
+        board = make_board(
+            battle, [battle.Melee(owner=p1, hp=4)], [battle.Melee(owner=p2)])
+        board = battle.apply_move(board, battle.Move(0))
+        assert board.state[0].hp == 6
+        assert not board.state[0].queued
+        assert board.active_idx == 5
+        assert board.turn == 2
+        assert board.last_action == "healed Melee for 2 HP"
+
+    def test_heal_affects_active_unit_only(self, battle, p1, p2):
+        # an identical unit in front of the active unit stays untouched
+        left = [battle.Ranger(owner=p1, hp=2), battle.Ranger(owner=p1, hp=2)]
+        board = make_board(battle, left, [battle.Melee(owner=p2)], active_idx=1)
+        board = battle.apply_move(board, battle.Move(1))
+        assert board.state[0] == left[0]
+        assert board.state[1].hp == 4
+
+    def test_attack_kills_target(self, battle, p1, p2):
+        board = make_board(
+            battle, [battle.Melee(owner=p1)], [battle.Ranger(owner=p2, hp=1)])
+        board = battle.apply_move(board, battle.Move(5))
+        assert board.state[5] is None
+        assert board.last_action.startswith("attacked Ranger with sword for ")
+
+    def test_buff(self, battle, p1, p2):
+        board = make_board(
+            battle,
+            [battle.Melee(owner=p1), battle.Ranger(owner=p1)],
+            [battle.Melee(owner=p2)],
+        )
+        board = battle.apply_move(board, battle.Move(1))
+        assert board.state[1].buffs == (battle.ShieldBuff(round=1),)
+        assert not board.state[0].queued
+        assert board.active_idx == 1
+        assert board.last_action == "applied buff 'shield' to Ranger"
+
+    def test_round_end(self, battle, p1, p2):
+        shielded = battle.Melee(
+            owner=p2, queued=False, buffs=(battle.ShieldBuff(round=1),))
+        board = make_board(battle, [battle.Ranger(owner=p1)], [shielded])
+        board = battle.apply_move(board, battle.Move(5))
+        assert board.round == 2
+        assert all(unit.queued for unit in board.state_dense)
+        # shields last until the end of the next round
+        assert board.state[5].buffs == (battle.ShieldBuff(round=1),)
+
+        board = battle.apply_move(board, battle.Move(0))
+        board = battle.apply_move(board, battle.Move(5))
+        assert board.round == 3
+        assert board.state[5].buffs == ()
+
+    def test_initial_board_has_no_last_action(self, battle):
+        assert battle.init_game().board.last_action == "start"
+
+    def test_make_move_sets_next_player(self, battle):
+        game = battle.init_game()
+        game = battle.make_move(game, battle.Move(4))
+        assert game.board.active_idx == 4
+        assert game.player == 1
+        game = battle.make_move(game, battle.Move(5))
+        assert game.board.active_idx == 5
+        assert game.player == 2
+        assert game.board_init == battle.init_game().board
+
+
+class TestTables:
+    def test_occupancy(self, battle, p1, p2):
+        board = make_board(
+            battle, [None, battle.Melee(owner=p1)], [battle.Melee(owner=p2)],
+            active_idx=1)
+        assert board.units_p1 == 0b10
+        assert board.units_p2 == 0b100000
+        assert board.occupancy == 0b100010
+
+    def test_occupancy_after_kill(self, battle, p1, p2):
+        board = make_board(
+            battle,
+            [battle.Melee(owner=p1)],
+            [battle.Ranger(owner=p2, hp=1), battle.Ranger(owner=p2)],
+        )
+        board = battle.apply_move(board, battle.Move(5))
+        assert board.units_p2 == 1 << 6
+        assert board.active_idx == 6
+
+    @pytest.mark.parametrize('occupancy, slot, expected', [
+        (0b1111111111, 0, 1),
+        (0b1111111111, 9, 0),
+        (0b1000000001, 0, 9),
+        (0b0000000100, 2, 2),
+        (0b0000000101, 5, 0),
+    ])
+    def test_next_slot(self, battle, occupancy, slot, expected):
+        assert battle.NEXT_SLOT[occupancy * battle.N_SLOTS + slot] == expected
+
+    def test_n_units(self, battle):
+        assert battle.N_UNITS[0] == 0
+        assert battle.N_UNITS[0b1011] == 3
+        assert battle.N_UNITS[0b1111111111] == 10
+
+    def test_moves_by_targets(self, battle):
+        assert battle.MOVES_BY_TARGETS[0] == ()
+        moves = battle.MOVES_BY_TARGETS[0b1000000101]
+        assert moves == (battle.Move(0), battle.Move(2), battle.Move(9))
+        assert all(move is battle.MOVES[move.pos] for move in moves)
+
+
+class TestChanceOutcomes:
+    def test_attack(self, battle, p1, p2):
+        # the bow does 1 to 3 damage
+        board = make_board(
+            battle, [battle.Ranger(owner=p1)], [battle.Melee(owner=p2, hp=5)])
+        game = battle.init_game(board=board)
+        outcomes = battle.get_chance_outcomes(game, battle.Move(5))
+        assert sum(p for p, _ in outcomes) == pytest.approx(1.0)
+        assert sorted(child.board.state[5].hp for _, child in outcomes) == [2, 3, 4]
+
+    def test_equal_outcomes_are_merged(self, battle, p1, p2):
+        # the sword kills with 2 or more damage
+        board = make_board(
+            battle, [battle.Melee(owner=p1)], [battle.Ranger(owner=p2, hp=2)])
+        game = battle.init_game(board=board)
+        ((p, child),) = battle.get_chance_outcomes(game, battle.Move(5))
+        assert p == pytest.approx(1.0)
+        assert child.board.state[5] is None
+
+    def test_no_chance_without_attack(self, battle, p1, p2):
+        board = make_board(
+            battle, [battle.Melee(owner=p1, hp=4)], [battle.Melee(owner=p2)])
+        game = battle.init_game(board=board)
+        ((p, child),) = battle.get_chance_outcomes(game, battle.Move(0))
+        assert p == 1.0
+        assert child == battle.make_move(game, battle.Move(0))
+
+
+class TestEvaluate:
+    def test_lost_hitpoints(self, battle, p1, p2):
+        game = battle.init_game()
+        assert battle.evaluate(game) == 0.5
+
+        game = battle.make_move(game, battle.Move(4))  # shield
+        game = battle.make_move(game, battle.Move(5))  # sword
+        assert battle.evaluate(game) > 0.5
+
+        # relative to the initial board
+        board = make_board(
+            battle, [battle.Melee(owner=p1, hp=3)], [battle.Melee(owner=p2)])
+        game = battle.init_game(board=board)
+        assert battle.evaluate(game) == 0.5
+        board_init = make_board(battle, [battle.Melee(owner=p1)], [battle.Melee(owner=p2)])
+        game = battle.Game(players=game.players, board=board, board_init=board_init)
+        assert battle.evaluate(game) == 0.0
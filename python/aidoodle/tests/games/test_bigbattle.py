@@ -0,0 +1,167 @@
+# type: ignore
+
+
+import random
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def bigbattle():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import bigbattle
+    return bigbattle
+
+
+@pytest.fixture(scope='session')
+def battle():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import battle
+    return battle
+
+
+class TestBoard:
+    def test_make_board(self, bigbattle):
+        board = bigbattle.make_board("..RM", "M.R.")
+        assert board.width == 4
+        assert board.owner == (0, 0, 1, 1, 2, 0, 2, 0)
+        assert board.hp == (0, 0, 5, 9, 9, 0, 5, 0)
+        assert board.range == (0, 0, 10, 2, 2, 0, 10, 0)
+        assert board.queued == board.occupancy == 0b1011100
+        assert board.active_idx == 2
+
+    def test_army_board(self, bigbattle):
+        board = bigbattle.army_board(width=20, n_melee=8, n_ranger=12)
+        assert bin(board.units_p1).count('1') == 20
+        assert bin(board.units_p2).count('1') == 20
+        assert board.kind[19] == board.kind[20] == bigbattle.KIND_IDS['M']
+
+    def test_too_many_units_raises(self, bigbattle):
+        with pytest.raises(ValueError):
+            bigbattle.army_board(width=3, n_melee=2, n_ranger=2)
+
+    def test_unknown_unit_raises(self, bigbattle):
+        with pytest.raises(ValueError):
+            bigbattle.make_board("X", "M")
+
+    def test_mismatched_arrays_raise(self, bigbattle):
+        board = bigbattle.make_board("M", "M")
+        with pytest.raises(ValueError):
+            bigbattle.Board(
+                width=1, kind=board.kind, owner=board.owner, hp=(9,),
+                hp_max=board.hp_max, range=board.range,
+                damage_buffs=board.damage_buffs, shields=board.shields,
+                shields_old=board.shields_old, queued=board.queued, active_idx=0)
+
+
+class TestBoardWinner:
+    @pytest.mark.parametrize('left, right, winner', [
+        ("M.", ".R", None),
+        ("MR", "..", 1),
+        ("..", "R.", 2),
+        ("..", "..", -1),
+    ])
+    def test_determine_winner(self, bigbattle, left, right, winner):
+        game = bigbattle.init_game(board=bigbattle.make_board(left, right))
+        assert bigbattle.determine_winner(game) == winner
+
+
+class TestLegalMoves:
+    def test_range_counts_occupied_slots_only(self, bigbattle):
+        # melee at 3 has range 2, empty slots in between don't count
+        board = bigbattle.make_board("...M.", "M..MM")
+        game = bigbattle.init_game(board=board)
+        moves = bigbattle.get_legal_moves(game)
+        assert moves == (bigbattle.Move(5), bigbattle.Move(8))
+
+    def test_allies_and_self(self, bigbattle):
+        # the ranger at 1 can buff the melee, but cannot heal at full HP
+        game = bigbattle.init_game(board=bigbattle.make_board(".RM", "M.."))
+        assert bigbattle.get_legal_moves(game) == (
+            bigbattle.Move(2), bigbattle.Move(3))
+
+    def test_no_moves_when_won(self, bigbattle):
+        game = bigbattle.init_game(board=bigbattle.make_board("RM", ".."))
+        assert bigbattle.get_legal_moves(game) == ()
+
+
+class TestApplyMove:
+    def test_heal(self, bigbattle):
+        board = bigbattle.make_board("M", "M")
+        board = bigbattle.apply_move(board, bigbattle.Move(1))
+        hp = board.hp[1]
+        board = bigbattle.apply_move(board, bigbattle.Move(1))
+        assert board.hp[1] == min(hp + bigbattle.HEAL, 9)
+
+    def test_buffs_and_round_end(self, bigbattle):
+        board = bigbattle.make_board("MR", "M.")
+        # melee shields the ranger, ranger buffs the melee's damage
+        board = bigbattle.apply_move(board, bigbattle.Move(1))
+        assert board.shields[1] == 1
+        board = bigbattle.apply_move(board, bigbattle.Move(0))
+        assert board.damage_buffs[0] == 1
+        board = bigbattle.apply_move(board, bigbattle.Move(2))
+        assert board.round == 2
+        assert board.queued == board.occupancy
+        # shields last until the end of the next round
+        assert board.shields[1] == 0
+        assert board.shields_old[1] == 1
+
+        for pos in (0, 0, 2):
+            board = bigbattle.apply_move(board, bigbattle.Move(pos))
+        assert board.round == 3
+        assert board.shields_old[1] == 0
+
+    def test_kill_clears_slot(self, bigbattle):
+        board = bigbattle.make_board("M.", "R.")
+        # the melee attacks the ranger, which heals itself, until it dies
+        while board.owner[2]:
+            board = bigbattle.apply_move(board, bigbattle.Move(2))
+        assert board.units_p2 == 0
+        assert (board.kind[2], board.hp[2], board.queued >> 2) == (-1, 0, 0)
+
+    def test_illegal_move_raises(self, bigbattle):
+        board = bigbattle.make_board("M.", "R.")
+        with pytest.raises(ValueError):
+            bigbattle.apply_move(board, bigbattle.Move(1))
+        with pytest.raises(ValueError):
+            bigbattle.apply_move(board, bigbattle.Move(4))
+
+
+class TestConsistentWithBattle:
+    @pytest.mark.parametrize('seed', range(10))
+    def test_random_games(self, bigbattle, battle, seed):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.rng import Rng
+
+        rnd = random.Random(seed)
+        rng_small, rng_big = Rng(seed), Rng(seed)
+        game_small = battle.init_game()
+        game_big = bigbattle.init_game(board=bigbattle.from_battle(game_small.board))
+
+        while not game_small.winner:
+            assert game_big.winner is None
+            assert bigbattle.from_battle(game_small.board) == game_big.board
+            assert game_big.player_idx == game_small.player_idx
+            moves = battle.get_legal_moves(game_small)
+            assert [m.pos for m in bigbattle.get_legal_moves(game_big)] == [
+                m.pos for m in moves]
+
+            move = rnd.choice(moves)
+            game_small = battle.make_move(game_small, move, rng=rng_small)
+            game_big = bigbattle.make_move(
+                game_big, bigbattle.Move(move.pos), rng=rng_big)
+
+        assert game_big.winner == game_small.winner
+        assert bigbattle.game_score(game_big) == battle.game_score(game_small)
+
+    def test_large_battle(self, bigbattle):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.rng import Rng
+
+        rng = Rng(0)
+        game = bigbattle.init_game(board=bigbattle.army_board(width=25, n_melee=8))
+        while not game.winner:
+            game = bigbattle.make_move(
+                game, rng.choice(bigbattle.get_legal_moves(game)), rng=rng)
+        assert 0 <= bigbattle.game_score(game) <= 1
@@ -0,0 +1,107 @@
+# type: ignore
+
+
+import random
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def bignim():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import bignim
+    return bignim
+
+
+@pytest.fixture
+def board_cls(bignim):
+    return bignim.Board
+
+
+@pytest.fixture
+def move_cls(bignim):
+    return bignim.Move
+
+
+class TestBoardWinner:
+    @pytest.mark.parametrize('state, player_idx, winner', [
+        ((0, 0, 0, 0, 0), 0, 1),
+        ((0,) * 100, 1, 2),
+        ((0, 0, 0, 0, 1), 1, None),
+        ((1, 2, 3, 4, 5, 6), 0, None),
+    ])
+    def test_determine_winner(self, bignim, board_cls, state, player_idx, winner):
+        game = bignim.init_game(board=board_cls(state), player_idx=player_idx)
+        assert bignim.determine_winner(game) == winner
+
+    def test_negative_heap_raises(self, board_cls):
+        with pytest.raises(ValueError):
+            board_cls((1, -1))
+
+
+class TestLegalMoves:
+    def test_moves_board_empty(self, bignim, board_cls):
+        game = bignim.init_game(board=board_cls((0, 0, 0, 0)))
+        assert list(bignim.get_legal_moves(game)) == []
+
+    def test_moves(self, bignim, board_cls, move_cls):
+        game = bignim.init_game(board=board_cls((2, 0, 1, 2)))
+        moves = bignim.get_legal_moves(game)
+        expected = [
+            move_cls(0, 1),
+            move_cls(0, 2),
+            move_cls(2, 1),
+            move_cls(3, 1),
+            move_cls(3, 2),
+        ]
+        assert len(moves) == 5
+        assert list(moves) == expected
+        assert [moves[i] for i in range(-5, 5)] == expected + expected
+        assert moves[1:4] == expected[1:4]
+
+    def test_moves_contains(self, bignim, board_cls, move_cls):
+        game = bignim.init_game(board=board_cls((2, 0, 1, 2)))
+        moves = bignim.get_legal_moves(game)
+        assert move_cls(3, 2) in moves
+        assert move_cls(1, 1) not in moves
+        assert move_cls(4, 1) not in moves
+
+    def test_index_out_of_range_raises(self, bignim, board_cls):
+        game = bignim.init_game(board=board_cls((2, 0, 1, 2)))
+        moves = bignim.get_legal_moves(game)
+        with pytest.raises(IndexError):
+            moves[5]  # pylint: disable=pointless-statement
+
+    def test_large_board_is_not_materialized(self, bignim, board_cls, move_cls):
+        game = bignim.init_game(board=board_cls((10 ** 9,) * 1000))
+        moves = bignim.get_legal_moves(game)
+        assert len(moves) == 10 ** 12
+        assert moves[-1] == move_cls(999, 10 ** 9)
+
+    def test_random_choice_is_uniform(self, bignim, board_cls):
+        random.seed(0)
+        game = bignim.init_game(board=board_cls((1, 0, 3)))
+        moves = bignim.get_legal_moves(game)
+        counts = {}
+        for _ in range(4000):
+            move = random.choice(moves)
+            counts[move] = counts.get(move, 0) + 1
+        assert len(counts) == 4
+        assert all(800 < count < 1200 for count in counts.values())
+
+
+class TestApplyMoves:
+    @pytest.mark.parametrize('heap, stones, state', [
+        (0, 1, (2, 4, 5, 6)),
+        (1, 4, (3, 0, 5, 6)),
+        (3, 6, (3, 4, 5, 0)),
+    ])
+    def test_apply_move(self, bignim, board_cls, move_cls, heap, stones, state):
+        board = bignim.apply_move(board_cls((3, 4, 5, 6)), move_cls(heap, stones))
+        assert board.state == state
+        assert board.total == sum(state)
+
+    @pytest.mark.parametrize('heap, stones', [(0, 4), (4, 1)])
+    def test_illegal_move_raises(self, bignim, board_cls, move_cls, heap, stones):
+        with pytest.raises(ValueError):
+            bignim.apply_move(board_cls((3, 4, 5, 6)), move_cls(heap, stones))
@@ -0,0 +1,142 @@
+# type: ignore
+
+
+import random
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def bigzzz():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import bigzzz
+    return bigzzz
+
+
+@pytest.fixture(scope='session')
+def zzz():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import ziczaczoe
+    return ziczaczoe
+
+
+def play(engine, game, moves):
+    for move in moves:
+        game = engine.make_move(game, engine.Move(*move))
+    return game
+
+
+class TestBoard:
+    def test_from_state_roundtrip(self, bigzzz, zzz):
+        state = zzz.STATES[0]
+        board = bigzzz.from_state(state)
+        assert board.state == state
+
+    def test_overlapping_cells_raises(self, bigzzz):
+        with pytest.raises(ValueError):
+            bigzzz.Board(n=3, k=3, p1=1, p2=1)
+
+    def test_cells_outside_board_raises(self, bigzzz):
+        with pytest.raises(ValueError):
+            bigzzz.Board(n=3, k=3, p1=1 << 9)
+
+    def test_k_larger_than_n_raises(self, bigzzz):
+        with pytest.raises(ValueError):
+            bigzzz.Board(n=3, k=4)
+
+    def test_last_move_does_not_affect_equality(self, bigzzz):
+        assert bigzzz.Board(n=3, k=3, p1=1, last=0) == bigzzz.Board(n=3, k=3, p1=1)
+
+
+class TestBoardWinner:
+    @pytest.mark.parametrize('moves, winner', [
+        # row
+        ([(4, 0), (0, 0), (4, 1), (0, 2), (4, 2), (0, 4), (4, 3), (0, 6), (4, 4)], 1),
+        # column
+        ([(0, 8), (0, 0), (1, 8), (0, 2), (2, 8), (0, 4), (3, 8), (0, 6), (4, 8)], 1),
+        # diagonal, last stone in the middle
+        ([(8, 8), (0, 0), (8, 6), (1, 1), (8, 4), (3, 3), (8, 2), (4, 4), (7, 0),
+          (2, 2)], 2),
+        # contra-diagonal
+        ([(0, 4), (8, 8), (1, 3), (8, 6), (2, 2), (8, 4), (3, 1), (8, 2), (4, 0)], 1),
+        # only 4 in a row
+        ([(4, 0), (0, 0), (4, 1), (0, 2), (4, 2), (0, 4), (4, 3)], None),
+        # row does not wrap around
+        ([(0, 7), (5, 5), (0, 8), (5, 7), (1, 0), (6, 5), (1, 1), (6, 7), (1, 2)], None),
+    ])
+    def test_determine_winner(self, bigzzz, moves, winner):
+        game = play(bigzzz, bigzzz.init_game(), moves)
+        assert bigzzz.determine_winner(game) == winner
+
+        # same result without knowing the last move
+        board = bigzzz.Board(
+            n=game.board.n, k=game.board.k, p1=game.board.p1, p2=game.board.p2)
+        game = bigzzz.init_game(board=board)
+        assert bigzzz.determine_winner(game) == winner
+
+    def test_winner_tied(self, bigzzz):
+        board = bigzzz.from_state((
+            (1, 2, 1),
+            (1, 2, 2),
+            (2, 1, 1)))
+        game = bigzzz.init_game(board=board)
+        assert bigzzz.determine_winner(game) == -1
+
+
+class TestLegalMoves:
+    def test_moves_board_empty(self, bigzzz):
+        game = bigzzz.init_game()
+        moves = bigzzz.get_legal_moves(game)
+        assert len(moves) == bigzzz.N ** 2
+
+    def test_moves_skip_occupied_and_blocked(self, bigzzz):
+        board = bigzzz.from_state((
+            (1, 9, 0),
+            (0, 2, 9),
+            (9, 0, 0)))
+        game = bigzzz.init_game(board=board)
+        moves = set(bigzzz.get_legal_moves(game))
+        assert moves == {(0, 2), (1, 0), (2, 1), (2, 2)}
+
+    def test_no_moves_when_won(self, bigzzz):
+        board = bigzzz.from_state((
+            (1, 1, 1),
+            (2, 2, 0),
+            (0, 0, 0)))
+        game = bigzzz.init_game(board=board)
+        assert bigzzz.get_legal_moves(game) == ()
+
+
+class TestApplyMove:
+    @pytest.mark.parametrize('move', [(0, 0), (9, 0), (0, 9)])
+    def test_illegal_move_raises(self, bigzzz, move):
+        game = play(bigzzz, bigzzz.init_game(), [(0, 0)])
+        with pytest.raises(ValueError):
+            bigzzz.apply_move(game.board, bigzzz.Move(*move), game.player)
+
+    def test_apply_move(self, bigzzz):
+        game = play(bigzzz, bigzzz.init_game(), [(0, 0), (8, 8)])
+        assert game.board.cell(0, 0) == 1
+        assert game.board.cell(8, 8) == 2
+        assert game.board.last == 80
+        assert game.player == 1
+
+
+class TestConsistentWithZiczaczoe:
+    @pytest.mark.parametrize('seed', range(10))
+    def test_random_games(self, bigzzz, zzz, seed):
+        rnd = random.Random(seed)
+        game_zzz = zzz.init_game(board=zzz.Board(rnd.choice(zzz.STATES)))
+        game_big = bigzzz.init_game(board=bigzzz.from_state(game_zzz.board.state))
+
+        while not game_zzz.winner:
+            assert game_big.winner is None
+            assert sorted(bigzzz.get_legal_moves(game_big)) == sorted(
+                zzz.get_legal_moves(game_zzz))
+
+            move = rnd.choice(zzz.get_legal_moves(game_zzz))
+            game_zzz = zzz.make_move(game_zzz, move)
+            game_big = bigzzz.make_move(game_big, bigzzz.Move(*move))
+
+        assert game_big.winner == game_zzz.winner
+        assert game_big.board.state == game_zzz.board.state
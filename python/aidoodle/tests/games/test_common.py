@@ -1,6 +1,8 @@
 # type: ignore
 
 
+import random
+
 import pytest
 
 
@@ -19,9 +21,12 @@ def engines():
     from aidoodle.games import nim
     from aidoodle.games import dumbdice
     from aidoodle.games import battle
+    from aidoodle.games import bigbattle
+    from aidoodle.games import bignim
+    from aidoodle.games import bigzzz
     from aidoodle.core import Engine
 
-    return [tictactoe, nim, dumbdice, battle, Engine]
+    return [tictactoe, nim, dumbdice, battle, bigzzz, bignim, bigbattle, Engine]
 
 
 class TestCommon:
@@ -29,3 +34,56 @@ class TestCommon:
     @pytest.mark.parametrize('attr', REQUIRED_ATTRS)
     def test_required_attrs(self, engine, attr):
         assert hasattr(engine, attr)
+
+    @pytest.mark.parametrize('engine', engines()[:-1])
+    def test_legal_moves_are_immutable_and_shared(self, engine):
+        game = engine.init_game()
+        moves = engine.get_legal_moves(game)
+        assert len(moves) > 0
+        assert not hasattr(moves, 'append')
+        assert engine.get_legal_moves(game) is moves
+
+    @pytest.mark.parametrize('engine', engines()[:-1])
+    def test_cached_legal_moves_do_not_affect_equality(self, engine):
+        game = engine.init_game()
+        engine.get_legal_moves(game)
+        other = engine.init_game(board=game.board, player_idx=game.player_idx)
+        assert other == game
+        assert hash(other) == hash(game)
+
+
+def rollout_engines():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import ziczaczoe
+    engines_ = engines()[:-1] + [ziczaczoe]
+    return [engine for engine in engines_ if hasattr(engine, 'init_rollout')]
+
+
+class TestRollout:
+    @pytest.mark.parametrize('engine', rollout_engines())
+    @pytest.mark.parametrize('seed', range(5))
+    def test_consistent_with_make_move(self, engine, seed):
+        rnd = random.Random(seed)
+        game = engine.init_game()
+        rollout = engine.init_rollout(game)
+        games = [game]
+
+        while not game.winner:
+            assert rollout.winner is None
+            assert sorted(rollout.legal_moves()) == sorted(engine.get_legal_moves(game))
+
+            move = rnd.choice(engine.get_legal_moves(game))
+            game = engine.make_move(game, move)
+            rollout.push(move)
+            games.append(game)
+            assert rollout.to_game() == game
+
+        assert rollout.winner == game.winner
+        assert rollout.score() == engine.game_score(game)
+        assert len(rollout.legal_moves()) == 0
+
+        # taking back all moves restores each earlier state
+        for game in reversed(games[:-1]):
+            rollout.pop()
+            assert rollout.to_game() == game
+            assert rollout.winner is None
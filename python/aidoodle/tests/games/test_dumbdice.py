@@ -25,6 +25,19 @@ def board_cls(dice):
     return dice.Board
 
 
+def test_roll_uses_preallocated_dice(dice, roll):
+    for die in roll():
+        assert any(die is d for d in dice.DICE)
+
+
+def test_board_equality_includes_dice_and_reroll(dice, board_cls):
+    one, two = dice.DICE[0], dice.DICE[1]
+    board = board_cls(dice=(one, two))
+    assert board == board_cls(dice=(one, two))
+    assert board != board_cls(dice=(one, one))
+    assert board != board_cls(dice=(one, two), rerolled=True)
+
+
 class TestBoardWinner:
     @pytest.fixture
     def determine_winner(self, dice):
@@ -68,7 +81,7 @@ class TestLegalMoves:
         board = board_cls(state=(2, 0, 1), dice=roll(), rerolled=True)
         game = init_game(board=board)
         moves = get_legal_moves(game)
-        assert moves == []
+        assert moves == ()
 
 
 class TestApplyMoves:
@@ -106,3 +119,36 @@ class TestApplyMoves:
         board_new = apply_move(board=board, move=move, player=player)
         assert board_new.state == state_expected
         assert board_new.rerolled == rerolled_expected
+
+
+class TestChanceOutcomes:
+    def test_one_outcome_per_sum(self, dice, board_cls):
+        board = board_cls(state=(10, 20, 50), dice=(dice.DICE[0], dice.DICE[2]))
+        game = dice.init_game(board=board)
+        outcomes = dice.get_chance_outcomes(game, dice.MOVES['c'])
+        assert sum(p for p, _ in outcomes) == pytest.approx(1.0)
+        sums = [sum(die.eye for die in child.board.dice) for _, child in outcomes]
+        assert sums == list(range(2, 13))
+        assert dict(zip(sums, (p for p, _ in outcomes)))[7] == pytest.approx(6 / 36)
+        for _, child in outcomes:
+            assert child.board.state == (14, 20, 50)
+            assert child.player == 2
+
+    def test_reroll_keeps_player(self, dice, board_cls):
+        board = board_cls(state=(10, 20, 50), dice=(dice.DICE[0], dice.DICE[2]))
+        game = dice.init_game(board=board)
+        for _, child in dice.get_chance_outcomes(game, dice.MOVES['r']):
+            assert child.board.rerolled
+            assert child.board.state == (10, 20, 50)
+            assert child.player == 1
+
+
+class TestEvaluate:
+    def test_leader_is_favored(self, dice, board_cls):
+        roll_ = (dice.DICE[0], dice.DICE[0])
+        even = dice.init_game(board=board_cls(state=(20, 20, 50), dice=roll_))
+        ahead = dice.init_game(board=board_cls(state=(40, 20, 50), dice=roll_))
+        behind = dice.init_game(board=board_cls(state=(20, 40, 50), dice=roll_))
+        assert dice.evaluate(behind) < 0.5 < dice.evaluate(even) < dice.evaluate(ahead) < 1.0
+        # same position with player 2 to move
+        assert dice.evaluate(dice.init_game(board=even.board, player_idx=1)) < 0.5
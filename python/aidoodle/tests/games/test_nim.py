@@ -85,6 +85,10 @@ class TestLegalMoves:
         }
         assert moves == expected
 
+    def test_init_move_is_validated(self, nim):
+        with pytest.raises(ValueError):
+            nim.init_move('3, 1')
+
 
 class TestApplyMoves:
     @pytest.fixture
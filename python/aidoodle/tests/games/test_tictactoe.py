@@ -123,11 +123,16 @@ class TestLegalMoves:
 
     def test_moves_board_non_empty(self, ttt, board_non_empty, get_legal_moves):
         game = ttt.init_game(board=board_non_empty)
-        assert get_legal_moves(game) == [(0, 0)]
+        assert get_legal_moves(game) == ((0, 0),)
 
     def test_no_moves(self, ttt, board_row_win, get_legal_moves):
         game = ttt.init_game(board=board_row_win)
-        assert get_legal_moves(game) == []
+        assert get_legal_moves(game) == ()
+
+    def test_moves_are_preallocated(self, ttt, board_empty, get_legal_moves):
+        moves0 = get_legal_moves(ttt.init_game(board=board_empty))
+        moves1 = get_legal_moves(ttt.init_game(board=board_empty))
+        assert all(m0 is m1 for m0, m1 in zip(moves0, moves1))
 
 
 class TestApplyMove:
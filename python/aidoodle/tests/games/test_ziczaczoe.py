@@ -0,0 +1,51 @@
+# type: ignore
+
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def zzz():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import ziczaczoe
+    return ziczaczoe
+
+
+def make_game(zzz, stones, player_idx=0):
+    state = [[0] * 5 for _ in range(5)]
+    for (i, j), player in stones.items():
+        state[i][j] = player
+    board = zzz.Board(tuple(tuple(row) for row in state))
+    return zzz.init_game(board=board, player_idx=player_idx)
+
+
+class TestEvaluate:
+    def test_empty_board_is_even(self, zzz):
+        assert zzz.evaluate(make_game(zzz, {})) == 0.5
+
+    def test_center_stone(self, zzz):
+        x = zzz.evaluate(make_game(zzz, {(2, 2): 1}, player_idx=1))
+        o = zzz.evaluate(make_game(zzz, {(2, 2): 2}))
+        assert 0.5 < x < 1.0
+        assert o == pytest.approx(1.0 - x)
+
+    def test_open_two_of_mover_wins(self, zzz):
+        stones = {(0, 0): 1, (0, 1): 1, (4, 0): 2, (4, 1): 2}
+        assert zzz.evaluate(make_game(zzz, stones)) == 1.0
+        assert zzz.evaluate(make_game(zzz, stones, player_idx=1)) == 0.0
+
+    def test_finished_game(self, zzz):
+        stones = {(0, 0): 1, (0, 1): 1, (0, 2): 1}
+        game = make_game(zzz, stones, player_idx=1)
+        assert game.winner == 1
+        assert zzz.evaluate(game) == zzz.game_score(game) == 1.0
+
+        stones = {(0, 0): 2, (1, 1): 2, (2, 2): 2}
+        game = make_game(zzz, stones)
+        assert game.winner == 2
+        assert zzz.evaluate(game) == zzz.game_score(game) == 0.0
+
+    def test_blocked_lines_do_not_count(self, zzz):
+        # the only line through both stones is blocked
+        stones = {(0, 0): 1, (0, 1): 1, (0, 2): 9}
+        assert 0.5 < zzz.evaluate(make_game(zzz, stones)) < 1.0
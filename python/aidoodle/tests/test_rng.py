@@ -0,0 +1,65 @@
+# type: ignore
+
+
+import random
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def rng_cls():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.rng import Rng
+    return Rng
+
+
+class TestRng:
+    def test_same_seed_same_stream(self, rng_cls):
+        rng0, rng1 = rng_cls(0, block_size=7), rng_cls(0, block_size=7)
+        assert [rng0.random() for _ in range(20)] == [rng1.random() for _ in range(20)]
+
+    def test_block_size_does_not_change_stream(self, rng_cls):
+        rng0, rng1 = rng_cls(0, block_size=3), rng_cls(0, block_size=100)
+        assert [rng0.random() for _ in range(20)] == [rng1.random() for _ in range(20)]
+
+    def test_different_seeds_differ(self, rng_cls):
+        assert rng_cls(0).random() != rng_cls(1).random()
+
+    def test_spawn_reproducible_and_independent(self, rng_cls):
+        children0 = rng_cls(0).spawn(3)
+        children1 = rng_cls(0).spawn(3)
+        draws0 = [child.random() for child in children0]
+        draws1 = [child.random() for child in children1]
+        assert draws0 == draws1
+        assert len(set(draws0)) == 3
+        assert rng_cls(0).random() not in draws0
+
+    def test_randint_uniform(self, rng_cls):
+        rng = rng_cls(0)
+        counts = {}
+        for _ in range(6000):
+            val = rng.randint(1, 6)
+            counts[val] = counts.get(val, 0) + 1
+        assert sorted(counts) == [1, 2, 3, 4, 5, 6]
+        assert all(850 < count < 1150 for count in counts.values())
+
+    def test_choice(self, rng_cls):
+        rng = rng_cls(0)
+        assert {rng.choice('abc') for _ in range(100)} == {'a', 'b', 'c'}
+        with pytest.raises(IndexError):
+            rng.choice([])
+
+    def test_randrange_empty_raises(self, rng_cls):
+        with pytest.raises(ValueError):
+            rng_cls(0).randrange(0)
+
+
+class TestFallback:
+    def test_uses_random_module_without_rng(self):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.rng import choice, randint
+
+        random.seed(0)
+        expected = random.choice('abcdef'), random.randint(1, 6)
+        random.seed(0)
+        assert (choice('abcdef'), randint(1, 6)) == expected
@@ -0,0 +1,166 @@
+# type: ignore
+
+
+import dataclasses
+import gc
+import pickle
+import weakref
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def unchecked():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.utils import unchecked
+    return unchecked
+
+
+class TestUnchecked:
+    @pytest.fixture
+    def cls(self):
+        @dataclasses.dataclass(frozen=True)
+        class Positive:
+            i: int
+
+            def __post_init__(self):
+                if self.i < 1:
+                    raise ValueError
+
+        return Positive
+
+    def test_same_as_validated(self, cls, unchecked):
+        obj = unchecked(cls, i=3)
+        assert obj == cls(3)
+        assert hash(obj) == hash(cls(3))
+
+    def test_skips_validation(self, cls, unchecked):
+        with pytest.raises(ValueError):
+            cls(-1)
+        assert unchecked(cls, i=-1).i == -1
+
+    def test_still_frozen(self, cls, unchecked):
+        obj = unchecked(cls, i=3)
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            obj.i = 4
+
+
+class TestSlotted:
+    @pytest.fixture(scope='session')
+    def slotted(self):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.utils import slotted
+        return slotted
+
+    @pytest.fixture
+    def cls(self, slotted):
+        @slotted
+        @dataclasses.dataclass(frozen=True)
+        class Point:
+            x: int = 0
+            y: int = 1
+
+        return Point
+
+    @pytest.fixture
+    def subcls(self, slotted, cls):
+        @slotted
+        @dataclasses.dataclass(frozen=True)
+        class Point3(cls):
+            y: int = 2
+            z: int = 3
+
+        return Point3
+
+    def test_no_instance_dict(self, cls):
+        assert not hasattr(cls(), '__dict__')
+
+    def test_defaults(self, cls, subcls):
+        assert (cls().x, cls().y) == (0, 1)
+        assert (subcls().x, subcls().y, subcls().z) == (0, 2, 3)
+        assert not hasattr(subcls(), '__dict__')
+
+    def test_dataclass_functionality(self, cls):
+        point = cls(x=5)
+        assert point == cls(5, 1)
+        assert hash(point) == hash(cls(5, 1))
+        assert dataclasses.replace(point, y=7) == cls(5, 7)
+        assert repr(point).endswith("Point(x=5, y=1)")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            point.x = 4
+
+    def test_default_of_field_without_init(self, slotted):
+        @slotted
+        @dataclasses.dataclass(frozen=True)
+        class Lazy:
+            x: int
+            y: int = dataclasses.field(default=0, init=False, compare=False)
+
+        assert Lazy(1).y == 0
+        assert Lazy(1) == Lazy(1)
+
+    def test_weakref(self, cls):
+        point = cls()
+        assert weakref.ref(point)() is point
+
+
+
+class TestGameStatesAreSlotted:
+    @pytest.mark.parametrize('name', [
+        'tictactoe', 'nim', 'dumbdice', 'battle', 'ziczaczoe', 'bigzzz', 'bignim',
+        'bigbattle',
+    ])
+    def test_no_instance_dict(self, name):
+        # pylint: disable=import-outside-toplevel
+        import importlib
+        engine = importlib.import_module(f'aidoodle.games.{name}')
+        game = engine.init_game()
+        assert not hasattr(game, '__dict__')
+        assert not hasattr(game.board, '__dict__')
+
+    @pytest.mark.parametrize('name', ['nim', 'dumbdice', 'battle', 'bignim', 'bigbattle'])
+    def test_pickle(self, name):
+        # pylint: disable=import-outside-toplevel
+        import importlib
+        engine = importlib.import_module(f'aidoodle.games.{name}')
+        game = engine.init_game()
+        assert pickle.loads(pickle.dumps(game)) == game
+
+
+class TestInterner:
+    @pytest.fixture
+    def interner(self):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.utils import Interner
+        return Interner()
+
+    @pytest.fixture(scope='session')
+    def nim(self):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.games import nim
+        return nim
+
+    def test_equal_objects_become_identical(self, interner, nim):
+        game0 = interner(nim.init_game(board=nim.Board((1, 2))))
+        game1 = interner(nim.init_game(board=nim.Board((1, 2))))
+        assert game0 is game1
+        assert len(interner) == 1
+
+    def test_unequal_objects_stay_distinct(self, interner, nim):
+        game0 = interner(nim.init_game(board=nim.Board((1, 2))))
+        game1 = interner(nim.init_game(board=nim.Board((2, 1))))
+        assert game0 is not game1
+        assert len(interner) == 2
+
+    def test_does_not_keep_objects_alive(self, interner, nim):
+        game = interner(nim.init_game(board=nim.Board((1, 2))))
+        ref = weakref.ref(game)
+        del game
+        gc.collect()
+        assert ref() is None
+        assert len(interner) == 0
+
+    def test_clear(self, interner, nim):
+        game = interner(nim.init_game(board=nim.Board((1, 2))))
+        interner.clear()
+        assert interner(nim.init_game(board=nim.Board((1, 2)))) is not game
@@ -0,0 +1,114 @@
+# type: ignore
+
+
+import random
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def battle():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import battle
+    return battle
+
+
+@pytest.fixture(scope='session')
+def vbattle():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.vec import battle as vbattle
+    return vbattle
+
+
+@pytest.fixture
+def rng():
+    # pylint: disable=import-outside-toplevel
+    import numpy as np
+    return np.random.default_rng(0)
+
+
+class FixedDamage:
+    """Stand-in for Rng that always rolls the same damage"""
+    def __init__(self, damage):
+        self.damage = damage
+
+    def randint(self, a, b):  # pylint: disable=unused-argument
+        return self.damage
+
+
+def key(game):
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import bigbattle
+    # buffs are only kept as counters by the vectorized engine
+    return bigbattle.from_battle(game.board), game.player_idx
+
+
+class TestVecBattle:
+    def test_roundtrip(self, battle, vbattle):
+        games = [battle.init_game() for _ in range(3)]
+        assert vbattle.to_games(vbattle.init_batch(games)) == games
+
+    @pytest.mark.parametrize('seed', range(3))
+    def test_random_games(self, battle, vbattle, rng, seed):
+        # pylint: disable=import-outside-toplevel
+        import numpy as np
+
+        rnd = random.Random(seed)
+        batch = vbattle.init_batch([battle.init_game() for _ in range(20)])
+
+        while not vbattle.is_terminal(batch).all():
+            games = vbattle.to_games(batch)
+            mask = vbattle.legal_mask(batch)
+            moves = []
+            for i, game in enumerate(games):
+                legal = battle.get_legal_moves(game)
+                assert [battle.MOVES[idx] for idx in mask[i].nonzero()[0]] == list(legal)
+                moves.append(rnd.choice(legal).pos if legal else -1)
+
+            batch = vbattle.step(batch, moves, rng=rng)
+            scores = vbattle.terminal_scores(batch)
+            for move, game, game_vec, score in zip(
+                    moves, games, vbattle.to_games(batch), scores):
+                if move == -1:
+                    continue
+
+                # damage is rolled independently, so one of the possible
+                # damage values has to lead to the same game
+                expected = [
+                    battle.make_move(game, battle.MOVES[move], rng=FixedDamage(damage))
+                    for damage in range(1, 5)]
+                assert key(game_vec) in [key(game) for game in expected]
+
+                if game_vec.winner:
+                    assert score == battle.game_score(game_vec)
+                else:
+                    assert np.isnan(score)
+
+    def test_illegal_move_raises(self, battle, vbattle, rng):
+        # the active ranger at 3 has full HP and cannot heal itself
+        batch = vbattle.init_batch([battle.init_game()])
+        with pytest.raises(ValueError):
+            vbattle.step(batch, [3], rng=rng)
+
+    def test_playouts(self, battle, vbattle, rng):
+        # pylint: disable=import-outside-toplevel
+        import numpy as np
+
+        scores = vbattle.playout_scores(battle.init_game(), n_playouts=200, rng=rng)
+        assert scores.shape == (200,)
+        assert ((scores >= 0) & (scores <= 1)).all()
+        assert not np.isnan(scores).any()
+        assert 0 <= vbattle.simulate(battle.init_game(), rng=rng) <= 1
+
+    def test_playouts_finished_game(self, battle, vbattle, rng):
+        p1 = battle.PLAYERS[1]
+        board = battle.Board(
+            state=(battle.Melee(owner=p1),) + (None,) * 9, active_idx=0)
+        game = battle.init_game(board=board)
+        game = battle.Game(
+            players=game.players,
+            board=board,
+            board_init=battle.init_game().board,
+        )
+        scores = vbattle.playout_scores(game, n_playouts=5, rng=rng)
+        assert (scores == battle.game_score(game)).all()
@@ -0,0 +1,128 @@
+# type: ignore
+
+
+import random
+
+import pytest
+
+
+def engine_pairs():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import dumbdice, nim, tictactoe, ziczaczoe
+    from aidoodle.vec import dumbdice as vdice
+    from aidoodle.vec import nim as vnim
+    from aidoodle.vec import tictactoe as vttt
+    from aidoodle.vec import ziczaczoe as vzzz
+
+    return [(nim, vnim), (tictactoe, vttt), (ziczaczoe, vzzz), (dumbdice, vdice)]
+
+
+def key(game):
+    # dice are rolled independently by the vectorized engine
+    return game.board.state, getattr(game.board, 'rerolled', None), game.player_idx
+
+
+@pytest.fixture
+def rng():
+    # pylint: disable=import-outside-toplevel
+    import numpy as np
+    return np.random.default_rng(0)
+
+
+class TestConsistentWithEngine:
+    @pytest.mark.parametrize('engine, vec', engine_pairs())
+    def test_roundtrip(self, engine, vec):
+        games = [engine.init_game() for _ in range(10)]
+        batch = vec.init_batch(games)
+        assert len(batch) == 10
+        assert vec.to_games(batch) == games
+
+    @pytest.mark.parametrize('engine, vec', engine_pairs())
+    def test_random_games(self, engine, vec, rng):
+        # pylint: disable=import-outside-toplevel
+        import numpy as np
+
+        rnd = random.Random(0)
+        batch = vec.init_batch([engine.init_game() for _ in range(20)])
+
+        for _ in range(200):
+            games = vec.to_games(batch)
+            mask = vec.legal_mask(batch)
+            moves = []
+            expected = []
+            for i, game in enumerate(games):
+                legal = engine.get_legal_moves(game)
+                assert sorted(vec.index_to_move(batch, idx)
+                              for idx in mask[i].nonzero()[0]) == sorted(legal)
+                if not legal:
+                    moves.append(-1)
+                    expected.append(game)
+                    continue
+
+                move = rnd.choice(legal)
+                moves.append(vec.move_to_index(batch, move))
+                expected.append(engine.make_move(game, move))
+
+            batch = vec.step(batch, moves, rng=rng)
+            assert [key(game) for game in vec.to_games(batch)] == [
+                key(game) for game in expected]
+
+            scores = vec.terminal_scores(batch)
+            for score, game in zip(scores, expected):
+                if game.winner:
+                    assert score == engine.game_score(game)
+                else:
+                    assert np.isnan(score)
+
+            if not mask.any():
+                break
+        else:
+            pytest.fail("Games did not end")
+
+    @pytest.mark.parametrize('engine, vec', engine_pairs())
+    def test_illegal_move_raises(self, engine, vec, rng):
+        batch = vec.init_batch([engine.init_game()])
+        mask = vec.legal_mask(batch)
+        if mask.all():
+            pytest.skip("all moves are legal")
+        with pytest.raises(ValueError):
+            vec.step(batch, [(~mask[0]).nonzero()[0][0]], rng=rng)
+
+
+class TestRandomPlayouts:
+    def test_sample_moves_uniform(self, rng):
+        # pylint: disable=import-outside-toplevel
+        import numpy as np
+        from aidoodle.vec.common import NO_MOVE, sample_moves
+
+        mask = np.zeros((30000, 4), dtype=bool)
+        mask[:, 1:3] = True
+        mask[-1] = False
+        moves = sample_moves(mask, rng=rng)
+        assert moves[-1] == NO_MOVE
+        counts = np.bincount(moves[:-1], minlength=4)
+        assert counts[0] == counts[3] == 0
+        assert abs(counts[1] - counts[2]) < 500
+
+    @pytest.mark.parametrize('engine, vec', engine_pairs())
+    def test_all_games_end(self, engine, vec, rng):
+        # pylint: disable=import-outside-toplevel
+        import numpy as np
+        from aidoodle.vec.common import random_playouts
+
+        batch = vec.init_batch([engine.init_game() for _ in range(100)])
+        scores = random_playouts(vec, batch, rng=rng)
+        assert scores.shape == (100,)
+        assert np.isin(scores, [0.0, 0.5, 1.0]).all()
+
+    def test_tictactoe_first_player_advantage(self, rng):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.games import tictactoe
+        from aidoodle.vec import tictactoe as vttt
+        from aidoodle.vec.common import random_playouts
+
+        batch = vttt.init_batch([tictactoe.init_game()] * 5000)
+        scores = random_playouts(vttt, batch, rng=rng)
+        # known results of random play: ~58.5% wins, ~12.7% ties
+        assert 0.56 < (scores == 1.0).mean() < 0.61
+        assert 0.11 < (scores == 0.5).mean() < 0.15
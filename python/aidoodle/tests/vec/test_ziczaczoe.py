@@ -0,0 +1,85 @@
+# type: ignore
+
+
+import random
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def vzzz():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.vec import ziczaczoe
+    return ziczaczoe
+
+
+@pytest.fixture(scope='session')
+def zzz():
+    # pylint: disable=import-outside-toplevel
+    from aidoodle.games import ziczaczoe
+    return ziczaczoe
+
+
+@pytest.fixture
+def rng():
+    # pylint: disable=import-outside-toplevel
+    import numpy as np
+    return np.random.default_rng(0)
+
+
+class TestPlayouts:
+    def test_lines(self, vzzz):
+        # 15 rows, 15 columns, 9 diagonals and 9 contra-diagonals
+        assert vzzz.LINES.shape == (48, 3)
+
+    def test_game_over(self, vzzz, zzz, rng):
+        board = zzz.Board(state=(
+            (2, 2, 2, 9, 9),
+            (1, 1, 0, 9, 9),
+            (1, 0, 0, 9, 9),
+            (9, 9, 9, 9, 9),
+            (9, 9, 9, 9, 9)))
+        game = zzz.init_game(board=board)
+        assert (vzzz.playout_scores(game, 10, rng=rng) == 0.0).all()
+
+    @pytest.mark.parametrize('player_idx, score', [(0, 1.0), (1, 0.5)])
+    def test_last_empty_cell(self, vzzz, zzz, rng, player_idx, score):
+        board = zzz.Board(state=(
+            (1, 1, 0, 9, 9),
+            (2, 2, 1, 9, 9),
+            (1, 1, 2, 9, 9),
+            (9, 9, 9, 9, 9),
+            (9, 9, 9, 9, 9)))
+        game = zzz.init_game(board=board, player_idx=player_idx)
+        # player 2 filling the last cell gives a tie
+        assert (vzzz.playout_scores(game, 10, rng=rng) == score).all()
+
+    @pytest.mark.parametrize('seed', range(3))
+    def test_same_mean_as_sequential_playouts(self, vzzz, zzz, rng, seed):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.ai.mcts import simulate
+
+        random.seed(seed)
+        game = zzz.init_game()
+        expected = sum(simulate(game, engine=zzz) for _ in range(4000)) / 4000
+        assert vzzz.simulate(game, 4000, rng=rng) == pytest.approx(expected, abs=0.04)
+
+    def test_agent_with_vectorized_simulator(self, vzzz):
+        # pylint: disable=import-outside-toplevel
+        from aidoodle.agents import MctsAgent
+        from aidoodle.games import tictactoe
+
+        board = tictactoe.Board(state=(
+            (1, 1, 0, 9, 9),
+            (0, 0, 0, 9, 9),
+            (0, 2, 2, 9, 9),
+            (9, 9, 9, 9, 9),
+            (9, 9, 9, 9, 9)))
+        agent = MctsAgent(
+            player=tictactoe.init_player(1),
+            engine=tictactoe,
+            n_iter=200,
+            simulator=vzzz.simulate,
+        )
+        move = agent.next_move(tictactoe.init_game(board=board))
+        assert move == tictactoe.Move(0, 2)
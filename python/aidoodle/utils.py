@@ -0,0 +1,107 @@
+from dataclasses import MISSING, fields
+from typing import Any, Generic, List, Optional, Type, TypeVar
+import weakref
+
+
+T = TypeVar('T')
+
+
+def unchecked(cls: Type[T], **kwargs: Any) -> T:
+    """Create a (frozen) dataclass instance without running its __init__
+
+    This skips any validation in __post_init__, so it should only be
+    used for values that are known to be valid. All fields have to be
+    passed.
+
+    """
+    obj = object.__new__(cls)
+    for key, val in kwargs.items():
+        object.__setattr__(obj, key, val)
+    return obj
+
+
+def slotted(cls: Type[T]) -> Type[T]:
+    """Recreate a dataclass so that its fields are stored in __slots__
+
+    Instances then have no per-instance __dict__, which considerably
+    reduces their memory footprint. They can still be weakly
+    referenced and pickled. Apply this decorator on top of
+    ``@dataclass``. Methods of the class must not use argument-less
+    ``super()``.
+
+    """
+    names = [f.name for f in fields(cls)]  # type: ignore
+    inherited = {
+        name for base in cls.__mro__[1:] for name in getattr(base, '__slots__', ())}
+
+    slots: List[str] = [name for name in names if name not in inherited]
+    if '__weakref__' not in inherited:
+        slots.append('__weakref__')
+
+    cls_dict = dict(cls.__dict__)
+    # class attributes holding field defaults would shadow the slots
+    for name in names:
+        cls_dict.pop(name, None)
+    cls_dict.pop('__dict__', None)
+    cls_dict.pop('__weakref__', None)
+    cls_dict['__slots__'] = tuple(slots)
+
+    def __getstate__(self: Any) -> List[Any]:
+        return [getattr(self, name) for name in names]
+
+    def __setstate__(self: Any, state: List[Any]) -> None:
+        for name, val in zip(names, state):
+            object.__setattr__(self, name, val)
+
+    cls_dict['__getstate__'] = __getstate__
+    cls_dict['__setstate__'] = __setstate__
+
+    # __init__ leaves fields with init=False and a plain default to the
+    # class attribute, which no longer exists
+    defaults = {
+        f.name: f.default for f in fields(cls)  # type: ignore
+        if not f.init and f.default is not MISSING}
+    if defaults:
+        init = cls_dict['__init__']
+
+        def __init__(self: Any, *args: Any, **kwargs: Any) -> None:
+            for name, val in defaults.items():
+                object.__setattr__(self, name, val)
+            init(self, *args, **kwargs)
+
+        cls_dict['__init__'] = __init__
+
+    metaclass: Any = type(cls)
+    new_cls: Type[T] = metaclass(cls.__name__, cls.__bases__, cls_dict)
+    new_cls.__qualname__ = cls.__qualname__
+    return new_cls
+
+
+class Interner(Generic[T]):
+    """Map equal objects to one canonical instance
+
+    Calling the interner with an object returns the first equal object
+    it has seen, so that equal states can be compared by identity and
+    duplicates can be freed. Objects have to be hashable and weakly
+    referenceable. Only weak references are held, so canonical objects
+    are dropped once nothing else refers to them.
+
+    """
+    def __init__(self) -> None:
+        self._table: 'weakref.WeakKeyDictionary[T, weakref.ref[T]]' = (
+            weakref.WeakKeyDictionary())
+
+    def __call__(self, obj: T) -> T:
+        ref = self._table.get(obj)
+        canonical: Optional[T] = ref() if ref is not None else None
+        if canonical is not None:
+            return canonical
+
+        self._table[obj] = weakref.ref(obj)
+        return obj
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def clear(self) -> None:
+        self._table.clear()
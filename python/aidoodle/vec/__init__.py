@@ -0,0 +1,7 @@
+"""Vectorized engines that advance a batch of games at once
+
+Each module mirrors an engine from ``aidoodle.games`` and holds a batch
+of games as NumPy arrays, see ``aidoodle.core.VecEngine``. Moves are
+encoded as integer indices into a fixed move space.
+
+"""
@@ -0,0 +1,297 @@
+"""Batch of battle games
+
+Unit data is held in arrays of shape (B, N_SLOTS) with the layout of
+``aidoodle.games.bigbattle``, i.e. unit kinds and buff counters instead
+of unit objects. The move index is the target slot. Since attacks roll
+damage, ``step`` needs a random generator.
+
+``simulate`` estimates the value of a single position from many random
+playouts that are advanced in lockstep, and can be used as the
+simulator of MCTS.
+
+"""
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import aidoodle.games.battle as battle
+import aidoodle.games.bigbattle as bigbattle
+from aidoodle.vec.common import Array, get_rng, sample_moves
+
+
+N_SLOTS = battle.N_SLOTS
+N_PLAYOUTS = 64  # default number of playouts per simulation
+
+# per unit kind, with a trailing entry for empty slots (kind -1)
+HP_MAX = np.array([kind.hp_max for kind in bigbattle.KINDS] + [0])
+RANGE = np.array([kind.range for kind in bigbattle.KINDS] + [0])
+DAMAGE_MIN = np.array([battle.DAMAGE[kind.attack].i for kind in bigbattle.KINDS] + [0])
+DAMAGE_MAX = np.array([battle.DAMAGE[kind.attack].j for kind in bigbattle.KINDS] + [0])
+GIVES_SHIELD = np.array([kind.buff == 'shield' for kind in bigbattle.KINDS] + [False])
+UNIT_CLASSES = tuple(getattr(battle, kind.name) for kind in bigbattle.KINDS)
+
+SLOTS = np.arange(N_SLOTS)
+
+
+@dataclass(frozen=True)
+class Batch:
+    # pylint: disable=too-many-instance-attributes
+    kind: Array  # (B, N_SLOTS) index into bigbattle.KINDS, -1 if empty
+    owner: Array  # (B, N_SLOTS) 0 if empty
+    hp: Array  # (B, N_SLOTS)
+    damage_buffs: Array  # (B, N_SLOTS)
+    shields: Array  # (B, N_SLOTS) received this round
+    shields_old: Array  # (B, N_SLOTS) received last round
+    queued: Array  # (B, N_SLOTS) whether the unit still acts this round
+    active_idx: Array  # (B,)
+    round: Array  # (B,)
+    turn: Array  # (B,)
+    player_idx: Array  # (B,)
+    n_init: Array  # (B, 2) number of units per side on the initial board
+    boards_init: Tuple[battle.Board, ...]
+
+    def __len__(self) -> int:
+        return len(self.kind)
+
+
+def init_batch(games: Sequence[battle.Game]) -> Batch:
+    boards = [bigbattle.from_battle(game.board) for game in games]
+    boards_init = tuple(game.board_init for game in games)
+    return Batch(
+        kind=np.array([board.kind for board in boards], dtype=np.int64),
+        owner=np.array([board.owner for board in boards], dtype=np.int64),
+        hp=np.array([board.hp for board in boards], dtype=np.int64),
+        damage_buffs=np.array([board.damage_buffs for board in boards], dtype=np.int64),
+        shields=np.array([board.shields for board in boards], dtype=np.int64),
+        shields_old=np.array([board.shields_old for board in boards], dtype=np.int64),
+        queued=np.array(
+            [[(board.queued >> slot) & 1 for slot in range(N_SLOTS)] for board in boards],
+            dtype=bool),
+        active_idx=np.array([board.active_idx for board in boards], dtype=np.int64),
+        round=np.array([board.round for board in boards], dtype=np.int64),
+        turn=np.array([board.turn for board in boards], dtype=np.int64),
+        player_idx=np.array([game.player_idx for game in games], dtype=np.int64),
+        n_init=np.array(
+            [_units_left_right(board.state) for board in boards_init], dtype=np.int64),
+        boards_init=boards_init,
+    )
+
+
+def _units_left_right(state: battle.Row) -> Tuple[int, int]:
+    half = N_SLOTS // 2
+    return (
+        sum(unit is not None for unit in state[:half]),
+        sum(unit is not None for unit in state[half:]),
+    )
+
+
+def _to_unit(batch: Batch, i: int, slot: int) -> battle.MaybeUnit:
+    if not batch.owner[i, slot]:
+        return None
+
+    # the rounds of damage buffs are not tracked, since they never expire
+    current_round = int(batch.round[i])
+    buffs = (
+        (battle.DamageBuff(round=1),) * int(batch.damage_buffs[i, slot])
+        + (battle.ShieldBuff(round=current_round - 1),) * int(batch.shields_old[i, slot])
+        + (battle.ShieldBuff(round=current_round),) * int(batch.shields[i, slot])
+    )
+    cls = UNIT_CLASSES[batch.kind[i, slot]]
+    unit: battle.Unit = cls(
+        owner=battle.PLAYERS[int(batch.owner[i, slot])],
+        hp=int(batch.hp[i, slot]),
+        buffs=buffs,
+        queued=bool(batch.queued[i, slot]),
+    )
+    return unit
+
+
+def to_games(batch: Batch) -> List[battle.Game]:
+    games = []
+    for i, board_init in enumerate(batch.boards_init):
+        state: battle.Row = tuple(  # type: ignore
+            _to_unit(batch, i, slot) for slot in range(N_SLOTS))
+        board = battle.Board(
+            state=state,
+            active_idx=int(batch.active_idx[i]),
+            turn=int(batch.turn[i]),
+            round=int(batch.round[i]),
+        )
+        games.append(battle.Game(
+            players=(battle.PLAYERS[1], battle.PLAYERS[2]),
+            board=board,
+            board_init=board_init,
+            player_idx=int(batch.player_idx[i]),
+        ))
+    return games
+
+
+def index_to_move(batch: Batch, idx: int) -> battle.Move:  # pylint: disable=unused-argument
+    return battle.MOVES[idx]
+
+
+def move_to_index(batch: Batch, move: battle.Move) -> int:  # pylint: disable=unused-argument
+    return move.pos
+
+
+def is_terminal(batch: Batch) -> Array:
+    done: Array = ~(batch.owner == 1).any(axis=1) | ~(batch.owner == 2).any(axis=1)
+    return done
+
+
+def legal_mask(batch: Batch) -> Array:
+    """Boolean array of shape (B, N_SLOTS)
+
+    Enemies within range can be attacked, allies can be buffed, and the
+    active unit can heal itself if it is injured. Distances only count
+    occupied slots.
+
+    """
+    rows = np.arange(len(batch))
+    active = batch.active_idx
+    occupied = batch.owner > 0
+    kind_active = batch.kind[rows, active]
+    owner_active = batch.owner[rows, active][:, None]
+
+    rank = occupied.cumsum(axis=1)
+    dist = np.abs(rank - rank[rows, active][:, None])
+    reach = occupied & (dist <= RANGE[kind_active][:, None])
+
+    is_self = SLOTS[None, :] == active[:, None]
+    injured = batch.hp[rows, active] < HP_MAX[kind_active]
+    mask: Array = (
+        (reach & (batch.owner != owner_active))
+        | ((batch.owner == owner_active) & ~is_self)
+        | (is_self & injured[:, None])
+    )
+    mask &= ~is_terminal(batch)[:, None]
+    return mask
+
+
+def step(
+        batch: Batch,
+        moves: Array,
+        rng: Optional[np.random.Generator] = None,
+) -> Batch:
+    """Apply one move per game, moves of finished games are ignored"""
+    # pylint: disable=too-many-locals
+    games = np.flatnonzero(~is_terminal(batch))
+    targets = np.asarray(moves)[games]
+    if not legal_mask(batch)[games, targets].all():
+        raise ValueError('Illegal move')
+
+    kind = batch.kind.copy()
+    owner = batch.owner.copy()
+    hp = batch.hp.copy()
+    damage_buffs = batch.damage_buffs.copy()
+    shields = batch.shields.copy()
+    shields_old = batch.shields_old.copy()
+    queued = batch.queued.copy()
+
+    active = batch.active_idx[games]
+    owner_active = owner[games, active]
+    heal = targets == active
+    attack = owner[games, targets] != owner_active
+    buff = ~heal & ~attack
+
+    g, a = games[heal], active[heal]
+    hp[g, a] = np.minimum(hp[g, a] + battle.HEAL, HP_MAX[kind[g, a]])
+
+    g, a, t = games[attack], active[attack], targets[attack]
+    k = kind[g, a]
+    damage_raw = get_rng(rng).integers(DAMAGE_MIN[k], DAMAGE_MAX[k] + 1)
+    blocked = battle.BUFF_SHIELD * (shields[g, t] + shields_old[g, t])
+    damage_extra = battle.BUFF_DAMAGE * damage_buffs[g, a]
+    hp[g, t] -= np.maximum(0, damage_raw - blocked + damage_extra)
+    dead = hp[g, t] < 1
+    g, t = g[dead], t[dead]
+    kind[g, t] = -1
+    for values in (owner, hp, damage_buffs, shields, shields_old):
+        values[g, t] = 0
+    queued[g, t] = False
+
+    g, a, t = games[buff], active[buff], targets[buff]
+    shield = GIVES_SHIELD[kind[g, a]]
+    shields[g[shield], t[shield]] += 1
+    damage_buffs[g[~shield], t[~shield]] += 1
+
+    queued[games, active] = False
+
+    # next occupied slot to the right, wrapping around
+    slots = (active[:, None] + 1 + SLOTS[None, :]) % N_SLOTS
+    occupied = owner[games[:, None], slots] > 0
+    active_idx = batch.active_idx.copy()
+    active_idx[games] = slots[np.arange(len(games)), occupied.argmax(axis=1)]
+
+    # round end, shields expire at the end of the round after they were given
+    round_ = batch.round.copy()
+    end = games[~queued[games].any(axis=1)]
+    queued[end] = owner[end] > 0
+    shields_old[end] = shields[end]
+    shields[end] = 0
+    round_[end] += 1
+
+    turn = batch.turn.copy()
+    turn[games] += 1
+    player_idx = batch.player_idx.copy()
+    player_idx[games] = owner[games, active_idx[games]] - 1
+
+    return Batch(
+        kind=kind,
+        owner=owner,
+        hp=hp,
+        damage_buffs=damage_buffs,
+        shields=shields,
+        shields_old=shields_old,
+        queued=queued,
+        active_idx=active_idx,
+        round=round_,
+        turn=turn,
+        player_idx=player_idx,
+        n_init=batch.n_init,
+        boards_init=batch.boards_init,
+    )
+
+
+def terminal_scores(batch: Batch) -> Array:
+    """Score of each game for player 1, NaN if the game is not over
+
+    As in ``battle.game_score``, the score is the share of the units
+    lost by the right side among all lost units.
+
+    """
+    half = N_SLOTS // 2
+    occupied = batch.owner > 0
+    lost_left = batch.n_init[:, 0] - occupied[:, :half].sum(axis=1)
+    lost_right = batch.n_init[:, 1] - occupied[:, half:].sum(axis=1)
+    share = lost_right / np.maximum(1, lost_left + lost_right)
+
+    tied = ~occupied.any(axis=1)
+    scores: Array = np.where(
+        is_terminal(batch), np.where(tied, 0.5, share), np.nan)
+    return scores
+
+
+def playout_scores(
+        game: battle.Game,
+        n_playouts: int = N_PLAYOUTS,
+        rng: Optional[np.random.Generator] = None,
+) -> Array:
+    """Scores for player 1 of random playouts starting from game"""
+    rng = get_rng(rng)
+    batch = init_batch([game] * n_playouts)
+    scores = terminal_scores(batch)
+    while np.isnan(scores).any():
+        batch = step(batch, sample_moves(legal_mask(batch), rng=rng), rng=rng)
+        scores = terminal_scores(batch)
+    return scores
+
+
+def simulate(
+        game: battle.Game,
+        n_playouts: int = N_PLAYOUTS,
+        rng: Optional[np.random.Generator] = None,
+) -> float:
+    """Mean score for player 1 of random playouts starting from game"""
+    return float(playout_scores(game, n_playouts=n_playouts, rng=rng).mean())
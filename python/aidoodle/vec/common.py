@@ -0,0 +1,50 @@
+from typing import TYPE_CHECKING, Any, Optional, TypeVar
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from aidoodle.core import VecEngine
+
+
+if TYPE_CHECKING:
+    Array = np.ndarray[Any, Any]
+else:
+    Array = np.ndarray
+
+B = TypeVar('B')
+NO_MOVE = -1  # move index for games without legal moves
+
+
+def get_rng(rng: Optional[np.random.Generator] = None) -> np.random.Generator:
+    return rng if rng is not None else np.random.default_rng()
+
+
+def sample_moves(mask: Array, rng: Optional[np.random.Generator] = None) -> Array:
+    """Draw a uniformly random legal move index for each game
+
+    Games without any legal move get NO_MOVE.
+
+    """
+    keys = np.where(mask, get_rng(rng).random(mask.shape), -1.0)
+    moves: Array = keys.argmax(axis=1)
+    moves[~mask.any(axis=1)] = NO_MOVE
+    return moves
+
+
+def random_playouts(
+        engine: 'VecEngine[B]',
+        batch: B,
+        rng: Optional[np.random.Generator] = None,
+) -> Array:
+    """Play all games of the batch to the end with random moves
+
+    Returns the score of each game, from the perspective of player 1.
+
+    """
+    rng = get_rng(rng)
+    scores = engine.terminal_scores(batch)
+    while np.isnan(scores).any():
+        moves = sample_moves(engine.legal_mask(batch), rng=rng)
+        batch = engine.step(batch, moves, rng=rng)
+        scores = engine.terminal_scores(batch)
+    return scores
@@ -0,0 +1,109 @@
+"""Batch of dumbdice games
+
+Move index 0 is reroll and 1 is continue. Since moves roll new dice,
+``step`` needs a random generator.
+
+"""
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+import aidoodle.games.dumbdice as dice
+from aidoodle.vec.common import Array, get_rng
+
+
+MOVES = (dice.MOVES['r'], dice.MOVES['c'])
+REROLL = 0
+CONTINUE = 1
+
+
+@dataclass(frozen=True)
+class Batch:
+    state: Array  # (B, 3) score of player 1 and 2, and the target
+    dice: Array  # (B, 2) eyes of the dice
+    rerolled: Array  # (B,) whether the dice were already rerolled
+    player_idx: Array  # (B,) index of the player to move
+
+    def __len__(self) -> int:
+        return len(self.state)
+
+
+def init_batch(games: Sequence[dice.Game]) -> Batch:
+    return Batch(
+        state=np.array([game.board.state for game in games], dtype=np.int64),
+        dice=np.array(
+            [[die.eye for die in game.board.dice] for game in games], dtype=np.int64),
+        rerolled=np.array([game.board.rerolled for game in games], dtype=bool),
+        player_idx=np.array([game.player_idx for game in games], dtype=np.int64),
+    )
+
+
+def to_games(batch: Batch) -> List[dice.Game]:
+    games = []
+    for (s0, s1, target), (d0, d1), rerolled, idx in zip(
+            batch.state, batch.dice, batch.rerolled, batch.player_idx):
+        board = dice.Board(
+            dice=(dice.DICE[d0 - 1], dice.DICE[d1 - 1]),
+            state=(int(s0), int(s1), int(target)),
+            rerolled=bool(rerolled),
+        )
+        games.append(dice.init_game(board=board, player_idx=int(idx)))
+    return games
+
+
+def index_to_move(batch: Batch, idx: int) -> dice.Move:  # pylint: disable=unused-argument
+    return MOVES[idx]
+
+
+def move_to_index(batch: Batch, move: dice.Move) -> int:  # pylint: disable=unused-argument
+    return MOVES.index(move)
+
+
+def is_terminal(batch: Batch) -> Array:
+    s0, s1, target = batch.state.T
+    done: Array = (s0 >= target) | (s1 >= target)
+    return done
+
+
+def legal_mask(batch: Batch) -> Array:
+    """Boolean array of shape (B, 2)"""
+    active = ~is_terminal(batch)
+    mask: Array = np.stack([active & ~batch.rerolled, active], axis=1)
+    return mask
+
+
+def step(
+        batch: Batch,
+        moves: Array,
+        rng: Optional[np.random.Generator] = None,
+) -> Batch:
+    """Apply one move per game, moves of finished games are ignored"""
+    active = np.flatnonzero(~is_terminal(batch))
+    moves = np.asarray(moves)[active]
+    if not legal_mask(batch)[active, moves].all():
+        raise ValueError('Illegal move')
+
+    # every move rolls the dice
+    dice_new = batch.dice.copy()
+    dice_new[active] = get_rng(rng).integers(1, 7, size=(len(active), 2))
+
+    cont = active[moves == CONTINUE]
+    state = batch.state.copy()
+    state[cont, batch.player_idx[cont]] += batch.dice[cont].sum(axis=1)
+
+    rerolled = batch.rerolled.copy()
+    rerolled[active] = moves == REROLL
+
+    # change player only on continue
+    player_idx = batch.player_idx.copy()
+    player_idx[cont] ^= 1
+    return Batch(state=state, dice=dice_new, rerolled=rerolled, player_idx=player_idx)
+
+
+def terminal_scores(batch: Batch) -> Array:
+    """Score of each game for player 1, NaN if the game is not over"""
+    s0, _, target = batch.state.T
+    won1: Array = s0 >= target
+    scores: Array = np.where(is_terminal(batch), won1.astype(float), np.nan)
+    return scores
@@ -0,0 +1,91 @@
+"""Batch of nim games
+
+Move index ``k`` takes ``k % max_stones + 1`` stones from heap
+``k // max_stones``, where max_stones is the largest heap at the
+start, since heaps can only shrink.
+
+"""
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+import aidoodle.games.nim as nim
+from aidoodle.vec.common import Array
+
+
+N_HEAPS = 3
+
+
+@dataclass(frozen=True)
+class Batch:
+    heaps: Array  # (B, N_HEAPS) stones per heap
+    player_idx: Array  # (B,) index of the player to move
+    max_stones: int
+
+    def __len__(self) -> int:
+        return len(self.heaps)
+
+
+def init_batch(games: Sequence[nim.Game]) -> Batch:
+    heaps = np.array([game.board.state for game in games], dtype=np.int64)
+    heaps = heaps.reshape(len(games), N_HEAPS)
+    player_idx = np.array([game.player_idx for game in games], dtype=np.int64)
+    max_stones = max([1] + [max(game.board.state) for game in games])
+    return Batch(heaps=heaps, player_idx=player_idx, max_stones=max_stones)
+
+
+def to_games(batch: Batch) -> List[nim.Game]:
+    return [
+        nim.init_game(board=nim.Board(state=(int(i), int(j), int(k))),
+                      player_idx=int(idx))
+        for (i, j, k), idx in zip(batch.heaps, batch.player_idx)]
+
+
+def index_to_move(batch: Batch, idx: int) -> nim.Move:
+    i, j = divmod(idx, batch.max_stones)
+    return nim.Move(i, j + 1)
+
+
+def move_to_index(batch: Batch, move: nim.Move) -> int:
+    i, j = move
+    return i * batch.max_stones + j - 1
+
+
+def is_terminal(batch: Batch) -> Array:
+    done: Array = batch.heaps.sum(axis=1) == 0
+    return done
+
+
+def legal_mask(batch: Batch) -> Array:
+    """Boolean array of shape (B, N_HEAPS * max_stones)"""
+    stones = np.arange(1, batch.max_stones + 1)
+    mask: Array = stones[None, None, :] <= batch.heaps[:, :, None]
+    return mask.reshape(len(batch), -1)
+
+
+def step(
+        batch: Batch,
+        moves: Array,
+        rng: Optional[np.random.Generator] = None,  # pylint: disable=unused-argument
+) -> Batch:
+    """Apply one move per game, moves of finished games are ignored"""
+    active = np.flatnonzero(~is_terminal(batch))
+    moves = np.asarray(moves)[active]
+    if not legal_mask(batch)[active, moves].all():
+        raise ValueError('illegal move')
+
+    heap, stones = np.divmod(moves, batch.max_stones)
+    heaps = batch.heaps.copy()
+    heaps[active, heap] -= stones + 1
+    player_idx = batch.player_idx.copy()
+    player_idx[active] ^= 1
+    return Batch(heaps=heaps, player_idx=player_idx, max_stones=batch.max_stones)
+
+
+def terminal_scores(batch: Batch) -> Array:
+    """Score of each game for player 1, NaN if the game is not over"""
+    # last player to have taken a stone loses, i.e. the player to move wins
+    scores: Array = np.where(
+        is_terminal(batch), (batch.player_idx == 0).astype(float), np.nan)
+    return scores
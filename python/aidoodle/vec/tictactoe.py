@@ -0,0 +1,23 @@
+"""Batch of tictactoe games, on the blocked 5 x 5 ziczaczoe board"""
+from typing import List
+
+import aidoodle.games.tictactoe as ttt
+import aidoodle.vec.ziczaczoe as vzzz
+
+
+Batch = vzzz.Batch
+init_batch = vzzz.init_batch
+index_to_move = vzzz.index_to_move
+move_to_index = vzzz.move_to_index
+winners = vzzz.winners
+legal_mask = vzzz.legal_mask
+step = vzzz.step
+terminal_scores = vzzz.terminal_scores
+playout_scores = vzzz.playout_scores
+simulate = vzzz.simulate
+
+
+def to_games(batch: Batch) -> List[ttt.Game]:
+    return [
+        ttt.init_game(board=ttt.Board(state=vzzz.to_state(row)), player_idx=int(idx))
+        for row, idx in zip(batch.cells, batch.player_idx)]
@@ -0,0 +1,174 @@
+"""Batch of ziczaczoe games
+
+Move index ``k`` places a stone on cell ``divmod(k, N)``.
+
+``simulate`` estimates the value of a single position from many random
+playouts at once, for use as the MCTS simulator.
+
+"""
+from dataclasses import dataclass
+from itertools import product
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+import aidoodle.games.ziczaczoe as zzz
+from aidoodle.vec.common import Array, get_rng
+
+
+N = 5  # board size
+W = 3  # stones in a row needed to win
+N_PLAYOUTS = 64  # default number of playouts per simulation
+
+
+def _make_lines(n: int = N, w: int = W) -> Array:
+    """Flat cell indices of all lines of w cells, shape (n_lines, w)"""
+    lines = []
+    for i, j in product(range(n), range(n)):
+        for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            cells = [(i + k * di, j + k * dj) for k in range(w)]
+            if all((0 <= ii < n) and (0 <= jj < n) for ii, jj in cells):
+                lines.append([ii * n + jj for ii, jj in cells])
+    return np.array(lines, dtype=np.int64)
+
+
+LINES = _make_lines()
+
+
+@dataclass(frozen=True)
+class Batch:
+    cells: Array  # (B, N * N) cell codes, 0 empty, 1/2 player, 9 blocked
+    player_idx: Array  # (B,) index of the player to move
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+
+def init_batch(games: Sequence[zzz.Game]) -> Batch:
+    cells = np.array([game.board.state for game in games], dtype=np.int8)
+    cells = cells.reshape(len(games), N * N)
+    player_idx = np.array([game.player_idx for game in games], dtype=np.int64)
+    return Batch(cells=cells, player_idx=player_idx)
+
+
+def to_state(row: Array) -> zzz._State:
+    r0, r1, r2, r3, r4 = (tuple(int(c) for c in r) for r in row.reshape(N, N))
+    return (r0, r1, r2, r3, r4)  # type: ignore
+
+
+def to_games(batch: Batch) -> List[zzz.Game]:
+    return [
+        zzz.init_game(board=zzz.Board(state=to_state(row)), player_idx=int(idx))
+        for row, idx in zip(batch.cells, batch.player_idx)]
+
+
+def index_to_move(batch: Batch, idx: int) -> zzz.Move:  # pylint: disable=unused-argument
+    i, j = divmod(idx, N)
+    return zzz.MOVES[(i, j)]
+
+
+def move_to_index(batch: Batch, move: zzz.Move) -> int:  # pylint: disable=unused-argument
+    i, j = move
+    return i * N + j
+
+
+def winners(batch: Batch) -> Array:
+    """Winner of each game, 1 or 2, -1 if tied and 0 if not over"""
+    lines = batch.cells[:, LINES]
+    won1 = (lines == 1).all(axis=2).any(axis=1)
+    won2 = (lines == 2).all(axis=2).any(axis=1)
+    full = ~(batch.cells == 0).any(axis=1)
+
+    result: Array = np.zeros(len(batch), dtype=np.int64)
+    result[full] = -1
+    result[won2] = 2
+    result[won1] = 1
+    return result
+
+
+def legal_mask(batch: Batch) -> Array:
+    """Boolean array of shape (B, N * N)"""
+    mask: Array = (batch.cells == 0) & (winners(batch) == 0)[:, None]
+    return mask
+
+
+def step(
+        batch: Batch,
+        moves: Array,
+        rng: Optional[np.random.Generator] = None,  # pylint: disable=unused-argument
+) -> Batch:
+    """Apply one move per game, moves of finished games are ignored"""
+    active = np.flatnonzero(winners(batch) == 0)
+    moves = np.asarray(moves)[active]
+    if not (batch.cells[active, moves] == 0).all():
+        raise ValueError('Illegal move')
+
+    cells = batch.cells.copy()
+    cells[active, moves] = batch.player_idx[active] + 1
+    player_idx = batch.player_idx.copy()
+    player_idx[active] ^= 1
+    return Batch(cells=cells, player_idx=player_idx)
+
+
+def terminal_scores(batch: Batch) -> Array:
+    """Score of each game for player 1, NaN if the game is not over"""
+    result = winners(batch)
+    scores: Array = np.select(
+        [result == 1, result == 2, result == -1], [1.0, 0.0, 0.5], np.nan)
+    return scores
+
+
+def playout_scores(
+        game: zzz.Game,
+        n_playouts: int = N_PLAYOUTS,
+        rng: Optional[np.random.Generator] = None,
+) -> Array:
+    """Scores for player 1 of random playouts starting from game
+
+    Uniformly random play is equivalent to filling the empty cells in
+    a uniformly random order, alternating between the players, and
+    stopping at the first completed line. So each playout only needs a
+    random permutation of the empty cells. The winner is the owner of
+    the line that is completed first, if any.
+
+    """
+    # pylint: disable=too-many-locals
+    if game.winner:
+        return np.full(n_playouts, zzz.game_score(game))
+
+    cells = np.array(game.board.state, dtype=np.int64).reshape(N * N)
+    empty = np.flatnonzero(cells == 0)
+    n_empty = len(empty)
+
+    # time at which each cell is filled, -1 for stones already placed
+    ranks = get_rng(rng).random((n_playouts, n_empty)).argsort(axis=1).argsort(axis=1)
+    times = np.full((n_playouts, N * N), -1, dtype=np.int64)
+    times[:, empty] = ranks
+
+    # the player to move fills at even times
+    first, second = game.player_idx + 1, 2 - game.player_idx
+    owners = np.broadcast_to(cells, (n_playouts, N * N)).copy()
+    owners[:, empty] = np.where(ranks % 2 == 0, first, second)
+
+    line_owners = owners[:, LINES]
+    owner = line_owners[:, :, 0]
+    complete = (
+        ((owner == 1) | (owner == 2))
+        & (line_owners == owner[:, :, None]).all(axis=2)
+    )
+    done_at = np.where(complete, times[:, LINES].max(axis=2), N * N)
+
+    rows = np.arange(n_playouts)
+    first_line = done_at.argmin(axis=1)
+    winner = np.where(done_at[rows, first_line] < N * N, owner[rows, first_line], -1)
+    scores: Array = np.select([winner == 1, winner == 2], [1.0, 0.0], 0.5)
+    return scores
+
+
+def simulate(
+        game: zzz.Game,
+        n_playouts: int = N_PLAYOUTS,
+        rng: Optional[np.random.Generator] = None,
+) -> float:
+    """Mean score for player 1 of random playouts starting from game"""
+    return float(playout_scores(game, n_playouts=n_playouts, rng=rng).mean())
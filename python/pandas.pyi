@@ -15,5 +15,8 @@ class DataFrame:
     def __getitem__(self, key: str) -> Series:
         ...
 
+    def __contains__(self, key: str) -> bool:
+        ...
+
 def read_table(file: str) -> DataFrame:
     ...
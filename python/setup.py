@@ -6,7 +6,9 @@ from setuptools import setup, find_packages
 with open('VERSION', 'r') as f:
     version = f.read().rstrip()
 
-install_requires = []
+install_requires = [
+    'numpy',
+]
 
 tests_require = [
     'pytest',
@@ -39,5 +41,8 @@ setup(
         ai-play=aidoodle.run:run
         ai-simulate=aidoodle.run:simulate
         ai-generate-zzz-boards=aidoodle.run:generate_zzz_boards
+        ai-build-tablebase=aidoodle.run:build_tablebase
+        ai-build-endgames=aidoodle.run:build_endgames
+        ai-build-book=aidoodle.run:build_book
     ''',
 )